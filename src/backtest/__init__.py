@@ -0,0 +1,3 @@
+from .backtest import Backtest
+
+version='1.0.0'
\ No newline at end of file
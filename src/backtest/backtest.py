@@ -0,0 +1,300 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import multiprocessing as mp
+
+import pandas as pd
+
+from tqdm.notebook import tqdm
+
+from engine import Engine
+from filing import Filing
+
+
+"""
+
+SHOWDOWN BACKTEST
+
+Every single-game contest file for a season joined to the actual fpts in <season>-raw.csv
+--> perfect lineups per game from the engine, one game per process
+Results (lineups, stack pattern, timing) go to <season>/backtest/<site>-single-game.csv
+Each game's inputs are hashed, games with the same hash as the last run are kept as is
+
+"""
+
+# Contest file columns --> engine columns
+CONTEST_COLUMNS: dict[str, dict[str, str]] = {
+    'draftkings': {
+        'Name': 'name',
+        'Salary': 'salary',
+        'Position': 'pos',
+        'TeamAbbrev': 'team',
+    },
+    'fanduel': {
+        'Nickname': 'name',
+        'Salary': 'salary',
+        'Position': 'pos',
+        'Team': 'team',
+    },
+}
+
+# Showdown files list every player once per roster spot --> keep one row per player
+FLEX_ROSTER_POSITIONS: dict[str, str] = {
+    'draftkings': 'FLEX',
+    'fanduel': 'MVP - 1.5X Points/AnyFLEX',
+}
+
+NAME_ISSUES: dict[str, str] = {'Gabriel Davis': 'Gabe Davis', 'Chigoziem Okonkwo': 'Chig Okonkwo', 'Josh Palmer': 'Joshua Palmer'}
+
+
+def _run_game(task: dict) -> dict:
+    """
+    Worker side --> one game's perfect lineups + how long it took
+    """
+    start = time.perf_counter()
+
+    engine = Engine(task['data'], **task['engine_kwargs'])
+    lineups = engine.Lineups(top_n=task['top_n'])
+
+    return {
+        'key': task['key'],
+        'lineups': lineups,
+        'players': len(engine.pool),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+class Backtest:
+    def __init__(self, season: str, **kwargs):
+
+        self.season = season
+        self.site: str = kwargs.get('site', 'draftkings').lower()
+
+        if self.site not in CONTEST_COLUMNS:
+            raise ValueError(f'Site {self.site} not supported, must be one of {tuple(CONTEST_COLUMNS)}')
+
+        self.filing = Filing(season)
+        self.contest_dir = os.path.join(self.filing.season_dir, 'contest-files', self.site, 'single-game')
+        self.backtest_dir = os.path.join(self.filing.season_dir, 'backtest')
+
+        self.results_fpath = os.path.join(self.backtest_dir, f'{self.site}-single-game.csv')
+        self.manifest_fpath = os.path.join(self.backtest_dir, f'{self.site}-single-game.json')
+
+        self.top_n: int = kwargs.get('top_n', 10)
+        self.WORKERS: int = kwargs.get('workers', os.cpu_count() or 1)
+        self.PROGRESS_BAR = kwargs.get('progress_bar', True)
+
+        # Every game runs single process, the pool is across games
+        # site picks the engine's showdown rules (CPT / MVP multipliers, cap, roster size)
+        self.engine_kwargs: dict = {
+            'mode': kwargs.get('mode', 'topn'),
+            'past': kwargs.get('past', True),
+            'site': self.site,
+            'stacks': True,
+            'workers': 1,
+            'progress_bar': False,
+        }
+
+        self.raw = None
+
+    def clean_name(self, name: str) -> str:
+        """
+        Same as Filing.clean_name + known spelling differences between sites and PFR
+        """
+        clean_ = self.filing.clean_name(name.strip())
+        return NAME_ISSUES.get(clean_, clean_)
+
+    def load_raw(self) -> pd.DataFrame:
+        """
+        <season>-raw.csv with fpts in site scoring
+        """
+        if self.raw is not None:
+            return self.raw
+
+        raw = self.filing.combined()
+
+        for name, replacement in NAME_ISSUES.items():
+            raw = raw.replace(name, replacement)
+
+        # FanDuel --> half PPR and -2.0 for fumble lost, K / DST scoring stays the same
+        if self.site == 'fanduel':
+            offense = ~raw['pos'].isin(['K', 'DST'])
+            raw.loc[offense, 'fpts'] = (raw
+                                        .loc[offense]
+                                        .pipe(lambda df: 0.04*df.pass_yds + 4.0*df.pass_td - 1.0*df.pass_int + 0.1*df.rush_yds + 6.0*df.rush_td + 0.5*df.rec + 0.1*df.rec_yds + 6.0*df.rec_td - 2.0*df.fumbles_lost)
+                                       )
+
+        self.raw = raw
+        return self.raw
+
+    def games(self) -> list[str]:
+        """
+        Every single-game contest file, as away-home
+        """
+        return sorted(os.path.basename(fpath).replace('.csv', '') for fpath in glob.glob(self.contest_dir + '/*.csv'))
+
+    def game_data(self, game: str) -> tuple[pd.DataFrame|None, int|None, str]:
+        """
+        Contest salaries joined to actual fpts --> (engine input, week, status)
+        DSTs are named differently everywhere, so they join on team instead of name
+        status other than 'ok' (no results / ambiguous week / not single-game / no players) --> engine input None, game skipped
+        """
+        away, home = game.split('-')[:2]
+        raw = self.load_raw()
+
+        weeks = raw.loc[(raw['team'] == home) & (raw['opp'] == away) & (raw['home'] == 1), 'week'].unique()
+        if not len(weeks):
+            return None, None, 'no results'
+        if len(weeks) > 1:
+            return None, None, 'ambiguous week'
+
+        week = int(weeks[0])
+        results = raw.loc[(raw['week'] == week) & (raw['team'].isin([away, home]))]
+
+        columns = CONTEST_COLUMNS[self.site]
+        export = pd.read_csv(os.path.join(self.contest_dir, f'{game}.csv'))
+
+        # Classic slate exports (or another site's) end up in the folder too --> no showdown FLEX rows / columns
+        if not {'Roster Position', *columns}.issubset(export.columns):
+            return None, None, 'not single-game'
+        if not (export['Roster Position'] == FLEX_ROSTER_POSITIONS[self.site]).any():
+            return None, None, 'not single-game'
+
+        contest = (export
+                   .pipe(lambda df_: df_.loc[df_['Roster Position'] == FLEX_ROSTER_POSITIONS[self.site], list(columns.keys())])
+                   .rename(columns, axis=1)
+                   .assign(
+                       name=lambda df_: df_['name'].map(self.clean_name),
+                       pos=lambda df_: df_['pos'].replace({'D': 'DST', 'DEF': 'DST'}),
+                   )
+                   .drop_duplicates('name')
+                  )
+
+        if contest['team'].nunique() > 2:
+            return None, None, 'not single-game'
+        if not len(contest):
+            return None, None, 'no players'
+
+        is_dst = contest['pos'] == 'DST'
+        fpts_by_name = results.loc[results['pos'] != 'DST'].drop_duplicates('name').set_index('name')['fpts']
+        fpts_by_team = results.loc[results['pos'] == 'DST'].drop_duplicates('team').set_index('team')['fpts']
+
+        data = (contest
+                .assign(fpts=lambda df_: df_['name'].map(fpts_by_name).where(~is_dst, df_['team'].map(fpts_by_team)))
+                .fillna({'fpts': 0.0})
+                .set_index('name')
+                [['salary', 'fpts', 'team', 'pos']]
+               )
+
+        return data, week, 'ok'
+
+    def input_hash(self, game: str, data: pd.DataFrame) -> str:
+        """
+        Contest file + joined engine input + settings --> anything changing reruns the game
+        """
+        digest = hashlib.sha256()
+        with open(os.path.join(self.contest_dir, f'{game}.csv'), 'rb') as f:
+            digest.update(f.read())
+        digest.update(data.to_csv().encode())
+        digest.update(json.dumps({'top_n': self.top_n, **self.engine_kwargs}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def load_previous(self) -> tuple[pd.DataFrame, dict[str, str]]:
+        if not (os.path.exists(self.results_fpath) and os.path.exists(self.manifest_fpath)):
+            return pd.DataFrame(), dict()
+
+        with open(self.manifest_fpath) as f:
+            manifest = json.load(f)
+
+        return pd.read_csv(self.results_fpath), manifest
+
+    def run(self, **kwargs) -> pd.DataFrame:
+        """
+        Runs every game whose inputs changed since the last run (force=True runs all of them)
+        Returns the full results table, one row per lineup
+        """
+        force: bool = kwargs.get('force', False)
+
+        previous, manifest = self.load_previous()
+        if force:
+            previous, manifest = pd.DataFrame(), dict()
+
+        tasks: list[dict] = list()
+        info: dict[str, dict] = dict()
+        keep: list[str] = list()
+
+        for game in self.games():
+            data, week, status = self.game_data(game)
+            if data is None:
+                print(f'Skipping {game} ({status})')
+                continue
+
+            hash_ = self.input_hash(game, data)
+            info[game] = {'week': week, 'hash': hash_}
+
+            if manifest.get(game) == hash_ and len(previous) and (previous['game'] == game).any():
+                keep.append(game)
+                continue
+
+            tasks.append({
+                'key': game,
+                'data': data,
+                'top_n': self.top_n,
+                'engine_kwargs': self.engine_kwargs,
+            })
+
+        print(f'{len(tasks)} games to run, {len(keep)} unchanged')
+
+        frames: list[pd.DataFrame] = [previous.loc[previous['game'].isin(keep)]] if len(keep) else list()
+        for result in self.run_tasks(tasks):
+            game = result['key']
+            frames.append(result['lineups']
+                          .assign(
+                              rank=lambda df_: range(1, len(df_)+1),
+                              fpts=lambda df_: df_['fpts'].round(2),
+                              game=game,
+                              week=info[game]['week'],
+                              site=self.site,
+                              players=result['players'],
+                              seconds=round(result['seconds'], 4),
+                          )
+                         )
+
+        if not len(frames):
+            return pd.DataFrame()
+
+        front = ['week', 'game', 'site', 'rank']
+        results = (pd
+                   .concat(frames, ignore_index=True)
+                   .pipe(lambda df_: df_[front + [c for c in df_.columns if c not in front]])
+                   .sort_values(['week', 'game', 'rank'], kind='stable')
+                   .reset_index(drop=True)
+                  )
+
+        if not os.path.exists(self.backtest_dir):
+            os.mkdir(self.backtest_dir)
+
+        results.to_csv(self.results_fpath, index=False)
+        with open(self.manifest_fpath, 'w') as f:
+            json.dump({game: info[game]['hash'] for game in info if game in set(results['game'])}, f, indent=2, sort_keys=True)
+
+        return results
+
+    def run_tasks(self, tasks: list[dict]):
+        """
+        Yields game results as they finish --> process pool when there's more than one worker and game
+        """
+        if not len(tasks):
+            return
+
+        workers: int = min(self.WORKERS, len(tasks))
+        if workers <= 1:
+            results = map(_run_game, tasks)
+            yield from (tqdm(results, total=len(tasks)) if self.PROGRESS_BAR else results)
+            return
+
+        with mp.Pool(processes=workers) as pool:
+            results = pool.imap_unordered(_run_game, tasks, chunksize=1)
+            yield from (tqdm(results, total=len(tasks)) if self.PROGRESS_BAR else results)
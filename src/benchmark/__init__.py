@@ -0,0 +1,5 @@
+from .benchmark import Benchmark
+from .parsing import ParseBenchmark
+from ._synthetic import synthetic_pool
+
+version='1.0.0'
\ No newline at end of file
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+
+"""
+
+SYNTHETIC SHOWDOWN POOLS
+
+Two made up teams with showdown-like rosters, no scraped data needed
+fpts roughly lognormal per position, salary follows fpts with noise, rounded to $200 like DraftKings
+Seeded, so the same arguments always give the same pool
+
+"""
+
+# (mean fpts, sd) for a starter at each position
+POSITION_FPTS: dict[str, tuple[float, float]] = {
+    'QB': (19.0, 6.0),
+    'RB': (11.0, 6.0),
+    'WR': (10.0, 6.0),
+    'TE': (7.0, 4.5),
+    'K': (8.0, 3.0),
+    'DST': (6.0, 4.0),
+}
+
+# Order players get added to a team --> starters first, then depth
+ROSTER_ORDER: tuple[str,...] = (
+    'QB', 'RB', 'WR', 'WR', 'TE', 'K', 'DST',
+    'WR', 'RB', 'TE', 'WR', 'RB', 'WR', 'QB', 'TE', 'WR', 'RB', 'WR', 'TE', 'WR',
+    'RB', 'WR', 'TE', 'QB', 'WR', 'RB', 'WR', 'TE', 'RB', 'WR', 'K', 'WR',
+)
+
+SALARY_MIN: int = 1_000
+SALARY_MAX: int = 12_400
+
+
+def synthetic_pool(n_players: int, **kwargs) -> pd.DataFrame:
+    """
+    n_players --> engine input (index name, salary, fpts, team, pos)
+    balance --> share of players on the first team (0.5 is an even split)
+    seed --> random state
+    """
+    balance: float = kwargs.get('balance', 0.5)
+    rng = np.random.default_rng(kwargs.get('seed', 0))
+
+    n_first: int = min(max(int(round(balance * n_players)), 1), n_players-1)
+    sizes: dict[str, int] = {'AAA': n_first, 'BBB': n_players - n_first}
+
+    if max(sizes.values()) > len(ROSTER_ORDER):
+        raise ValueError(f'At most {len(ROSTER_ORDER)} players per team, got {sizes}')
+
+    rows: list[dict] = list()
+    for team, size in sizes.items():
+        seen: dict[str, int] = dict()
+        for pos in ROSTER_ORDER[:size]:
+            depth: int = seen.get(pos, 0)
+            seen[pos] = depth + 1
+
+            mean, sd = POSITION_FPTS[pos]
+            # Each step down the depth chart keeps about half the production
+            mean *= 0.5**depth
+            fpts = max(rng.normal(mean, sd * 0.5**depth), 0.0)
+
+            rows.append({'name': f'{team} {pos}{depth+1}', 'team': team, 'pos': pos, 'fpts': round(fpts, 2)})
+
+    df = pd.DataFrame(rows).set_index('name')
+
+    # Salary tracks fpts rank with noise --> rescaled into the site range
+    score = df['fpts'] + rng.normal(0.0, 2.0, len(df))
+    scaled = (score - score.min()) / max(score.max() - score.min(), 1e-9)
+    df['salary'] = (200 * np.round((SALARY_MIN + scaled * (SALARY_MAX - SALARY_MIN)) / 200)).astype(int)
+
+    # Engine drops anyone at 2.0 fpts or less --> keep every synthetic player in the pool
+    df['fpts'] = df['fpts'].clip(lower=2.5)
+
+    return df[['salary', 'fpts', 'team', 'pos']]
@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import platform
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from tqdm.notebook import tqdm
+
+from engine import Engine
+
+from ._synthetic import synthetic_pool
+
+
+"""
+
+ENGINE / CHECKER BENCHMARKS
+
+Synthetic pools only --> runs offline, same pools every time
+Every case is timed best-of-repeat without tracing, then run once more under tracemalloc for peak memory
+Results can be saved as a baseline (JSON) and later runs compared against it
+
+"""
+
+# Keys that identify a case across runs
+CASE_KEYS: list[str] = ['case', 'mode', 'players', 'past', 'balance']
+
+
+class Benchmark:
+    def __init__(self, **kwargs):
+
+        self.sizes: tuple[int,...] = tuple(kwargs.get('sizes', (15, 20, 25, 30, 35, 40, 45)))
+        self.balances: tuple[float,...] = tuple(kwargs.get('balances', (0.5,)))
+        self.pasts: tuple[bool,...] = tuple(kwargs.get('pasts', (True, False)))
+
+        # generate modes --> python is only run on small pools, it's far too slow past that
+        self.modes: tuple[str,...] = tuple(kwargs.get('modes', ('python', 'vectorized', 'salary')))
+        self.python_max_players: int = kwargs.get('python_max_players', 18)
+
+        self.n_checks: int = kwargs.get('n_checks', 20_000)
+        self.top_n: int = kwargs.get('top_n', 10)
+        self.repeat: int = kwargs.get('repeat', 3)
+        self.seed: int = kwargs.get('seed', 0)
+
+        self.PROGRESS_BAR = kwargs.get('progress_bar', True)
+
+        self.baseline_fpath: str = kwargs.get('baseline', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json'))
+
+        self.results = None
+
+    def cases(self) -> list[dict]:
+        cases_: list[dict] = list()
+        for n_players in self.sizes:
+            for balance in self.balances:
+                for past in self.pasts:
+                    base = {'players': n_players, 'past': past, 'balance': balance}
+
+                    for mode in self.modes:
+                        if mode == 'python' and n_players > self.python_max_players:
+                            continue
+                        cases_.append({'case': 'generate', 'mode': mode, **base})
+
+                    cases_.append({'case': 'check', 'mode': 'python', **base})
+                    cases_.append({'case': 'top_n', 'mode': 'topn', **base})
+
+        return cases_
+
+    def sample_lineups(self, engine: Engine) -> list[tuple[str,...]]:
+        """
+        Random (captain, 5 FLEX) name tuples, FLEX in engine order like generate hands to check
+        """
+        rng = np.random.default_rng(self.seed)
+        n: int = len(engine.names)
+
+        lineups: list[tuple[str,...]] = list()
+        for _ in range(self.n_checks):
+            ids = rng.choice(n, engine.size, replace=False)
+            cpt = engine.names[ids[0]]
+            lineups.append((cpt,) + engine.order(tuple(engine.names[i] for i in ids[1:])))
+
+        return lineups
+
+    def run_case(self, case: dict) -> dict:
+        """
+        Fresh engine per run --> (seconds, lineups handled, cache entries afterwards)
+        """
+        data = synthetic_pool(case['players'], balance=case['balance'], seed=self.seed)
+        engine = Engine(data, mode=case['mode'], past=case['past'], workers=1, progress_bar=False)
+
+        if case['case'] == 'check':
+            lineups = self.sample_lineups(engine)
+            start = time.perf_counter()
+            for lineup in lineups:
+                engine.checker.check(lineup)
+            seconds = time.perf_counter() - start
+            count: int = len(lineups)
+
+        elif case['case'] == 'top_n':
+            start = time.perf_counter()
+            count = len(engine.Lineups(top_n=self.top_n))
+            seconds = time.perf_counter() - start
+
+        else:
+            start = time.perf_counter()
+            count = len(engine.generate())
+            seconds = time.perf_counter() - start
+
+        cache_entries: int = sum(
+            stats_['size']
+            for owner in engine.cache_info().values()
+            for stats_ in owner.values()
+        )
+
+        return {'seconds': seconds, 'lineups': count, 'cache_entries': cache_entries}
+
+    def peak_memory(self, case: dict) -> float:
+        """
+        MB allocated at the peak of one traced run (numpy buffers included)
+        """
+        tracemalloc.start()
+        try:
+            self.run_case(case)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return peak / 2**20
+
+    def run(self) -> pd.DataFrame:
+        cases_ = self.cases()
+        rows: list[dict] = list()
+
+        for case in (tqdm(cases_) if self.PROGRESS_BAR else cases_):
+            runs = [self.run_case(case) for _ in range(self.repeat)]
+            best = min(runs, key=lambda run_: run_['seconds'])
+
+            rows.append({
+                **case,
+                'seconds': round(best['seconds'], 6),
+                'lineups': best['lineups'],
+                'lineups_per_sec': round(best['lineups'] / best['seconds'], 1) if best['seconds'] > 0 else np.nan,
+                'peak_mb': round(self.peak_memory(case), 3),
+                'cache_entries': best['cache_entries'],
+            })
+
+        self.results = pd.DataFrame(rows)
+        return self.results
+
+    def check_updates(self, **kwargs) -> pd.DataFrame:
+        """
+        Engine.update_player vs an engine built from scratch on the same values, one row per update
+        The same few players are updated over and over --> stale cached results show up as a mismatch
+            players --> pool size, mode --> engine mode, n_updates --> updates per pool, targets --> players updated
+        """
+        n_players: int = kwargs.get('players', 14)
+        mode: str = kwargs.get('mode', 'python')
+        n_updates: int = kwargs.get('n_updates', 20)
+        n_targets: int = kwargs.get('targets', 3)
+        rng = np.random.default_rng(self.seed)
+
+        data = synthetic_pool(n_players, seed=self.seed)
+        engine = Engine(data.copy(), mode=mode, past=True, workers=1, progress_bar=False)
+        targets: list[str] = list(engine.names[:n_targets])
+        engine.Lineups(top_n=self.top_n)
+
+        rows: list[dict] = list()
+        for update in range(n_updates):
+            name: str = targets[update % n_targets]
+            fpts: float = round(float(rng.uniform(2.5, 40.0)), 2)
+            salary: int = 200 * int(rng.integers(5, 62))
+
+            engine.update_player(name, fpts=fpts, salary=salary)
+            data.loc[name, ['fpts', 'salary']] = [fpts, salary]
+
+            patched = engine.Lineups(top_n=self.top_n)
+            fresh = Engine(data.copy(), mode=mode, past=True, workers=1, progress_bar=False).Lineups(top_n=self.top_n)
+
+            rows.append({
+                'update': update,
+                'player': name,
+                'fpts': fpts,
+                'salary': salary,
+                'match': bool(
+                    len(patched) == len(fresh)
+                    and np.allclose(patched['fpts'], fresh['fpts'])
+                    and (patched['salary'].to_numpy() == fresh['salary'].to_numpy()).all()
+                ),
+            })
+
+        return pd.DataFrame(rows)
+
+    def save_baseline(self, **kwargs) -> str:
+        """
+        Last run --> baseline JSON (with the machine it ran on, timings only compare on the same box)
+        """
+        fpath: str = kwargs.get('fpath', self.baseline_fpath)
+        results = self.results if self.results is not None else self.run()
+
+        with open(fpath, 'w') as f:
+            json.dump({
+                'machine': platform.platform(),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'results': results.to_dict(orient='records'),
+            }, f, indent=2)
+
+        return fpath
+
+    def compare(self, **kwargs) -> pd.DataFrame:
+        """
+        Last run vs baseline, per case:
+            time_ratio / memory_ratio --> now / baseline (above 1 is slower / bigger)
+            regression --> either ratio past 1 + tolerance, or a different lineup count (results changed)
+        """
+        fpath: str = kwargs.get('fpath', self.baseline_fpath)
+        tolerance: float = kwargs.get('tolerance', 0.25)
+
+        # Timings only mean something on the machine they ran on --> no baseline ships with the repo
+        if not os.path.exists(fpath):
+            raise FileNotFoundError(f'No baseline at {fpath}, run save_baseline() on this machine first')
+
+        with open(fpath) as f:
+            baseline = pd.DataFrame(json.load(f)['results'])
+
+        results = self.results if self.results is not None else self.run()
+
+        merged = results.merge(baseline, on=CASE_KEYS, how='left', suffixes=('', '_baseline'))
+
+        return (merged
+                .assign(
+                    time_ratio=lambda df_: (df_['seconds'] / df_['seconds_baseline']).round(3),
+                    memory_ratio=lambda df_: (df_['peak_mb'] / df_['peak_mb_baseline']).round(3),
+                    changed=lambda df_: df_['lineups_baseline'].notna() & (df_['lineups'] != df_['lineups_baseline']),
+                    regression=lambda df_: (df_['time_ratio'] > 1 + tolerance) | (df_['memory_ratio'] > 1 + tolerance) | df_['changed'],
+                )
+                [CASE_KEYS + ['seconds', 'seconds_baseline', 'time_ratio', 'peak_mb', 'peak_mb_baseline', 'memory_ratio', 'lineups', 'changed', 'regression']]
+               )
@@ -0,0 +1,133 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from bs4 import BeautifulSoup
+
+from tqdm.notebook import tqdm
+
+from scraper._html import uncomment_tables
+from scraper._info import (
+    ADV_PASSING_COLUMNS,
+    ADV_RECEIVING_COLUMNS,
+    ADV_RUSHING_COLUMNS,
+    DEFENSIVE_TD_COLUMNS,
+    OFFENSIVE_COLUMNS
+)
+from scraper._pagecache import PageCache
+from scraper._tables import PARSER, BoxscorePage
+
+
+"""
+
+BOXSCORE PARSING BENCHMARK
+
+Old extraction (whole page into html.parser, find_all per table id and per data-stat column) vs BoxscorePage (one strained parse, one walk per table)
+Pages come from the scraper's page cache --> offline, same pages every run
+Both sides read the same columns the scraper files, and have to give the same values
+
+"""
+
+# Columns the scraper reads from each table (besides player names)
+TABLE_COLUMNS: dict[str, list[str]] = {
+    'player_offense': OFFENSIVE_COLUMNS[1:],
+    'player_defense': DEFENSIVE_TD_COLUMNS,
+    'kicking': ['team', 'xpm', 'fgm'],
+    'vis_snap_counts': ['pos', 'offense', 'off_pct'],
+    'home_snap_counts': ['pos', 'offense', 'off_pct'],
+    'passing_advanced': ADV_PASSING_COLUMNS[1:],
+    'rushing_advanced': ADV_RUSHING_COLUMNS[1:],
+    'receiving_advanced': ADV_RECEIVING_COLUMNS[1:],
+}
+
+
+def legacy_tables(html: str) -> dict[str, dict[str, list[str]]]:
+    """
+    Same calls get_week_boxscores used to make --> {table id: {column: values}}
+    """
+    game_soup = BeautifulSoup(html, 'html.parser')
+    scorebox = game_soup.find_all('div', class_='scorebox')[0]
+    scorebox.find_all('strong')
+
+    tables: dict[str, dict[str, list[str]]] = dict()
+    for table_id, columns in TABLE_COLUMNS.items():
+        table = game_soup.find_all('table', id=table_id)[0]
+        tables[table_id] = {
+            'player': [tag.get_text() for tag in table.find_all('th', attrs={'data-stat': 'player'}) if tag.get_text() != 'Player'],
+            **{stat: [td.get_text() for td in table.find_all('td', attrs={'data-stat': stat})] for stat in columns},
+        }
+
+    return tables
+
+
+def single_pass_tables(html: str, **kwargs) -> dict[str, dict[str, list[str]]]:
+    page = BoxscorePage(html, **kwargs)
+    page.teams()
+    return {
+        table_id: {stat: page.column(table_id, stat) for stat in ['player'] + list(columns)}
+        for table_id, columns in TABLE_COLUMNS.items()
+    }
+
+
+class ParseBenchmark:
+    def __init__(self, cache_dir: str, **kwargs):
+        """
+        cache_dir --> scraper page cache (data/html-cache), every cached boxscore page is timed
+        max_pages --> only the first max_pages boxscores
+        parsers --> BoxscorePage backends to time (html.parser, plus lxml if installed)
+        """
+        self.cache = PageCache(cache_dir)
+        self.urls: list[str] = [url for url in self.cache.index if '/boxscores/' in url][:kwargs.get('max_pages', None)]
+
+        self.parsers: tuple[str,...] = tuple(kwargs.get('parsers', tuple(dict.fromkeys(('html.parser', PARSER)))))
+        self.repeat: int = kwargs.get('repeat', 3)
+        self.PROGRESS_BAR = kwargs.get('progress_bar', True)
+
+        self.results = None
+
+    def time_best(self, func, *args, **kwargs) -> tuple[float, object]:
+        best: float = float('inf')
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    def run(self) -> pd.DataFrame:
+        """
+        One row per page and backend --> seconds for both, speedup, whether the values match
+        """
+        rows: list[dict] = list()
+
+        for url in (tqdm(self.urls) if self.PROGRESS_BAR else self.urls):
+            html = uncomment_tables(self.cache.read(url))
+            legacy_seconds, legacy = self.time_best(legacy_tables, html)
+
+            for parser in self.parsers:
+                seconds, tables = self.time_best(single_pass_tables, html, parser=parser)
+                rows.append({
+                    'url': url,
+                    'kb': round(len(html) / 1024, 1),
+                    'parser': parser,
+                    'legacy_seconds': round(legacy_seconds, 5),
+                    'seconds': round(seconds, 5),
+                    'speedup': round(legacy_seconds / seconds, 2) if seconds > 0 else np.nan,
+                    'same': tables == legacy,
+                })
+
+        self.results = pd.DataFrame(rows)
+        return self.results
+
+    def summary(self) -> pd.DataFrame:
+        results = self.results if self.results is not None else self.run()
+        return (results
+                .groupby('parser')
+                .agg(
+                    pages=('url', 'size'),
+                    legacy_ms=('legacy_seconds', lambda s_: round(1000*s_.mean(), 2)),
+                    ms=('seconds', lambda s_: round(1000*s_.mean(), 2)),
+                    speedup=('speedup', 'median'),
+                    all_same=('same', 'all'),
+                )
+               )
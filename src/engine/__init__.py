@@ -1,3 +1,8 @@
 from .engine import Engine
+from .classic import ClassicEngine
+from .pool import PlayerPool
+from .sink import LineupReader, LineupWriter
+from .simulation import Simulator
+from .sites import SiteRules
 
 version='1.0.0'
\ No newline at end of file
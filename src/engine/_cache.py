@@ -0,0 +1,143 @@
+import functools
+
+from collections import OrderedDict
+
+
+"""
+
+BOUNDED PER-INSTANCE METHOD CACHES
+
+Replaces functools.cache on instance methods, which keyed on self (keeping engines alive forever) and never evicted
+Each instance owns one LRUCache per @cached method in self.caches --> gone with the instance
+A method whose cache is None (no_cache=...) just runs uncached
+
+"""
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int|None = 2**16):
+
+        # None --> unbounded
+        self.maxsize = maxsize
+        self.store: OrderedDict = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def get(self, key, default=None):
+        try:
+            value = self.store[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.store.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value) -> None:
+        self.store[key] = value
+        self.store.move_to_end(key)
+
+        if self.maxsize is not None and len(self.store) > self.maxsize:
+            self.store.popitem(last=False)
+            self.evictions += 1
+
+    def evict(self, predicate) -> int:
+        """
+        Drops every entry whose key matches predicate(key), returns how many went
+        """
+        stale = [key for key in self.store if predicate(key)]
+        for key in stale:
+            del self.store[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self.store.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int|None]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.store),
+            'maxsize': self.maxsize,
+            'evictions': self.evictions,
+        }
+
+
+def cached(func):
+    """
+    Instance method decorator --> looks up self.caches[func.__name__]
+    """
+    name: str = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        cache_ = self.caches.get(name)
+        if cache_ is None:
+            return func(self, *args, **kwargs)
+
+        key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+
+        value = cache_.get(key, _MISSING)
+        if value is _MISSING:
+            value = func(self, *args, **kwargs)
+            cache_.put(key, value)
+
+        return value
+
+    wrapper.cached = True
+    return wrapper
+
+
+def method_caches(cls: type, **kwargs) -> dict[str, LRUCache|None]:
+    """
+    One LRUCache per @cached method of cls
+    cache_size --> max entries per method (None for unbounded)
+    no_cache --> method names to leave uncached (lookups only ever hit once per lineup)
+    """
+    maxsize: int|None = kwargs.get('cache_size', 2**16)
+    no_cache: tuple[str,...] = tuple(kwargs.get('no_cache', tuple()))
+
+    return {
+        name: None if name in no_cache else LRUCache(maxsize)
+        for name in dir(cls)
+        if getattr(getattr(cls, name), 'cached', False)
+    }
+
+
+def cache_stats(caches: dict[str, LRUCache|None]) -> dict[str, dict[str, int|None]]:
+    return {name: cache_.stats() for name, cache_ in caches.items() if cache_ is not None}
+
+
+def _mentions(key, value) -> bool:
+    """
+    value anywhere in a (possibly nested) cache key --> lineup tuples, (name, column) pairs etc.
+    """
+    if isinstance(key, tuple):
+        return any(_mentions(part, value) for part in key)
+    return key == value
+
+
+def evict_mentioning(caches: dict[str, LRUCache|None], value) -> int:
+    """
+    Drops cached results for every key that includes value (one player's lineups), the rest stay warm
+    """
+    return sum(
+        cache_.evict(lambda key: _mentions(key, value))
+        for cache_ in caches.values()
+        if cache_ is not None
+    )
+
+
+def clear_caches(caches: dict[str, LRUCache|None]) -> None:
+    for cache_ in caches.values():
+        if cache_ is not None:
+            cache_.clear()
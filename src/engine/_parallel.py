@@ -0,0 +1,92 @@
+import os
+import multiprocessing as mp
+
+import numpy as np
+
+from collections.abc import Iterator
+
+from tqdm.notebook import tqdm
+
+
+"""
+
+CAPTAIN-SHARDED PROCESS POOL
+
+The engine is handed to each worker once through the pool initializer (inherited for free when forking)
+Tasks are just arrays of captain indices, results come back in shard order so output never depends on worker count
+
+"""
+
+# Worker-side engine, set once per process by _init_worker
+_ENGINE = None
+
+
+def _init_worker(engine) -> None:
+    global _ENGINE
+    _ENGINE = engine
+
+
+def _enumerate_shard(captains: np.ndarray) -> np.ndarray:
+    return _ENGINE.enumerate_indices(captains, progress_bar=False)
+
+
+def _search_shard(task: tuple[np.ndarray, int]) -> tuple[np.ndarray, np.ndarray]:
+    captains, top_n = task
+    return _ENGINE.search_indices(captains, top_n, progress_bar=False)
+
+
+def resolve_workers(workers: int|None) -> int:
+    """
+    None / 0 / negative --> every core
+    """
+    if workers is None or workers < 1:
+        return os.cpu_count() or 1
+
+    return int(workers)
+
+
+def shard_captains(captains: np.ndarray, workers: int, per_worker: int = 4) -> list[np.ndarray]:
+    """
+    Contiguous captain shards, a few per worker so uneven captains (cheap vs expensive) balance out
+    """
+    n_shards: int = max(1, min(len(captains), workers*per_worker))
+    return [shard_ for shard_ in np.array_split(captains, n_shards) if len(shard_)]
+
+
+def iter_sharded(engine, func, tasks: list, workers: int, progress_bar: bool = False) -> Iterator:
+    """
+    Maps func over tasks in a process pool primed with engine, yields results in task order as they finish
+    """
+    if not len(tasks):
+        return
+
+    with mp.Pool(processes=min(workers, len(tasks)), initializer=_init_worker, initargs=(engine,)) as pool:
+        results = pool.imap(func, tasks, chunksize=1)
+        if progress_bar:
+            results = tqdm(results, total=len(tasks))
+
+        yield from results
+
+
+def run_sharded(engine, func, tasks: list, workers: int, progress_bar: bool = False) -> list:
+    return list(iter_sharded(engine, func, tasks, workers, progress_bar))
+
+
+def parallel_enumerate(engine, captains: np.ndarray, workers: int, **kwargs) -> np.ndarray:
+    shards = shard_captains(captains, workers)
+    parts = run_sharded(engine, _enumerate_shard, shards, workers, kwargs.get('progress_bar', False))
+
+    return np.concatenate(parts) if len(parts) else np.empty((0, engine.size), dtype=np.int16)
+
+
+def iter_parallel_enumerate(engine, captains: np.ndarray, workers: int, **kwargs) -> Iterator[np.ndarray]:
+    """
+    One captain per task --> workers hold at most one captain's lineups each while streaming
+    """
+    shards = shard_captains(captains, workers, per_worker=len(captains))
+    yield from iter_sharded(engine, _enumerate_shard, shards, workers, kwargs.get('progress_bar', False))
+
+
+def parallel_search(engine, captains: np.ndarray, top_n: int, workers: int, **kwargs) -> list[tuple[np.ndarray, np.ndarray]]:
+    tasks = [(shard_, top_n) for shard_ in shard_captains(captains, workers)]
+    return run_sharded(engine, _search_shard, tasks, workers, kwargs.get('progress_bar', False))
@@ -0,0 +1,127 @@
+import numpy as np
+
+
+"""
+
+PORTFOLIO SELECTION
+
+Greedy pass over candidate lineups sorted best first, one block of candidates at a time
+A candidate is taken when it passes two vectorized checks against what's picked so far:
+    - exposure --> nobody in it has hit their cap
+    - uniqueness --> differs from every picked lineup by at least min_unique slots
+Picks stop as soon as the portfolio is full --> only the candidates up to the last pick are ever checked
+Running out of candidates keeps the picks (PortfolioSelection), the deeper list is only scanned for the rest
+
+"""
+
+# Past this many candidates a full vectorized enumeration + sort beats the heap search
+FULL_ENUMERATION_DEPTH: int = 20_000
+
+
+def exposure_caps(names: tuple[str,...], n_lineups: int, **kwargs) -> np.ndarray:
+    """
+    Max number of lineups each player can be in
+    max_exposure --> default fraction for everyone, exposures --> {name: fraction} overrides
+    """
+    max_exposure: float = kwargs.get('max_exposure', 1.0)
+    exposures: dict[str, float] = kwargs.get('exposures', dict())
+
+    fractions = np.array([exposures.get(name, max_exposure) for name in names], dtype=float)
+
+    # Small tolerance so 0.3 * 10 is 3, not 2
+    return np.floor(fractions * n_lineups + 1e-9).astype(np.int64)
+
+
+class PortfolioSelection:
+    def __init__(self, n_players: int, n_lineups: int, caps: np.ndarray, **kwargs):
+        """
+        Greedy portfolio state --> picked lineups + exposure counts, kept while candidates are searched deeper
+        min_unique --> slots any two picked lineups must differ by (at least 1, no lineup twice)
+        captain --> column 0 is its own slot (same player at CPT vs FLEX counts as different)
+        block_size --> candidates checked per step
+        """
+        self.n_players = n_players
+        self.n_lineups = n_lineups
+        self.caps = caps
+        self.min_unique: int = max(kwargs.get('min_unique', 1), 1)
+        self.CAPTAIN = kwargs.get('captain', True)
+        self.block_size: int = kwargs.get('block_size', 4_096)
+
+        self.counts = np.zeros(n_players, dtype=np.int64)
+
+        # Picked lineups in order, and which slot tokens each one holds (uniqueness checks)
+        self.picked: list[np.ndarray] = list()
+        self.members = np.zeros((n_lineups, 2*n_players if self.CAPTAIN else n_players), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.picked)
+
+    @property
+    def full(self) -> bool:
+        return len(self.picked) >= self.n_lineups
+
+    @property
+    def lineups(self) -> np.ndarray:
+        if not len(self.picked):
+            return np.empty((0, 0), dtype=np.int64)
+        return np.vstack(self.picked)
+
+    def tokens(self, lineups: np.ndarray) -> np.ndarray:
+        tokens = lineups.astype(np.int64)
+        if self.CAPTAIN:
+            tokens[:, 0] += self.n_players
+        return tokens
+
+    def alive(self, lineups: np.ndarray, tokens: np.ndarray) -> np.ndarray:
+        """
+        Candidates still allowed --> nobody capped out, min_unique slots different from every pick
+        Caps go first (cheap), uniqueness only on what's left
+        """
+        alive = ~(self.counts >= self.caps)[lineups].any(axis=1)
+
+        n_picked: int = len(self.picked)
+        if n_picked and alive.any():
+            rows = np.flatnonzero(alive)
+            # (picks, rows) slots shared with each pick
+            shared = self.members[:n_picked][:, tokens[rows]].sum(axis=2)
+            alive[rows] = (lineups.shape[1] - shared >= self.min_unique).all(axis=0)
+
+        return alive
+
+    def pick(self, lineup: np.ndarray, tokens: np.ndarray) -> None:
+        self.members[len(self.picked), tokens] = True
+        self.picked.append(lineup)
+        self.counts[np.unique(lineup)] += 1
+
+    def scan(self, lineups: np.ndarray) -> bool:
+        """
+        lineups --> (n_candidates, size) player ids, best first
+        Takes the first allowed candidate until n_lineups are picked, one block at a time
+        A deeper candidate list can be scanned again later --> everything before is already ruled out, picks stay
+        Returns whether n_lineups are picked
+        """
+        for start in range(0, len(lineups), self.block_size):
+            block = lineups[start:start+self.block_size]
+            tokens = self.tokens(block)
+
+            offset: int = 0
+            while not self.full and offset < len(block):
+                alive = self.alive(block[offset:], tokens[offset:])
+                if not alive.any():
+                    break
+
+                row = offset + int(np.argmax(alive))
+                self.pick(block[row], tokens[row])
+                offset = row + 1
+
+            if self.full:
+                return True
+
+        return self.full
+
+
+def default_depth(n_lineups: int) -> int:
+    """
+    Candidates searched on the first pass, grows x4 whenever the constraints eat through them
+    """
+    return max(1_000, 100 * n_lineups)
@@ -0,0 +1,142 @@
+import functools
+
+import numpy as np
+
+from .pool import POSITIONS
+
+
+"""
+
+PRECOMPILED POSITION / TEAM RULES
+
+A team's share of a lineup is encoded as one small integer: counts of QB, RB, WR, TE, K, DST, other in base 7
+Every possible team composition is evaluated once into a lookup table, so checking a lineup is a few table reads
+Same rules (and same TEAMS ordering) as the original dict-based Checker.positioncheck
+
+"""
+
+RADIX: int = 7 # At most 6 of anything in a lineup (DraftKings roster size, FanDuel is 5)
+SLOTS: int = len(POSITIONS) + 1 # Standard positions + one bucket for everything else
+
+# Per-team table codes
+DECIDE_TRUE: int = 1
+DECIDE_FALSE: int = 2
+DECISION_MASK: int = 3
+OVER_LIMIT: int = 4
+
+
+@functools.lru_cache(maxsize=8)
+def team_rule_table(position_limits: tuple[tuple[str, int],...], size: int = 6) -> np.ndarray:
+    """
+    table[key] for every base-7 team composition key (size --> roster size, 5-1 split on 6 players, 4-1 on 5):
+        OVER_LIMIT bit --> team has more of a position than position_limits allows
+        low two bits --> what the per-team loop in positioncheck decides for this team (0 = keep going)
+    """
+    keys = np.arange(RADIX**SLOTS, dtype=np.int32)
+    counts = np.stack([(keys // RADIX**slot) % RADIX for slot in range(SLOTS)], axis=1)
+    count = lambda pos_: counts[:, POSITIONS.index(pos_)]
+
+    total = counts.sum(axis=1)
+
+    over_limit = np.zeros(len(keys), dtype=bool)
+    for pos_, limit_ in position_limits:
+        if pos_ not in POSITIONS:
+            raise ValueError(f'Position limit on {pos_} not supported, must be one of {POSITIONS}')
+        over_limit |= count(pos_) > limit_
+
+    # Rules in the same order as the loop --> first one that applies decides for the team
+    five_one = total == size-1
+    single = ~five_one & (total == 1)
+    lonely_te = ~five_one & ~single & (count('TE') > 0) & (count('QB') == 0)
+
+    decision = np.zeros(len(keys), dtype=np.int8)
+    decision[five_one] = np.where(count('K')[five_one] + count('DST')[five_one] > 0, DECIDE_TRUE, DECIDE_FALSE)
+    decision[single] = np.where(count('WR')[single] > 0, DECIDE_TRUE, DECIDE_FALSE)
+    decision[lonely_te] = DECIDE_FALSE
+
+    return (decision | (over_limit.astype(np.int8) * OVER_LIMIT)).astype(np.int8)
+
+
+class PositionRules:
+    def __init__(self, team: np.ndarray, pos: np.ndarray, team_order: list[int], position_limits: dict[str, int], size: int = 6):
+        """
+        team / pos --> pool code arrays, team_order --> team codes in the order Checker.TEAMS walks them
+        size --> roster size (site rules)
+        """
+        if size >= RADIX:
+            raise ValueError(f'Rosters of up to {RADIX-1} players supported, got {size}')
+
+        self.team = team.astype(np.int64)
+        self.team_order = list(team_order)
+        self.n_teams: int = int(team.max()) + 1 if len(team) else 0
+
+        # Each player adds RADIX**slot to their team's key
+        slot = np.minimum(pos.astype(np.int64), SLOTS-1)
+        slot[pos < 0] = SLOTS-1
+        self.weight = RADIX**slot
+
+        self.is_qb = pos == POSITIONS.index('QB')
+        self.is_k = pos == POSITIONS.index('K')
+        self.is_dst = pos == POSITIONS.index('DST')
+
+        self.table = team_rule_table(tuple(sorted(position_limits.items())), size)
+
+        # Plain lists for the one-lineup-at-a-time path
+        self._team = self.team.tolist()
+        self._weight = self.weight.tolist()
+        self._qb = self.is_qb.tolist()
+        self._k = self.is_k.tolist()
+        self._dst = self.is_dst.tolist()
+
+    def check(self, lineup: tuple[int,...]|list[int]) -> bool:
+        """
+        Single lineup of player ids
+        """
+        if sum(self._k[i] for i in lineup) == 2 or sum(self._dst[i] for i in lineup) == 2 or not any(self._qb[i] for i in lineup):
+            return False
+
+        keys = [0] * self.n_teams
+        for i in lineup:
+            keys[self._team[i]] += self._weight[i]
+
+        codes = [int(self.table[key]) for key in keys]
+        if any(code & OVER_LIMIT for code in codes):
+            return False
+
+        for t in self.team_order:
+            decision = codes[t] & DECISION_MASK
+            if decision:
+                return decision == DECIDE_TRUE
+
+        return True
+
+    def check_bulk(self, lineups: np.ndarray) -> np.ndarray:
+        """
+        Bool mask over an (n_lineups, size) matrix of player ids
+        """
+        n: int = len(lineups)
+        rows = np.arange(n)
+
+        keys = np.zeros((n, self.n_teams), dtype=np.int64)
+        for col in range(lineups.shape[1]):
+            players = lineups[:, col]
+            keys[rows, self.team[players]] += self.weight[players]
+
+        codes = self.table[keys]
+
+        ok = ~(
+            (self.is_k[lineups].sum(axis=1) == 2)
+            | (self.is_dst[lineups].sum(axis=1) == 2)
+            | ~self.is_qb[lineups].any(axis=1)
+            | (codes & OVER_LIMIT).any(axis=1)
+        )
+
+        result = np.ones(n, dtype=bool)
+        decided = np.zeros(n, dtype=bool)
+        for t in self.team_order:
+            decision = codes[:, t] & DECISION_MASK
+            new = ~decided & (decision > 0)
+            result[new] = decision[new] == DECIDE_TRUE
+            decided |= new
+
+        return ok & result
@@ -0,0 +1,120 @@
+import numpy as np
+
+from collections.abc import Iterator
+
+from tqdm.notebook import tqdm
+
+from ._vectorized import combination_matrix, order_by_salary
+
+
+"""
+
+SALARY-ORDERED ENUMERATION
+
+Everything about a FLEX combination that doesn't depend on the captain is worked out once per call, not once per captain:
+    - salary sum of every combination, combinations sorted by it
+    - each combination's players in Checker.order (salary descending) --> no argsort per captain
+    - combinations with every player on one team (team check)
+Per captain the salary window is two searchsorted calls on the sorted sums --> only that block of combinations is touched,
+everything under mincost / over maxcost is skipped whole (lineup_filters maxcost narrows it further)
+Combinations holding the captain are dropped, the rest put back in itertools order --> same rows as iter_lineups
+
+"""
+
+class SalaryCombinations:
+    def __init__(self, salary: np.ndarray, team: np.ndarray, k: int):
+        """
+        Every k-subset of the pool (itertools order) --> salary sum, players in salary order, team if all on one (-1 otherwise)
+        """
+        self.combos: np.ndarray = combination_matrix(len(salary), k)
+
+        # Same sum, column for column, as iter_lineups takes per captain --> identical floats in the salary checks
+        self.sums: np.ndarray = salary[self.combos].sum(axis=1)
+
+        self.by_sum: np.ndarray = np.argsort(self.sums, kind='stable')
+        self.sorted_sums: np.ndarray = self.sums[self.by_sum]
+
+        self.flex: np.ndarray = order_by_salary(self.combos, salary)
+
+        teams = team[self.combos]
+        self.single_team: np.ndarray = np.where((teams == teams[:, :1]).all(axis=1), teams[:, 0], -1)
+
+    def window(self, lo: float, hi: float) -> np.ndarray:
+        """
+        Rows (itertools order) with lo <= salary sum <= hi
+        """
+        start: int = int(np.searchsorted(self.sorted_sums, lo, side='left'))
+        stop: int = int(np.searchsorted(self.sorted_sums, hi, side='right'))
+        return np.sort(self.by_sum[start:stop])
+
+
+def iter_salary_ordered(
+    salary: np.ndarray,
+    team: np.ndarray,
+    captains: np.ndarray,
+    size: int,
+    mincost: float,
+    maxcost: float,
+    **kwargs
+) -> Iterator[np.ndarray]:
+    """
+    Yields (n, size) blocks of player indices passing the team + salary checks
+    Same rows, in the same order, as _vectorized.enumerate_lineups
+    Optional row_filter(lineups) -> bool mask for any additional checks
+    Optional cpt_salary --> captain salary multiplier (site rules)
+    """
+
+    row_filter = kwargs.get('row_filter', None)
+    cpt_salary: float = kwargs.get('cpt_salary', 1.5)
+
+    combos = SalaryCombinations(salary, team, size-1)
+
+    cpt_iter = tqdm(captains) if kwargs.get('progress_bar', False) else captains
+
+    for cpt in cpt_iter:
+
+        cpt_cost: float = cpt_salary*salary[cpt]
+
+        # A dollar of slack either side, the edges are checked with the exact sums below
+        rows = combos.window(mincost - cpt_cost - 1, maxcost - cpt_cost + 1)
+        if not len(rows):
+            continue
+
+        cost = cpt_cost + combos.sums[rows]
+        keep = (
+            (cost >= mincost)
+            & (cost <= maxcost)
+            & (combos.single_team[rows] != team[cpt])
+            & (combos.combos[rows] != cpt).all(axis=1)
+        )
+
+        if not keep.any():
+            continue
+
+        flex = combos.flex[rows[keep]]
+        lineups = np.column_stack([np.full(len(flex), cpt, dtype=flex.dtype), flex])
+
+        if row_filter is not None:
+            lineups = lineups[row_filter(lineups)]
+
+        yield lineups
+
+
+def salary_ordered_lineups(
+    salary: np.ndarray,
+    team: np.ndarray,
+    captains: np.ndarray,
+    size: int,
+    mincost: float,
+    maxcost: float,
+    **kwargs
+) -> np.ndarray:
+    """
+    Every block from iter_salary_ordered stacked into one matrix
+    """
+    found = list(iter_salary_ordered(salary, team, captains, size, mincost, maxcost, **kwargs))
+
+    if not len(found):
+        return np.empty((0, size), dtype=np.int64)
+
+    return np.concatenate(found)
@@ -0,0 +1,186 @@
+import heapq
+import itertools
+
+import numpy as np
+
+from tqdm.notebook import tqdm
+
+
+"""
+
+BOUNDED TOP-N SHOWDOWN SEARCH
+
+Depth-first over FLEX players in fpts order, keeping only the best top_n lineups in a min-heap
+Branches are cut when:
+    - the best remaining fpts (fpts-sorted prefix sums) cannot beat the current Nth best lineup
+    - the cheapest remaining completion is over maxcost, or the priciest is under mincost (salary-sorted bounds)
+
+"""
+
+def _salary_bounds(cand_salaries: list[int], k: int) -> tuple[list[list[int]], list[list[int]]]:
+    """
+    cheapest[j][r] / priciest[j][r] --> min / max total salary of r players taken from cand_salaries[j:]
+    """
+    m: int = len(cand_salaries)
+    cheapest = [[0]*(k+1) for _ in range(m+1)]
+    priciest = [[0]*(k+1) for _ in range(m+1)]
+
+    for j in range(m):
+        suffix = sorted(cand_salaries[j:])
+        for r in range(1, k+1):
+            if r > len(suffix):
+                # Not enough players left, never feasible
+                cheapest[j][r] = float('inf')
+                priciest[j][r] = float('-inf')
+                continue
+            cheapest[j][r] = cheapest[j][r-1] + suffix[r-1]
+            priciest[j][r] = priciest[j][r-1] + suffix[-r]
+
+    for r in range(1, k+1):
+        cheapest[m][r] = float('inf')
+        priciest[m][r] = float('-inf')
+
+    return cheapest, priciest
+
+
+def top_lineups(
+    salary: np.ndarray,
+    fpts: np.ndarray,
+    team: np.ndarray,
+    captains: np.ndarray,
+    size: int,
+    mincost: float,
+    maxcost: float,
+    top_n: int,
+    **kwargs
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns ((<= top_n, size) matrix of player indices, fpts of each), best lineup first
+    Column 0 is captain, FLEX ordered like Checker.order (salary descending, ties keep pool order)
+    Optional leaf_check(lineup: tuple[int,...]) -> bool for rules beyond team + salary (positions etc.)
+    Optional required --> player index every lineup has to include (as captain or FLEX)
+    Optional excluded --> bool mask of players never used (inactive)
+    Optional floor --> lineups at or below this fpts aren't wanted, prunes like a full heap from the start
+    Optional cpt_salary / cpt_fpts --> captain multipliers (site rules, both 1.5 on DraftKings)
+
+    Ties in fpts go to the smaller index tuple --> the result only depends on the captains searched, not the order
+    So searches over disjoint captain shards can be merged with merge_top
+    """
+
+    leaf_check = kwargs.get('leaf_check', None)
+    required: int|None = kwargs.get('required', None)
+    excluded = kwargs.get('excluded', None)
+    floor: float = kwargs.get('floor', float('-inf'))
+    cpt_salary: float = kwargs.get('cpt_salary', 1.5)
+    cpt_fpts: float = kwargs.get('cpt_fpts', 1.5)
+    k: int = size-1
+
+    # (fpts, negated lineup, lineup) --> heap[0] is the worst lineup kept
+    heap: list[tuple[float, tuple[int,...], tuple[int,...]]] = list()
+
+    # Floating point slack so sums done in a different order never cut a lineup that ties
+    eps: float = 1e-9
+
+    by_fpts: list[int] = [int(i) for i in np.argsort(-fpts, kind='stable')]
+    if excluded is not None:
+        by_fpts = [i for i in by_fpts if not excluded[i]]
+        captains = [c for c in captains if not excluded[c]]
+
+    # Best captains first --> heap fills with good lineups early, cuts get tighter sooner
+    cpt_order = sorted((int(c) for c in captains), key=lambda c: (-fpts[c], c))
+    cpt_iter = tqdm(cpt_order) if kwargs.get('progress_bar', False) else cpt_order
+
+    def threshold() -> float:
+        return max(heap[0][0], floor) if len(heap) == top_n else floor
+
+    for cpt in cpt_iter:
+
+        # Required player not at captain --> already in the FLEX, search fills the rest
+        fixed: list[int] = [required] if required is not None and required != cpt else list()
+        k_: int = k - len(fixed)
+
+        cand: list[int] = [i for i in by_fpts if i != cpt and i not in fixed]
+        cand_fpts: list[float] = [float(fpts[i]) for i in cand]
+        cand_salaries: list[int] = [int(salary[i]) for i in cand]
+        cand_teams: list[int] = [int(team[i]) for i in cand]
+        cpt_team: int = int(team[cpt])
+        m: int = len(cand)
+
+        # prefix[x+r] - prefix[x] = best fpts for r players starting at x (cand sorted by fpts)
+        prefix = [0.0] + list(itertools.accumulate(cand_fpts))
+        cheapest, priciest = _salary_bounds(cand_salaries, k_)
+
+        cpt_pts: float = cpt_fpts*float(fpts[cpt]) + sum(float(fpts[i]) for i in fixed)
+        cpt_cost: float = cpt_salary*float(salary[cpt]) + sum(float(salary[i]) for i in fixed)
+        fixed_same_team: bool = all(int(team[i]) == int(team[cpt]) for i in fixed)
+
+        if m < k_ or cpt_pts + prefix[k_] + eps < threshold():
+            continue
+
+        chosen: list[int] = list()
+
+        def search(start: int, remaining: int, cost: float, pts: float) -> None:
+
+            if not remaining:
+                if cost < mincost or cost > maxcost:
+                    return
+                if fixed_same_team and all(cand_teams[x] == cpt_team for x in chosen):
+                    return
+
+                flex = sorted([cand[x] for x in chosen] + fixed, key=lambda i: (-salary[i], i))
+                lineup = (cpt, *flex)
+
+                if leaf_check is not None and not leaf_check(lineup):
+                    return
+
+                entry = (pts, tuple(-i for i in lineup), lineup)
+                if len(heap) < top_n:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+                return
+
+            for x in range(start, m-remaining+1):
+                # fpts only get worse further down the list --> nothing after x can beat the cut either
+                if pts + prefix[x+remaining] - prefix[x] + eps < threshold():
+                    break
+
+                cost_ = cost + cand_salaries[x]
+                if cost_ + cheapest[x+1][remaining-1] > maxcost:
+                    continue
+                if cost_ + priciest[x+1][remaining-1] < mincost:
+                    continue
+
+                chosen.append(x)
+                search(x+1, remaining-1, cost_, pts + cand_fpts[x])
+                chosen.pop()
+
+        search(0, k_, cpt_cost, cpt_pts)
+
+    best = sorted(heap, key=lambda entry: (-entry[0], entry[2]))
+    if not len(best):
+        return np.empty((0, size), dtype=np.int64), np.empty(0, dtype=float)
+
+    return (
+        np.array([entry[2] for entry in best], dtype=np.int64),
+        np.array([entry[0] for entry in best], dtype=float)
+    )
+
+
+def merge_top(parts: list[tuple[np.ndarray, np.ndarray]], top_n: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Combines top_lineups results from disjoint captain shards --> same tie-breaking as a single search
+    """
+    if not len(parts):
+        return np.empty((0, size), dtype=np.int64), np.empty(0, dtype=float)
+
+    lineups = np.concatenate([part[0] for part in parts])
+    pts = np.concatenate([part[1] for part in parts])
+
+    if not len(lineups):
+        return lineups, pts
+
+    # lexsort --> last key is primary: fpts descending, then lineup tuple ascending
+    keys = [lineups[:, col] for col in reversed(range(lineups.shape[1]))] + [-pts]
+    order = np.lexsort(keys)[:top_n]
+    return lineups[order], pts[order]
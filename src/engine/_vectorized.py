@@ -0,0 +1,149 @@
+import math
+import itertools
+
+import numpy as np
+
+from collections.abc import Iterator
+
+from tqdm.notebook import tqdm
+
+
+"""
+
+VECTORIZED SHOWDOWN ENUMERATION
+
+Players are encoded as integer indices into salary / fpts / team arrays
+FLEX combinations are built once as an index matrix and reused for every captain
+
+"""
+
+def combination_matrix(n: int, k: int) -> np.ndarray:
+    """
+    Every k-subset of range(n) as rows of an (C(n,k), k) matrix
+    Rows come out in the same order as itertools.combinations(range(n), k)
+    """
+    count: int = math.comb(n, k)
+    flat = np.fromiter(
+        itertools.chain.from_iterable(itertools.combinations(range(n), k)),
+        dtype=np.int16,
+        count=count*k
+    )
+    return flat.reshape(count, k)
+
+
+def order_by_salary(flex: np.ndarray, salary: np.ndarray) -> np.ndarray:
+    """
+    Row-wise equivalent of Checker.order --> salary descending, ties keep pool order
+    """
+    order = np.argsort(-salary[flex], axis=1, kind='stable')
+    return np.take_along_axis(flex, order, axis=1)
+
+
+def lineup_points(lineups: np.ndarray, fpts: np.ndarray, cpt_fpts: float = 1.5) -> np.ndarray:
+    """
+    Same as Checker.points --> cpt_fpts x captain + FLEX summed left to right (keeps floats identical)
+    """
+    flex_fpts = fpts[lineups[:, 1]]
+    for col in range(2, lineups.shape[1]):
+        flex_fpts = flex_fpts + fpts[lineups[:, col]]
+
+    return cpt_fpts*fpts[lineups[:, 0]] + flex_fpts
+
+
+def lineup_costs(lineups: np.ndarray, salary: np.ndarray, cpt_salary: float = 1.5) -> np.ndarray:
+    """
+    Same as Checker.cost --> cpt_salary x captain salary + FLEX salaries
+    """
+    return cpt_salary*salary[lineups[:, 0]] + salary[lineups[:, 1:]].sum(axis=1)
+
+
+def iter_lineups(
+    salary: np.ndarray,
+    fpts: np.ndarray,
+    team: np.ndarray,
+    captains: np.ndarray,
+    size: int,
+    mincost: float,
+    maxcost: float,
+    **kwargs
+) -> Iterator[np.ndarray]:
+    """
+    Yields (n, size) blocks of player indices --> column 0 is captain, rest ordered like Checker.order
+    Only lineups passing the team and salary checks are kept
+    Optional row_filter(lineups) -> bool mask for any additional (non-vectorized) checks
+    Optional required --> only lineups with this player in them (captain or FLEX), same rows otherwise
+    Optional cpt_salary --> captain salary multiplier (site rules, 1.5 on DraftKings)
+    Rows come out in the same order as Engine.generate would append them (without required)
+    """
+
+    batch_size: int = kwargs.get('batch_size', 2**16)
+    row_filter = kwargs.get('row_filter', None)
+    required: int|None = kwargs.get('required', None)
+    cpt_salary: float = kwargs.get('cpt_salary', 1.5)
+
+    n_players: int = len(salary)
+    combos: np.ndarray = combination_matrix(n_players-1, size-1)
+
+    # Required player in the FLEX --> pick the other size-2 from everyone but captain + required
+    if required is not None:
+        required_combos: np.ndarray = combination_matrix(n_players-2, size-2)
+
+    cpt_iter = tqdm(captains) if kwargs.get('progress_bar', False) else captains
+
+    for cpt in cpt_iter:
+
+        cpt_cost: float = cpt_salary*salary[cpt]
+
+        fixed: bool = required is not None and required != cpt
+        cpt_combos: np.ndarray = required_combos if fixed else combos
+
+        for start in range(0, len(cpt_combos), batch_size):
+            # Positions in the pool without the captain --> shift everything at or past captain up by one
+            flex = cpt_combos[start:start+batch_size]
+            if fixed:
+                # Skip both captain and required --> shift past the smaller, then the larger
+                lo, hi = min(cpt, required), max(cpt, required)
+                flex = flex + (flex >= lo)
+                flex = flex + (flex >= hi)
+                flex = np.column_stack([flex, np.full(len(flex), required, dtype=flex.dtype)])
+            else:
+                flex = flex + (flex >= cpt)
+
+            cost = cpt_cost + salary[flex].sum(axis=1)
+            keep = (
+                (cost >= mincost)
+                & (cost <= maxcost)
+                & (team[flex] != team[cpt]).any(axis=1)
+            )
+
+            if not keep.any():
+                continue
+
+            flex = order_by_salary(flex[keep], salary)
+            lineups = np.column_stack([np.full(len(flex), cpt, dtype=flex.dtype), flex])
+
+            if row_filter is not None:
+                lineups = lineups[row_filter(lineups)]
+
+            yield lineups
+
+
+def enumerate_lineups(
+    salary: np.ndarray,
+    fpts: np.ndarray,
+    team: np.ndarray,
+    captains: np.ndarray,
+    size: int,
+    mincost: float,
+    maxcost: float,
+    **kwargs
+) -> np.ndarray:
+    """
+    Every block from iter_lineups stacked into one matrix
+    """
+    found = list(iter_lineups(salary, fpts, team, captains, size, mincost, maxcost, **kwargs))
+
+    if not len(found):
+        return np.empty((0, size), dtype=np.int16)
+
+    return np.concatenate(found)
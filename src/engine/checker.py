@@ -4,16 +4,28 @@ import matplotlib as mpl
 
 import itertools
 from itertools import combinations
-from functools import cache
 from tqdm.notebook import tqdm
 
+from ._cache import cache_stats, cached, clear_caches, evict_mentioning, method_caches
+from ._positions import PositionRules
+from .pool import PlayerPool
+from .sites import SiteRules
+
 
 class Checker:
-    def __init__(self, data: dict[[str], dict[[str], str|float|int]], **kwargs):
+    def __init__(self, pool: PlayerPool, **kwargs):
+
+        self.pool = pool
 
-        self.data = data
+        # Bounded LRU per @cached method --> cache_size=None for unbounded, no_cache=(...) to skip methods
+        self.caches = method_caches(type(self), **kwargs)
 
-        self.TEAMS = tuple(set([self.data[name]['team'] for name in self.data]))
+        self.TEAMS = tuple(set(self.pool.teams))
+
+        # Compiled showdown rules for the site --> roster size, captain multipliers, salary bounds
+        # site_rules={'cap': 55_000, ...} overrides any of the site's rules (keys of SHOWDOWN_SITES entries)
+        self.site_rules = SiteRules(kwargs.get('site', 'draftkings'), **kwargs.get('site_rules', dict()))
+        self.size = self.site_rules.size
 
         # Defaults to optimizing past lineups --> No checks beyond rules for competition
         self.PAST = kwargs.get('past', True)
@@ -26,10 +38,18 @@ class Checker:
             'WR': 2, # Want max 2 WR from a team
             'TE': 1, # Want max 1 TE from a team
         }
+
+        # position_limits + 5-1 split (4-1 on FanDuel) + TE-needs-QB rules compiled into lookup tables, walked in TEAMS order
+        self.rules = PositionRules(
+            self.pool.team,
+            self.pool.pos,
+            [self.pool.teams.index(team_) for team_ in self.TEAMS],
+            self.position_limits,
+            self.size
+        )
         
-        self.mincost = 35_000
-        self.maxcost = 50_000
-        self.size = 6
+        self.mincost = self.site_rules.mincost
+        self.maxcost = self.site_rules.maxcost
 
         if len(kwargs.get('lineup_filters', dict())):
             filters = kwargs['lineup_filters']
@@ -41,38 +61,52 @@ class Checker:
 
             print(*filter_output, sep='\n')
 
-    @cache
+    def cache_info(self) -> dict[str, dict[str, int|None]]:
+        """
+        Hits / misses / size / evictions per cached method
+        """
+        return cache_stats(self.caches)
+
+    def clear(self) -> None:
+        clear_caches(self.caches)
+
+    def evict(self, name: str) -> int:
+        """
+        Drops cached results involving one player (their salary / fpts changed), returns how many
+        """
+        return evict_mentioning(self.caches, name)
+
     def pvalue(self, name: str, value: str) -> float|int:
-        return self.data[name][value]
+        return self.pool.value(self.pool.ids[name], value)
 
-    @cache
+    @cached
     def order(self, names: tuple[str,...], **kwargs) -> tuple[str,...]:
         value: int|float|str = kwargs.get('by', 'salary')
         return tuple(sorted(names, key=lambda p: self.pvalue(p, value), reverse=True))
     
-    @cache
+    @cached
     def pvalues(self, lineup: tuple[str,...], value: str):
         return tuple([self.pvalue(name,value) for name in lineup])
 
-    @cache
+    @cached
     def positions(self, lineup):
         return self.pvalues(lineup,'pos')
     
-    @cache
+    @cached
     def fpts(self, lineup):
         return self.pvalues(lineup,'fpts')
     
-    @cache
+    @cached
     def salaries(self, lineup):
         return self.pvalues(lineup,'salary')
     
-    @cache
+    @cached
     def teams(self, lineup):
         return self.pvalues(lineup,'team')
 
 
     # Recursive
-    @cache
+    @cached
     def cost(self, lineup: tuple[str,...], *args) -> int:
         if len(lineup) == 1:
             return self.pvalue(lineup[0], 'salary')
@@ -83,22 +117,22 @@ class Checker:
             return self.pvalue(head,'salary') + self.cost(lineup[1:], 'no-bonus')
         
         if len(lineup) == self.size:
-            multi: float = 1.0 if 'no-bonus' in args else 1.5
+            multi: float = 1.0 if 'no-bonus' in args else self.site_rules.cpt_salary
             return multi*self.pvalue(lineup[0],'salary') + self.cost(lineup[1:], 'no-bonus')
         
         return sum(self.salaries(lineup))
     
-    @cache
+    @cached
     def points(self, lineup: tuple[str,...], *args) -> float:
         fpts_ = self.fpts(lineup) # tuple of fpts
         bonus: bool = 'no-bonus' not in args
-        return 1.5*fpts_[0] + sum(fpts_[1:]) if bonus else sum(fpts_)
+        return self.site_rules.cpt_fpts*fpts_[0] + sum(fpts_[1:]) if bonus else sum(fpts_)
 
-    @cache
+    @cached
     def teamcheck(self, lineup: tuple[str,...]) -> bool:
         return len(set(self.teams(lineup))) > 1
 
-    @cache
+    @cached
     def salarycheck(self, lineup: tuple[str,...]) -> bool:
         cost_: int = self.cost(lineup)
         if cost_ <= self.maxcost:
@@ -106,53 +140,23 @@ class Checker:
 
         return False
 
-    @cache
+    @cached
     def pointscheck(self, lineup: tuple[str,...]) -> bool:
         return 0.0 not in self.fpts(lineup)
 
-    @cache
+    @cached
     def positioncheck(self, lineup: tuple[str,...]) -> bool:
-
-        lineup_positions = self.positions(lineup)
-        # lineup_fpts = self.fpts(lineup)
-        
-        # Punt check
-        # if len([pts for pts in lineup_fpts if pts <= 6.0]) > 1:
-        #     return False
-
-        # No 2K, 2DST or 0QB lineups
-        if lineup_positions.count('K') == 2 or lineup_positions.count('DST') == 2 or lineup_positions.count('QB') == 0:
-            return False
-        
-        team_positions = {team_: [self.pvalue(name_, 'pos') for name_ in lineup if self.pvalue(name_, 'team') == team_] for team_ in self.TEAMS}
-
-        # Example: {'ATL': {'QB':1, 'WR': 2}, 'JAX': {'QB': 1, 'RB': 1, 'WR': 1}}
-        position_counts = {
-            team_: {
-                pos_: positions_.count(pos_) for pos_ in set(positions_)
-            }
-            for team_, positions_ in team_positions.items()
-        }
-
-        
-        for pos_, limit_ in self.position_limits.items():
-            if any([position_counts[team_].get(pos_, 0) > limit_ for team_ in self.TEAMS]):
-                return False
-
-        for pos_counts in position_counts.values():
-            # If 5, 1 distribution, have either DST or K or both
-            if sum(pos_counts.values()) == 5:
-                return bool(sum([pos_counts.get(pos_, 0) for pos_ in ('K', 'DST')]))
-
-            # If 5,1 distribution, have only WR as 1
-            if sum(pos_counts.values()) == 1:
-                return bool(pos_counts.get('WR', 0))
-
-            # 75% of all TE lineups are stacked with QB
-            if 'TE' in pos_counts and 'QB' not in pos_counts:
-                return False
-        
-        return True
+        """
+        No 2K, 2DST or 0QB lineups, max RB / WR / TE per team (position_limits)
+        First team (TEAMS order) with a 5-1 split (4-1 for 5-man rosters) needs K or DST on the 5 side / only a WR as the 1, or has a TE without QB, decides
+        """
+        return self.rules.check([self.pool.ids[name_] for name_ in lineup])
+
+    def positioncheck_bulk(self, lineups: np.ndarray) -> np.ndarray:
+        """
+        positioncheck over a (n_lineups, size) matrix of player ids at once
+        """
+        return self.rules.check_bulk(lineups)
 
     def teammatecheck(self, lineup: tuple[str,...]) -> bool:
         return True
@@ -0,0 +1,264 @@
+import numpy as np
+import pandas as pd
+
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from .pool import POSITIONS, PlayerPool
+from .sites import CLASSIC_SITES
+from .stacks import StackClassifier
+
+
+"""
+
+CLASSIC (MAIN SLATE) OPTIMIZER ENGINE
+
+9-slot rosters are far too big to enumerate --> each lineup is a 0/1 integer program solved with HiGHS (scipy.optimize.milp)
+Top N comes from re-solving with a cut that forbids every lineup already found
+
+"""
+
+# Contest files call defenses different things
+POSITION_ALIASES: dict[str, str] = {
+    'D': 'DST',
+    'DEF': 'DST',
+}
+
+
+class ClassicEngine:
+    def __init__(self, data: pd.DataFrame, **kwargs):
+
+        data = (data
+                .loc[data['fpts'] > 2.0]
+                .assign(pos=lambda df_: df_['pos'].replace(POSITION_ALIASES))
+               )
+
+        self.site: str = kwargs.get('site', 'draftkings').lower()
+
+        if self.site not in CLASSIC_SITES:
+            raise ValueError(f'Site {self.site} not supported, must be one of {tuple(CLASSIC_SITES)}')
+
+        self.rules: dict = CLASSIC_SITES[self.site]
+
+        self.pool = PlayerPool(data)
+        self.names = self.pool.names
+
+        slots = self.rules['slots']
+        self.labels = [
+            f'{slot}{slots[:i+1].count(slot)}' if slots.count(slot) > 1 else slot
+            for i, slot in enumerate(slots)
+        ]
+        self.size = len(self.labels)
+        self.multipliers: tuple[float,...] = (1.0,)*self.size # No captain on main slates
+
+        # Same defaults as Checker --> past lineups only follow site rules, otherwise stacking rules on top
+        self.PAST = kwargs.get('past', True)
+        self.position_limits = kwargs.get('position_limits', {'RB': 1, 'WR': 2, 'TE': 1})
+
+        self.maxcost = self.rules['cap']
+        self.mincost = 0
+        if len(kwargs.get('lineup_filters', dict())):
+            filters = kwargs['lineup_filters']
+            self.maxcost = filters.get('maxcost', self.maxcost)
+            self.mincost = filters.get('mincost', self.mincost)
+
+        # Per solve --> seconds before HiGHS returns its best so far, relative optimality gap
+        self.TIME_LIMIT = kwargs.get('time_limit', 30.0)
+        self.MIP_GAP = kwargs.get('mip_gap', 1e-4)
+
+        # stacks=True adds a 'stack' column (STACKS pattern per team) to lineup frames
+        self.stacks = StackClassifier(self.pool, self.size)
+        self.TAG_STACKS = kwargs.get('stacks', False)
+
+        # Games from team / opp (needed for the DraftKings 2 game rule)
+        self.game = None
+        if self.rules['min_games'] and 'opp' not in self.pool.columns:
+            raise ValueError(f"{self.site} needs players from at least {self.rules['min_games']} games --> data needs an opp column")
+        if 'opp' in self.pool.columns:
+            teams = np.array([self.pool.teams[t] for t in self.pool.team], dtype=object)
+            opps = self.pool.columns['opp'].astype(str)
+            games = ['-'.join(sorted(pair)) for pair in zip(teams, opps)]
+            self.game = pd.factorize(pd.Series(games))[0]
+
+        self.build_model()
+
+    def pos_mask(self, pos: str) -> np.ndarray:
+        return self.pool.pos == POSITIONS.index(pos)
+
+    def build_model(self) -> None:
+        """
+        Player variables first, then one indicator per team / game when the site needs a minimum number of them
+        Rows of self.A with bounds self.lb <= A @ x <= self.ub
+        """
+        n: int = len(self.pool)
+        n_teams: int = len(self.pool.teams)
+
+        rows: list[np.ndarray] = list()
+        lbs: list[float] = list()
+        ubs: list[float] = list()
+
+        # Indicator variables after the players
+        groups: list[np.ndarray] = list()
+        group_mins: list[int] = list()
+
+        if self.rules['min_teams']:
+            groups.append(self.pool.team)
+            group_mins.append(self.rules['min_teams'])
+
+        if self.rules['min_games'] and self.game is not None:
+            groups.append(self.game)
+            group_mins.append(self.rules['min_games'])
+
+        n_vars: int = n + sum(int(g.max()) + 1 for g in groups)
+        self.n_vars = n_vars
+
+        def add(coefs: np.ndarray, lb: float, ub: float) -> None:
+            row = np.zeros(n_vars)
+            row[:len(coefs)] = coefs
+            rows.append(row)
+            lbs.append(lb)
+            ubs.append(ub)
+
+        slots = self.rules['slots']
+        n_flex: int = slots.count('FLEX')
+
+        add(np.ones(n), self.size, self.size)
+
+        for pos in ('QB', 'RB', 'WR', 'TE', 'DST'):
+            base: int = slots.count(pos)
+            extra: int = n_flex if pos in self.rules['flex'] else 0
+            add(self.pos_mask(pos).astype(float), base, base + extra)
+
+        # Anything that isn't a rostered position stays out
+        add((~np.isin(self.pool.pos, [POSITIONS.index(p) for p in ('QB', 'RB', 'WR', 'TE', 'DST')])).astype(float), 0, 0)
+
+        add(self.pool.salary.astype(float), self.mincost, self.maxcost)
+
+        if self.rules['max_per_team']:
+            for t in range(n_teams):
+                add((self.pool.team == t).astype(float), 0, self.rules['max_per_team'])
+
+        # indicator <= players from that group, sum of indicators >= minimum
+        offset: int = n
+        for group, minimum in zip(groups, group_mins):
+            n_groups: int = int(group.max()) + 1
+            for g in range(n_groups):
+                row = np.zeros(n_vars)
+                row[:n] = -(group == g).astype(float)
+                row[offset+g] = 1.0
+                rows.append(row)
+                lbs.append(-np.inf)
+                ubs.append(0.0)
+
+            row = np.zeros(n_vars)
+            row[offset:offset+n_groups] = 1.0
+            rows.append(row)
+            lbs.append(minimum)
+            ubs.append(np.inf)
+            offset += n_groups
+
+        if not self.PAST:
+            # Checker-style stacking --> per-team position limits, every QB brings at least one of his pass catchers,
+            # and (same as Checker) a TE only comes with his QB
+            for pos, limit in self.position_limits.items():
+                for t in range(n_teams):
+                    add((self.pos_mask(pos) & (self.pool.team == t)).astype(float), 0, limit)
+
+            catchers = self.pos_mask('WR') | self.pos_mask('TE')
+            for q in np.flatnonzero(self.pos_mask('QB')):
+                coefs = (catchers & (self.pool.team == self.pool.team[q])).astype(float)
+                coefs[q] = -1.0
+                add(coefs, 0, np.inf)
+
+            qbs = self.pos_mask('QB')
+            for te in np.flatnonzero(self.pos_mask('TE')):
+                coefs = (qbs & (self.pool.team == self.pool.team[te])).astype(float)
+                coefs[te] = -1.0
+                add(coefs, 0, np.inf)
+
+        self.A = np.vstack(rows)
+        self.lb = np.array(lbs, dtype=float)
+        self.ub = np.array(ubs, dtype=float)
+
+        self.objective = np.zeros(n_vars)
+        self.objective[:n] = -self.pool.fpts
+
+    def solve(self, A: np.ndarray, lb: np.ndarray, ub: np.ndarray) -> np.ndarray|None:
+        """
+        Returns chosen player ids, None if nothing feasible is left
+        """
+        result = milp(
+            c=self.objective,
+            constraints=LinearConstraint(A, lb, ub),
+            integrality=np.ones(self.n_vars),
+            bounds=Bounds(0, 1),
+            options={'time_limit': self.TIME_LIMIT, 'mip_rel_gap': self.MIP_GAP}
+        )
+
+        if result.x is None or result.status not in (0, 1):
+            return None
+
+        return np.flatnonzero(result.x[:len(self.pool)] > 0.5)
+
+    def arrange(self, players: np.ndarray) -> list[int]:
+        """
+        Chosen players --> roster slots, each position by salary descending, leftover RB/WR/TE in FLEX
+        """
+        remaining = sorted(players.tolist(), key=lambda i: (-self.pool.salary[i], i))
+        lineup: list[int] = list()
+
+        for slot in self.rules['slots']:
+            if slot == 'FLEX':
+                lineup.append(None)
+                continue
+            pick = next(i for i in remaining if self.pool.positions[self.pool.pos[i]] == slot)
+            remaining.remove(pick)
+            lineup.append(pick)
+
+        flex = iter(remaining)
+        return [next(flex) if i is None else i for i in lineup]
+
+    def generate(self, top_n: int) -> list[list[int]]:
+        """
+        Best top_n lineups (player ids in slot order), each solve cuts off every lineup found before it
+        """
+        A, lb, ub = self.A, self.lb, self.ub
+
+        lineups: list[list[int]] = list()
+        while len(lineups) < top_n:
+            players = self.solve(A, lb, ub)
+            if players is None:
+                break
+
+            lineups.append(self.arrange(players))
+
+            # No-good cut --> at most size-1 of these players together again
+            cut = np.zeros(self.n_vars)
+            cut[players] = 1.0
+            A = np.vstack([A, cut])
+            lb = np.append(lb, -np.inf)
+            ub = np.append(ub, self.size - 1)
+
+        return lineups
+
+    def lineups_frame(self, lineups: list[list[int]]) -> pd.DataFrame:
+        names = np.array(self.names, dtype=object)
+        ids = np.array(lineups, dtype=np.int64).reshape(len(lineups), self.size)
+
+        df = pd.DataFrame(data=names[ids], columns=self.labels)
+        df['fpts'] = self.pool.fpts[ids].sum(axis=1)
+        df['salary'] = self.pool.salary[ids].sum(axis=1)
+
+        if self.TAG_STACKS:
+            df['stack'] = self.stacks.lineup_stacks(self.stacks.classify(ids))
+
+        return df
+
+    def Lineups(self, **kwargs) -> pd.DataFrame:
+
+        top_n = kwargs.get('top_n', 10)
+
+        return (self.lineups_frame(self.generate(top_n))
+                .assign(salary=lambda df_: df_.salary.astype('int'))
+                .sort_values('fpts', ascending=False, kind='stable')
+                .reset_index(drop=True)
+               )
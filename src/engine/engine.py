@@ -4,17 +4,22 @@ import matplotlib as mpl
 
 import itertools
 from itertools import combinations
-from functools import cache
 from tqdm.notebook import tqdm
 
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from typing import Type
 
 # from .lineup import Lineup
 from .checker import Checker
-
-from pandarallel import pandarallel
-pandarallel.initialize(progress_bar=False, use_memory_fs=True, verbose=1) # vs 24?
+from ._cache import cache_stats, cached, clear_caches, evict_mentioning, method_caches
+from .pool import PlayerPool
+from ._portfolio import FULL_ENUMERATION_DEPTH, PortfolioSelection, default_depth, exposure_caps
+from ._parallel import iter_parallel_enumerate, parallel_enumerate, parallel_search, resolve_workers
+from ._salary import iter_salary_ordered
+from .stacks import StackClassifier
+from ._topn import merge_top, top_lineups
+from ._vectorized import iter_lineups, lineup_costs, lineup_points
+from .sink import LineupWriter, rechunk
 
 
 """
@@ -27,24 +32,22 @@ class Engine:
     def __init__(self, data: pd.DataFrame, **kwargs):
 
         data = data.loc[data['fpts'] > 2.0]
-        
-        self.data = {
-            name: {
-                column: data.loc[name, column]
-                for column in data.columns
-            }
-            for name in data.index
-        }
 
+        # Integer ids + contiguous salary / fpts / team / pos arrays, shared with Checker
+        self.pool = PlayerPool(data)
 
-        self.names = tuple(self.data.keys())
+        self.names = self.pool.names
         self.values = ('salary', 'fpts', 'team'),
         self.sumcols = ['salary', 'fpts'],
         self.bonuscols = ('salary', 'fpts'),
 
-        self.labels = ['CPT'] + [f'FLEX{n}' for n in range(1,6)]
+        # site='draftkings' / 'fanduel' --> compiled showdown rules (Checker.site_rules), passed down to every fast path
+        self.checker = Checker(self.pool, **kwargs)
+        self.site_rules = self.checker.site_rules
+        self.labels = list(self.site_rules.labels)
         self.size = len(self.labels)
-        self.checker = Checker(self.data, **kwargs)
+        self.multipliers = self.site_rules.multipliers
+        self.caches = method_caches(type(self), **kwargs)
 
         # self.bad_cpts = sum([
         #     kwargs.get('bad_captains', tuple()),
@@ -64,16 +67,49 @@ class Engine:
 
         self.PROGRESS_BAR = kwargs.get('progress_bar', True)
 
+        # STACKS pattern per team --> stacks=True adds a 'stack' column to every lineup frame
+        self.stacks = StackClassifier(self.pool, self.size)
+        self.TAG_STACKS = kwargs.get('stacks', False)
+
+        # Best-first candidate lineups kept between Lineups (topn) / Portfolio calls --> (depth searched, player ids, fpts)
+        # update_player patches these in place instead of starting over
+        self.candidates: tuple[int, np.ndarray, np.ndarray]|None = None
+
+        # Players ruled out after the engine was built (update_player(..., active=False))
+        self.active: np.ndarray = np.ones(len(self.pool), dtype=bool)
+
+        # 'python' --> per-combination loop, 'vectorized' --> numpy index matrices in batches
+        # 'topn' --> Lineups runs a bounded heap search instead of generating every lineup (generate falls back to vectorized)
+        # 'salary' --> FLEX combinations sorted by salary once, each captain only touches the block inside mincost / maxcost (lineup_filters maxcost included)
+        self.MODE = kwargs.get('mode', 'python')
+        self.BATCH_SIZE = kwargs.get('batch_size', 2**16)
+
+        # Process pool for vectorized / topn modes, split by captain --> 1 runs in this process, None uses every core
+        self.WORKERS = resolve_workers(kwargs.get('workers', 1))
+
     
-    @cache
+    def cache_info(self) -> dict[str, dict[str, dict[str, int|None]]]:
+        """
+        Cache statistics for the engine and its checker
+        """
+        return {
+            'engine': cache_stats(self.caches),
+            'checker': self.checker.cache_info(),
+        }
+
+    def clear(self) -> None:
+        clear_caches(self.caches)
+        self.checker.clear()
+
+    @cached
     def get_value(self, name: str, value: str) -> float|int:
         return self.checker.pvalue(name, value)
     
-    @cache
+    @cached
     def order(self, names: tuple[str,...], **kwargs) -> tuple[str,...]:
         return self.checker.order(names)
     
-    @cache
+    @cached
     def rc_summer(self, names: tuple[str,...], value: str) -> float|int:
         
         if len(names) == 1:
@@ -85,7 +121,7 @@ class Engine:
         return sum([ self.get_value(head, value), self.rc_summer(tail, value) ])
     
     
-    @cache
+    @cached
     def sum_values(self, names: tuple[str,...], value: str, *args) -> float|int:
     
         if value in self.bonuscols:
@@ -98,21 +134,25 @@ class Engine:
         # assert(isinstance(lineup, tuple))
         return tuple([ self.sum_values(tuple(lineup), column) for column in self.sumcols ])
 
-    @cache
+    @cached
     def check(self, lineup: tuple[str,...]) -> bool:
         return self.checker.check(lineup)
 
-    def generate(self) -> tuple[tuple[str,...],...]:
-        
+    def generate(self) -> pd.DataFrame:
+
+        if self.MODE != 'python':
+            return self.generate_vectorized()
+
         lineups = list()
 
-        cpt_iter = [name_ for name_ in self.names if name_ not in self.bad_cpts]
+        active = [name_ for i, name_ in enumerate(self.names) if self.active[i]]
+        cpt_iter = [name_ for name_ in active if name_ not in self.bad_cpts]
         
         if self.PROGRESS_BAR: cpt_iter = tqdm(cpt_iter)
 
         for cpt in cpt_iter:
 
-            rest: tuple[str,...] = tuple([ pname for pname in self.names if pname != cpt ])
+            rest: tuple[str,...] = tuple([ pname for pname in active if pname != cpt ])
             # combos: tuple[PartialStr,...] = tuple(map( tuple, itertools.combinations(rest, self.size-1)))
             
             for combo in itertools.combinations(rest, self.size-1):
@@ -129,10 +169,196 @@ class Engine:
         return df
         # return tuple(lineups)
 
+    def generate_vectorized(self) -> pd.DataFrame:
+        """
+        Same lineups as generate, but combinations are checked as numpy arrays in batches
+        Position rules (past=False) only run on lineups that already pass team + salary checks
+        """
+
+        captains = self.captain_indices()
+
+        if self.WORKERS > 1:
+            lineups = parallel_enumerate(self, captains, self.WORKERS, progress_bar=self.PROGRESS_BAR)
+        else:
+            lineups = self.enumerate_indices(captains, progress_bar=self.PROGRESS_BAR)
+
+        return self.lineups_frame(lineups)
+
+    def enumerate_indices(self, captains: np.ndarray, **kwargs) -> np.ndarray:
+        """
+        Every valid lineup for the given captains as a matrix of player indices
+        """
+        blocks = list(self.iter_indices(captains, **kwargs))
+
+        if not len(blocks):
+            return np.empty((0, self.size), dtype=np.int16)
+
+        return np.concatenate(blocks)
+
+    def iter_indices(self, captains: np.ndarray, **kwargs) -> Iterator[np.ndarray]:
+        """
+        Valid lineups for the given captains as a stream of player index blocks
+        """
+        row_filter = self.row_filter()
+
+        if self.MODE == 'salary':
+            return iter_salary_ordered(
+                self.pool.salary,
+                self.pool.team,
+                captains,
+                self.size,
+                self.checker.mincost,
+                self.checker.maxcost,
+                row_filter=row_filter,
+                cpt_salary=self.site_rules.cpt_salary,
+                progress_bar=kwargs.get('progress_bar', False)
+            )
+
+        return iter_lineups(
+            self.pool.salary,
+            self.pool.fpts,
+            self.pool.team,
+            captains,
+            self.size,
+            self.checker.mincost,
+            self.checker.maxcost,
+            batch_size=self.BATCH_SIZE,
+            row_filter=row_filter,
+            cpt_salary=self.site_rules.cpt_salary,
+            progress_bar=kwargs.get('progress_bar', False)
+        )
+
+    def row_filter(self):
+        """
+        Bulk checks beyond team + salary --> position rules (past=False) and inactive players, None if neither applies
+        """
+        checks = list()
+        if not self.checker.PAST:
+            checks.append(self.checker.positioncheck_bulk)
+        if not self.active.all():
+            checks.append(lambda lineups: self.active[lineups].all(axis=1))
+
+        if not len(checks):
+            return None
+        if len(checks) == 1:
+            return checks[0]
+
+        return lambda lineups: checks[0](lineups) & checks[1](lineups)
+
+    def stream(self, **kwargs) -> Iterator[dict[str, np.ndarray]]:
+        """
+        Every valid lineup in fixed-size columnar chunks --> {'ids': (n, size) player ids, 'salary', 'fpts'}
+        Only one chunk (plus one captain's worth of lineups) is held at a time
+        """
+        chunk_size: int = kwargs.get('chunk_size', 2**16)
+        captains = self.captain_indices()
+
+        if self.WORKERS > 1:
+            blocks = iter_parallel_enumerate(self, captains, self.WORKERS, progress_bar=self.PROGRESS_BAR)
+        else:
+            blocks = self.iter_indices(captains, progress_bar=self.PROGRESS_BAR)
+
+        id_dtype = np.int16 if len(self.pool) < 2**15 else np.int32
+
+        for ids in rechunk(blocks, chunk_size):
+            yield {
+                'ids': ids.astype(id_dtype),
+                'salary': lineup_costs(ids, self.pool.salary, self.site_rules.cpt_salary),
+                'fpts': lineup_points(ids, self.pool.fpts, self.site_rules.cpt_fpts),
+            }
+
+    def write(self, path: str, **kwargs) -> int:
+        """
+        Streams every valid lineup straight into a compressed chunked file (read back with LineupReader)
+        Returns number of lineups written
+        """
+        with LineupWriter(path, self.names, self.labels, **kwargs) as writer:
+            for chunk in self.stream(**kwargs):
+                writer.write(chunk)
+
+        return writer.n_rows
+
+    def stack_counts(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        STACKS pattern frequencies over every lineup generate would produce, counted block by block
+        Returns (per team pattern counts, whole lineup stack counts)
+        """
+        captains = self.captain_indices()
+        blocks = (iter_parallel_enumerate(self, captains, self.WORKERS, progress_bar=self.PROGRESS_BAR)
+                  if self.WORKERS > 1 else
+                  self.iter_indices(captains, progress_bar=self.PROGRESS_BAR)
+                 )
+
+        pattern_counts = np.zeros(len(self.stacks.patterns)-1, dtype=np.int64)
+        lineup_counts: dict[str, int] = dict()
+
+        for block in blocks:
+            ids = self.stacks.classify(block)
+            pattern_counts += self.stacks.pattern_counts(ids)
+
+            labels, counts = np.unique(self.stacks.lineup_stacks(ids).astype(str), return_counts=True)
+            for label, count in zip(labels.tolist(), counts.tolist()):
+                lineup_counts[label] = lineup_counts.get(label, 0) + count
+
+        return self.stacks.counts_frame(pattern_counts), self.stacks.lineup_counts_frame(pd.Series(lineup_counts, dtype=np.int64))
+
+    def search_indices(self, captains: np.ndarray, top_n: int, **kwargs) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Best top_n lineups for the given captains as (player index matrix, fpts)
+        """
+        leaf_check = None if self.checker.PAST else self.checker.rules.check
+
+        return top_lineups(
+            self.pool.salary,
+            self.pool.fpts,
+            self.pool.team,
+            captains,
+            self.size,
+            self.checker.mincost,
+            self.checker.maxcost,
+            top_n,
+            leaf_check=leaf_check,
+            required=kwargs.get('required', None),
+            excluded=None if self.active.all() else ~self.active,
+            floor=kwargs.get('floor', float('-inf')),
+            cpt_salary=self.site_rules.cpt_salary,
+            cpt_fpts=self.site_rules.cpt_fpts,
+            progress_bar=kwargs.get('progress_bar', False)
+        )
+
+    def captain_indices(self) -> np.ndarray:
+        return np.array([i for i, name_ in enumerate(self.names) if name_ not in self.bad_cpts and self.active[i]], dtype=np.int64)
+
+    def lineups_frame(self, lineups: np.ndarray) -> pd.DataFrame:
+        """
+        Index matrix --> same DataFrame layout as generate (names per slot, fpts, salary)
+        """
+        names = np.array(self.names, dtype=object)
+
+        df = pd.DataFrame(data=names[lineups], columns=self.labels)
+        df['fpts'] = lineup_points(lineups, self.pool.fpts, self.site_rules.cpt_fpts)
+        df['salary'] = lineup_costs(lineups, self.pool.salary, self.site_rules.cpt_salary)
+
+        if self.TAG_STACKS:
+            df['stack'] = self.stacks.lineup_stacks(self.stacks.classify(lineups))
+
+        return df
+
+    def search_top(self, top_n: int) -> pd.DataFrame:
+        """
+        Top N lineups without materializing the rest --> bounded heap + fpts / salary pruning
+        With workers, each captain shard keeps its own heap and the heaps are merged at the end
+        Result is kept (self.candidates) so update_player / later calls only redo what changed
+        """
+        lineups, _ = self.top_candidates(top_n)
+        return self.lineups_frame(lineups)
+
     def Lineups(self, **kwargs) -> pd.DataFrame:
 
+        top_n = kwargs.get('top_n', 10)
+
         # ret: pd.DataFrame = pd.DataFrame(data=self.generate(), columns=self.labels)
-        ret = self.generate()
+        ret = self.search_top(top_n) if self.MODE == 'topn' else self.generate()
 
         # Issues with hashing and cacheing (~bars~)
         
@@ -143,10 +369,162 @@ class Engine:
         
         # Parallel
         # ret[self.sumcols] = ret.parallel_apply( lambda x: self.analyze_lineup( tuple(x.to_numpy()) ), axis=1, result_type='expand' )
-        top_n = kwargs.get('top_n', 10)
         return (ret
                 .assign(salary=lambda df_: df_.salary.astype('int'))
-                .sort_values('fpts', ascending=False)
+                .sort_values('fpts', ascending=False, kind='stable')
                 .reset_index(drop=True)
                 .head(top_n)
-               )
\ No newline at end of file
+               )
+
+    def top_candidates(self, depth: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Best depth lineups (ids, fpts), only searched again when asked for more than already kept
+        Deep requests enumerate everything once instead (heap search stops paying off) --> kept with depth = inf
+        """
+        if self.candidates is None or self.candidates[0] < depth:
+            captains = self.captain_indices()
+
+            if depth > FULL_ENUMERATION_DEPTH:
+                if self.WORKERS > 1:
+                    lineups = parallel_enumerate(self, captains, self.WORKERS, progress_bar=self.PROGRESS_BAR)
+                else:
+                    lineups = self.enumerate_indices(captains, progress_bar=self.PROGRESS_BAR)
+
+                pts = lineup_points(lineups, self.pool.fpts, self.site_rules.cpt_fpts)
+                lineups, pts = merge_top([(lineups.astype(np.int64), pts)], len(lineups), self.size)
+                depth = float('inf')
+
+            elif self.WORKERS > 1:
+                parts = parallel_search(self, captains, depth, self.WORKERS, progress_bar=self.PROGRESS_BAR)
+                lineups, pts = merge_top(parts, depth, self.size)
+            else:
+                lineups, pts = self.search_indices(captains, depth, progress_bar=self.PROGRESS_BAR)
+
+            self.candidates = (depth, lineups, pts)
+
+        _, lineups, pts = self.candidates
+        if depth == float('inf'):
+            return lineups, pts
+        return lineups[:depth], pts[:depth]
+
+    def player_lineups(self, player: int, depth: int|float, **kwargs) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Best depth lineups that include player (as captain or FLEX), every one of them for depth = inf
+        floor --> only lineups scoring above it are needed (heap search only)
+        """
+        if depth != float('inf'):
+            return self.search_indices(self.captain_indices(), depth, required=player, floor=kwargs.get('floor', float('-inf')))
+
+        blocks = list(iter_lineups(
+            self.pool.salary,
+            self.pool.fpts,
+            self.pool.team,
+            self.captain_indices(),
+            self.size,
+            self.checker.mincost,
+            self.checker.maxcost,
+            batch_size=self.BATCH_SIZE,
+            row_filter=self.row_filter(),
+            required=player,
+            cpt_salary=self.site_rules.cpt_salary
+        ))
+
+        lineups = np.concatenate(blocks).astype(np.int64) if len(blocks) else np.empty((0, self.size), dtype=np.int64)
+        return merge_top([(lineups, lineup_points(lineups, self.pool.fpts, self.site_rules.cpt_fpts))], len(lineups), self.size)
+
+    def patch_candidates(self, player: int) -> tuple[int|float, np.ndarray, np.ndarray]:
+        """
+        Retained candidates after one player changed:
+            lineups without them --> untouched, still every such lineup down to the old cutoff
+            lineups with them --> thrown out and searched again (only lineups including them)
+        Merged list is only kept down to where both halves are known to be complete
+        """
+        depth, lineups, pts = self.candidates
+        complete: bool = depth == float('inf') or len(lineups) < depth
+
+        has_player = (lineups == player).any(axis=1)
+        parts = [(lineups[~has_player], pts[~has_player])]
+        cutoffs: list[float] = list() if complete else [float(pts[-1])]
+
+        if self.active[player]:
+            if complete:
+                found, found_pts = self.player_lineups(player, float('inf'))
+            else:
+                found, found_pts = self.player_lineups(player, depth, floor=cutoffs[0])
+            parts.append((found, found_pts))
+            if not complete and len(found) == depth:
+                cutoffs.append(float(found_pts[-1]))
+
+        merged, merged_pts = merge_top(parts, sum(len(part[0]) for part in parts), self.size)
+
+        if complete:
+            return float('inf'), merged, merged_pts
+
+        # Anything at or below a cutoff might be missing lineups that tie / beat it
+        keep = merged_pts > max(cutoffs)
+        return int(keep.sum()), merged[keep], merged_pts[keep]
+
+    def update_player(self, name: str, **kwargs) -> int:
+        """
+        Late swap without rebuilding the engine:
+            fpts / salary --> new values, active=False --> ruled out (active=True brings them back)
+        Only cached results involving the player are dropped, retained top lineups are patched (patch_candidates)
+        Returns number of cached results evicted
+        """
+        if name not in self.pool.ids:
+            raise KeyError(f'{name} not in the player pool (players at 2.0 fpts or less are dropped)')
+
+        player: int = self.pool.ids[name]
+
+        if 'fpts' in kwargs:
+            self.pool.fpts[player] = kwargs['fpts']
+            # Same cut as building the engine --> 2.0 fpts or less is out (not brought back automatically)
+            if kwargs['fpts'] <= 2.0:
+                self.active[player] = False
+        if 'salary' in kwargs:
+            self.pool.salary[player] = kwargs['salary']
+        if 'active' in kwargs:
+            self.active[player] = bool(kwargs['active'])
+
+        evicted: int = evict_mentioning(self.caches, name) + self.checker.evict(name)
+
+        if self.candidates is not None:
+            self.candidates = self.patch_candidates(player)
+
+        return evicted
+
+    def Portfolio(self, **kwargs) -> pd.DataFrame:
+        """
+        n_lineups distinct lineups, best first, under:
+            max_exposure --> max fraction of lineups any player is in (exposures={name: fraction} per player)
+            min_unique --> slots any two lineups must differ by (CPT and FLEX count as different slots)
+        Candidates are kept on the engine, so later calls (more lineups, other caps) reuse the search
+        """
+        n_lineups: int = kwargs.get('n_lineups', 20)
+        min_unique: int = kwargs.get('min_unique', 1)
+        caps = exposure_caps(
+            self.names,
+            n_lineups,
+            max_exposure=kwargs.get('max_exposure', 1.0),
+            exposures=kwargs.get('exposures', dict())
+        )
+
+        selection = PortfolioSelection(len(self.pool), n_lineups, caps, min_unique=min_unique)
+
+        # Picks carry over when the candidates run out --> a deeper list is only scanned for the rest
+        depth: int = kwargs.get('depth', default_depth(n_lineups))
+        while True:
+            lineups, _ = self.top_candidates(depth)
+
+            # Either done, or there are no more valid lineups to search
+            if selection.scan(lineups) or len(lineups) < depth:
+                break
+
+            depth *= 4
+
+        if len(selection) < n_lineups:
+            print(f'Greedy selection only found {len(selection)} of {n_lineups} lineups with these exposure / uniqueness settings')
+
+        return (self.lineups_frame(selection.lineups.reshape(-1, self.size))
+                .assign(salary=lambda df_: df_.salary.astype('int'))
+               )
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+
+"""
+
+PLAYER POOL
+
+Struct-of-arrays view of a slate, built once with whole-column extraction
+Player i <--> self.names[i], every field is a contiguous array indexed by player id
+
+"""
+
+# Fixed order so position codes mean the same thing on every slate, anything else gets appended
+POSITIONS: tuple[str,...] = ('QB', 'RB', 'WR', 'TE', 'K', 'DST')
+
+
+class PlayerPool:
+    def __init__(self, data: pd.DataFrame):
+
+        self.names: tuple[str,...] = tuple(data.index)
+        self.ids: dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+        # Own copies --> Engine.update_player edits these in place
+        self.salary: np.ndarray = data['salary'].to_numpy(dtype=np.int32, copy=True)
+        self.fpts: np.ndarray = data['fpts'].to_numpy(dtype=np.float64, copy=True)
+
+        # Team codes in order of first appearance
+        team_codes, team_labels = pd.factorize(data['team'])
+        self.team: np.ndarray = team_codes.astype(np.int8)
+        self.teams: tuple[str,...] = tuple(team_labels)
+
+        extra_positions = [pos_ for pos_ in pd.unique(data['pos']) if pos_ not in POSITIONS]
+        self.positions: tuple[str,...] = POSITIONS + tuple(extra_positions)
+        self.pos: np.ndarray = pd.Categorical(data['pos'], categories=self.positions).codes.astype(np.int8)
+
+        # Everything else stays one array per column for pvalue lookups
+        self.columns: dict[str, np.ndarray] = {
+            column: data[column].to_numpy()
+            for column in data.columns
+            if column not in ('salary', 'fpts', 'team', 'pos')
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def id(self, name: str) -> int:
+        return self.ids[name]
+
+    def value(self, player: int, value: str) -> float|int|str:
+        """
+        Single attribute for player id --> team / pos decoded back to strings
+        """
+        if value == 'salary':
+            return self.salary[player]
+
+        if value == 'fpts':
+            return self.fpts[player]
+
+        if value == 'team':
+            return self.teams[self.team[player]]
+
+        if value == 'pos':
+            return self.positions[self.pos[player]]
+
+        return self.columns[value][player]
+
+    def nbytes(self) -> int:
+        """
+        Bytes held by the fixed-width arrays (salary, fpts, team, pos)
+        """
+        return sum(arr.nbytes for arr in (self.salary, self.fpts, self.team, self.pos))
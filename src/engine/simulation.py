@@ -0,0 +1,293 @@
+import numpy as np
+import pandas as pd
+
+from tqdm.notebook import tqdm
+
+
+"""
+
+MONTE CARLO LINEUP OUTCOMES
+
+Each player's fpts in a scenario = projection + sd * z, where z is standard normal built from:
+    - team score / opponent score --> correlated pair per game (score, opp_score in the boxscores)
+    - team passing factor --> QB and pass catchers up together, RB the other way
+    - everything else --> player noise
+Loadings per position come from regressing per-player fpts z-scores on standardized team / opponent score
+(fit_model on a <season>-raw.csv frame, DEFAULT_MODEL is 2022-2023)
+Lineups are scored against every scenario as one (lineups x players) @ (players x sims) product, chunked over lineups
+
+"""
+
+# Fit on 2022-2023 boxscores with fit_model
+DEFAULT_MODEL: dict = {
+    'score_corr': 0.10,
+    # position --> (team score, opponent score, team passing)
+    'loadings': {
+        'QB': (0.385, 0.142, 0.39),
+        'RB': (0.232, -0.012, -0.29),
+        'WR': (0.128, 0.074, 0.39),
+        'TE': (0.082, 0.091, 0.39),
+        'K': (0.387, -0.136, 0.0),
+        'DST': (0.260, -0.592, 0.0),
+    },
+    # Per game sd / mean for a typical player at each position
+    'cv': {
+        'QB': 0.41,
+        'RB': 0.67,
+        'WR': 0.72,
+        'TE': 0.77,
+        'K': 0.49,
+        'DST': 0.90,
+    },
+}
+
+# Lowest score a player can post in a scenario
+FPTS_FLOOR: dict[str, float] = {'DST': -4.0}
+
+
+def fit_model(raw: pd.DataFrame, **kwargs) -> dict:
+    """
+    <season>-raw.csv rows --> same layout as DEFAULT_MODEL
+    min_games --> players with fewer games (or mean fpts at or under 2.0) are left out
+    """
+    min_games: int = kwargs.get('min_games', 4)
+
+    games = raw.drop_duplicates(['week', 'team'])
+    score_mean, score_sd = games['score'].mean(), games['score'].std()
+
+    df = raw.assign(
+        n_=lambda df_: df_.groupby(['name', 'team'])['fpts'].transform('count'),
+        mu_=lambda df_: df_.groupby(['name', 'team'])['fpts'].transform('mean'),
+        sd_=lambda df_: df_.groupby(['name', 'team'])['fpts'].transform('std'),
+    )
+    df = (df
+          .loc[(df['n_'] >= min_games) & (df['sd_'] > 0) & (df['mu_'] > 2.0)]
+          .assign(
+              z_=lambda df_: (df_['fpts'] - df_['mu_']) / df_['sd_'],
+              zs_=lambda df_: (df_['score'] - score_mean) / score_sd,
+              zo_=lambda df_: (df_['opp_score'] - score_mean) / score_sd,
+          )
+         )
+
+    scores: dict[str, tuple[float, float]] = dict()
+    cv: dict[str, float] = dict()
+    for pos_, pdf in df.groupby('pos'):
+        beta, *_ = np.linalg.lstsq(pdf[['zs_', 'zo_']].to_numpy(), pdf['z_'].to_numpy(), rcond=None)
+        scores[pos_] = (round(float(beta[0]), 3), round(float(beta[1]), 3))
+        cv[pos_] = round(float((pdf['sd_'] / pdf['mu_']).median()), 2)
+
+    # Passing factor --> residual correlation between each team's top QB and its other players
+    df['r_'] = df['z_'] - df['pos'].map(lambda p: scores[p][0]) * df['zs_'] - df['pos'].map(lambda p: scores[p][1]) * df['zo_']
+    qbs = (df
+           .loc[df['pos'] == 'QB']
+           .sort_values('mu_')
+           .drop_duplicates(['week', 'team'], keep='last')
+           [['week', 'team', 'r_']]
+          )
+
+    def qb_corr(positions: list[str]) -> float:
+        joined = df.loc[df['pos'].isin(positions), ['week', 'team', 'r_']].merge(qbs, on=['week', 'team'], suffixes=('', '_qb'))
+        return float(np.corrcoef(joined['r_'], joined['r__qb'])[0, 1]) if len(joined) > 2 else 0.0
+
+    qb_loading: float = float(np.sqrt(max(qb_corr(['WR', 'TE']), 0.0)))
+    passing: dict[str, float] = {'QB': qb_loading, 'WR': qb_loading, 'TE': qb_loading}
+    if qb_loading > 0:
+        passing['RB'] = qb_corr(['RB']) / qb_loading
+
+    return {
+        'score_corr': round(float(np.corrcoef(games['score'], games['opp_score'])[0, 1]), 2),
+        'loadings': {pos_: (*scores[pos_], round(passing.get(pos_, 0.0), 2)) for pos_ in scores},
+        'cv': cv,
+    }
+
+
+class Simulator:
+    def __init__(self, engine, **kwargs):
+        """
+        engine --> Engine / ClassicEngine (pool, labels, multipliers)
+        n_sims, seed --> scenarios drawn once and reused for every lineup set
+        model --> DEFAULT_MODEL layout (fit_model output), sd --> {name: fpts sd} overrides
+        chunk_size --> lineups scored per matrix product (chunk_size x n_sims floats in memory)
+        """
+        self.engine = engine
+        self.pool = engine.pool
+
+        self.n_sims: int = kwargs.get('n_sims', 10_000)
+        self.seed: int = kwargs.get('seed', 0)
+        self.chunk_size: int = kwargs.get('chunk_size', 2048)
+        self.model: dict = kwargs.get('model', DEFAULT_MODEL)
+        self.percentiles: tuple[int,...] = tuple(kwargs.get('percentiles', (10, 25, 50, 75, 90)))
+        self.ceiling: int = kwargs.get('ceiling', 99)
+
+        self.PROGRESS_BAR = kwargs.get('progress_bar', False)
+
+        positions = [self.pool.positions[p] for p in self.pool.pos]
+        overrides: dict[str, float] = kwargs.get('sd', dict())
+        self.sd = np.array([
+            overrides.get(name, self.model['cv'].get(pos_, 0.7) * fpts_)
+            for name, pos_, fpts_ in zip(self.pool.names, positions, self.pool.fpts)
+        ], dtype=np.float64)
+
+        self.floor = np.array([FPTS_FLOOR.get(pos_, 0.0) for pos_ in positions], dtype=np.float64)
+        self.loadings = np.array([self.model['loadings'].get(pos_, (0.0, 0.0, 0.0)) for pos_ in positions], dtype=np.float64)
+
+        # fpts multiplier per slot from the engine's site rules --> showdown captain / MVP scores 1.5x
+        self.weights = np.array(engine.multipliers, dtype=np.float32)
+
+        self.opp = self.opponents()
+        self._scenarios = None
+
+    def opponents(self) -> np.ndarray:
+        """
+        Team code --> opponent team code, from the 'opp' column if there is one, otherwise the other team in a 2 team pool
+        -1 when unknown (scores drawn independently)
+        """
+        n_teams: int = len(self.pool.teams)
+        opp = np.full(n_teams, -1, dtype=np.int64)
+
+        if 'opp' in self.pool.columns:
+            for team_code, opp_ in zip(self.pool.team, self.pool.columns['opp']):
+                if opp_ in self.pool.teams:
+                    opp[team_code] = self.pool.teams.index(opp_)
+        elif n_teams == 2:
+            opp[:] = [1, 0]
+
+        return opp
+
+    def team_scores(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        (n_sims, n_teams) standardized team scores, correlated score_corr with the opponent
+        """
+        n_teams: int = len(self.pool.teams)
+        rho: float = self.model['score_corr']
+
+        base = rng.standard_normal((self.n_sims, n_teams))
+        scores = base.copy()
+
+        # Pair each game once --> second team shares rho of the first team's draw
+        for team_code in range(n_teams):
+            opp_ = self.opp[team_code]
+            if 0 <= opp_ and team_code < opp_:
+                scores[:, opp_] = rho * base[:, team_code] + np.sqrt(1 - rho**2) * base[:, opp_]
+
+        return scores
+
+    def scenarios(self) -> np.ndarray:
+        """
+        (n_sims, n_players) simulated fpts, drawn once
+        """
+        if self._scenarios is not None:
+            return self._scenarios
+
+        rng = np.random.default_rng(self.seed)
+        team = self.pool.team.astype(np.int64)
+
+        scores = self.team_scores(rng)
+        passing = rng.standard_normal((self.n_sims, len(self.pool.teams)))
+
+        opp_scores = np.where(self.opp[team] >= 0, scores[:, np.maximum(self.opp[team], 0)], 0.0)
+
+        b_team, b_opp, b_pass = self.loadings.T
+        rho: float = self.model['score_corr']
+
+        # Player noise takes whatever variance the shared factors leave
+        shared = b_team**2 + b_opp**2 + 2*rho*b_team*b_opp*(self.opp[team] >= 0) + b_pass**2
+        noise_sd = np.sqrt(np.clip(1 - shared, 0.05, None))
+
+        z = (
+            b_team * scores[:, team]
+            + b_opp * opp_scores
+            + b_pass * passing[:, team]
+            + noise_sd * rng.standard_normal((self.n_sims, len(self.pool)))
+        )
+
+        self._scenarios = np.maximum(self.pool.fpts + self.sd * z, self.floor).astype(np.float32)
+        return self._scenarios
+
+    def lineup_ids(self, lineups: np.ndarray|pd.DataFrame) -> np.ndarray:
+        """
+        Player id matrix as is, or an engine lineups frame (names in the slot columns)
+        """
+        if isinstance(lineups, pd.DataFrame):
+            names = lineups[self.engine.labels].to_numpy()
+            return np.vectorize(self.pool.ids.__getitem__, otypes=[np.int64])(names)
+
+        return np.asarray(lineups, dtype=np.int64)
+
+    def weight_matrix(self, lineups: np.ndarray) -> np.ndarray:
+        """
+        (n_lineups, n_players) --> slot multiplier where the player is in the lineup, 0 elsewhere
+        """
+        weights = np.zeros((len(lineups), len(self.pool)), dtype=np.float32)
+        rows = np.arange(len(lineups))
+        for slot in range(lineups.shape[1]):
+            weights[rows, lineups[:, slot]] += self.weights[slot]
+        return weights
+
+    def iter_scores(self, lineups: np.ndarray):
+        """
+        Yields (row offset, (chunk, n_sims) scores) --> never more than chunk_size x n_sims in memory
+        """
+        scenarios_t = self.scenarios().T
+        starts = range(0, len(lineups), self.chunk_size)
+
+        for start in (tqdm(starts) if self.PROGRESS_BAR else starts):
+            yield start, self.weight_matrix(lineups[start:start+self.chunk_size]) @ scenarios_t
+
+    def score(self, lineups: np.ndarray|pd.DataFrame) -> np.ndarray:
+        """
+        (n_lineups, n_sims) scores in one piece, only for small sets
+        """
+        ids = self.lineup_ids(lineups)
+        out = np.empty((len(ids), self.n_sims), dtype=np.float32)
+        for start, scores in self.iter_scores(ids):
+            out[start:start+len(scores)] = scores
+        return out
+
+    def field_best(self, field: np.ndarray|pd.DataFrame) -> np.ndarray:
+        """
+        Best field score in every scenario (n_sims,)
+        """
+        best = np.full(self.n_sims, -np.inf, dtype=np.float32)
+        for _, scores in self.iter_scores(self.lineup_ids(field)):
+            best = np.maximum(best, scores.max(axis=0))
+        return best
+
+    def summarize(self, lineups: np.ndarray|pd.DataFrame, **kwargs) -> pd.DataFrame:
+        """
+        One row per lineup --> mean, sd, percentiles, ceiling and (with field=) win_rate
+        win_rate --> share of scenarios the lineup scores at least as much as every field lineup (ties count)
+        Percentiles are read off one sort per chunk (same linear interpolation as np.percentile, much faster than it)
+        """
+        ids = self.lineup_ids(lineups)
+        field = kwargs.get('field', None)
+        best = self.field_best(field) if field is not None else None
+
+        columns = ['mean', 'sd'] + [f'p{p}' for p in self.percentiles] + ['ceiling'] + (['win_rate'] if best is not None else [])
+        stats = np.empty((len(ids), len(columns)), dtype=np.float64)
+        qs = list(self.percentiles) + [self.ceiling]
+
+        # Linear interpolation between order statistics
+        positions = np.array(qs, dtype=np.float64) / 100 * (self.n_sims - 1)
+        lo = np.floor(positions).astype(np.int64)
+        hi = np.minimum(lo + 1, self.n_sims - 1)
+        frac = positions - lo
+
+        for start, scores in self.iter_scores(ids):
+            end = start + len(scores)
+            stats[start:end, 0] = scores.mean(axis=1)
+            stats[start:end, 1] = scores.std(axis=1)
+
+            ordered = np.sort(scores, axis=1)
+            stats[start:end, 2:2+len(qs)] = ordered[:, lo] * (1 - frac) + ordered[:, hi] * frac
+
+            if best is not None:
+                stats[start:end, -1] = (scores >= best).mean(axis=1)
+
+        return pd.DataFrame(stats, columns=columns).round(3)
+
+    def Simulate(self, lineups: pd.DataFrame, **kwargs) -> pd.DataFrame:
+        """
+        Engine lineups frame --> same frame with the outcome columns added
+        """
+        return pd.concat([lineups.reset_index(drop=True), self.summarize(lineups, **kwargs)], axis=1)
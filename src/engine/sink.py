@@ -0,0 +1,144 @@
+import json
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from collections.abc import Iterator
+
+
+"""
+
+STREAMING LINEUP SINK
+
+Lineups travel as fixed-size columnar chunks: {'ids': (n, size) player ids, 'salary': (n,), 'fpts': (n,)}
+On disk every chunk column is its own deflated .npy member of one zip file, plus meta.json with the player names
+Reading pulls one chunk at a time, so nothing ever needs the whole set in memory
+
+"""
+
+def rechunk(blocks: Iterator[np.ndarray], chunk_size: int) -> Iterator[np.ndarray]:
+    """
+    Uneven blocks of rows in --> chunks of exactly chunk_size rows out (last one may be short)
+    """
+    pending: list[np.ndarray] = list()
+    n_pending: int = 0
+
+    for block in blocks:
+        while len(block):
+            take: int = min(chunk_size - n_pending, len(block))
+            pending.append(block[:take])
+            n_pending += take
+            block = block[take:]
+
+            if n_pending == chunk_size:
+                yield np.concatenate(pending)
+                pending, n_pending = list(), 0
+
+    if n_pending:
+        yield np.concatenate(pending)
+
+
+class LineupWriter:
+    def __init__(self, path: str, names: tuple[str,...], labels: list[str], **kwargs):
+
+        self.path = path
+        self.names = tuple(names)
+        self.labels = list(labels)
+
+        self.zf = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=kwargs.get('compresslevel', 6))
+
+        self.columns: list[str] = list()
+        self.chunk_rows: list[int] = list()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def n_rows(self) -> int:
+        return sum(self.chunk_rows)
+
+    def write(self, chunk: dict[str, np.ndarray]) -> None:
+        chunk_id: int = len(self.chunk_rows)
+
+        for column, values in chunk.items():
+            with self.zf.open(f'chunk-{chunk_id:06d}/{column}.npy', 'w', force_zip64=True) as f:
+                np.lib.format.write_array(f, np.ascontiguousarray(values), allow_pickle=False)
+
+        if not len(self.columns):
+            self.columns = list(chunk.keys())
+
+        self.chunk_rows.append(len(chunk['ids']))
+
+    def close(self) -> None:
+        if self.zf.fp is None:
+            return
+
+        meta = {
+            'names': self.names,
+            'labels': self.labels,
+            'columns': self.columns,
+            'chunk_rows': self.chunk_rows,
+        }
+        self.zf.writestr('meta.json', json.dumps(meta))
+        self.zf.close()
+
+
+class LineupReader:
+    def __init__(self, path: str):
+
+        self.path = path
+        self.zf = zipfile.ZipFile(path, 'r')
+
+        meta = json.loads(self.zf.read('meta.json'))
+        self.names: tuple[str,...] = tuple(meta['names'])
+        self.labels: list[str] = meta['labels']
+        self.columns: list[str] = meta['columns']
+        self.chunk_rows: list[int] = meta['chunk_rows']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(self.chunk_rows)
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self.chunk_rows)
+
+    def chunk(self, chunk_id: int, columns: list[str]|None = None) -> dict[str, np.ndarray]:
+        """
+        One chunk, optionally only some columns (others never get decompressed)
+        """
+        columns = self.columns if columns is None else columns
+        chunk = dict()
+        for column in columns:
+            with self.zf.open(f'chunk-{chunk_id:06d}/{column}.npy') as f:
+                chunk[column] = np.lib.format.read_array(f, allow_pickle=False)
+
+        return chunk
+
+    def __iter__(self) -> Iterator[dict[str, np.ndarray]]:
+        for chunk_id in range(self.n_chunks):
+            yield self.chunk(chunk_id)
+
+    def frame(self, chunk: dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Chunk --> same layout as Engine.generate (names per slot, fpts, salary)
+        """
+        names = np.array(self.names, dtype=object)
+
+        df = pd.DataFrame(data=names[chunk['ids']], columns=self.labels)
+        for column in ('fpts', 'salary'):
+            if column in chunk:
+                df[column] = chunk[column]
+        return df
+
+    def close(self) -> None:
+        self.zf.close()
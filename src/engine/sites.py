@@ -0,0 +1,83 @@
+"""
+
+SITE RULES
+
+Roster rules per site as plain data --> compiled once into the handful of numbers the fast paths need
+(captain salary / fpts multipliers, salary bounds, roster size, slot labels)
+Every lineup check then stays plain arithmetic, no rule lookups per lineup
+Classic (main slate) rules live here too --> ClassicEngine turns them into constraint rows
+
+"""
+
+# Single-game roster rules per site
+SHOWDOWN_SITES: dict[str, dict] = {
+    'draftkings': {
+        'captain': 'CPT', # 1 captain slot + flex slots
+        'flex': 'FLEX',
+        'size': 6,
+        'captain_salary': 1.5, # Captain costs 1.5x salary
+        'captain_fpts': 1.5, # ... and scores 1.5x fpts
+        'cap': 50_000,
+        'mincost': 35_000, # No point leaving more than 15k on the table
+    },
+    'fanduel': {
+        'captain': 'MVP',
+        'flex': 'FLEX',
+        'size': 5,
+        'captain_salary': 1.0, # MVP costs the same as in the FLEX
+        'captain_fpts': 1.5,
+        'cap': 60_000,
+        'mincost': 42_000, # Same 70% of cap as DraftKings
+    },
+}
+
+# Classic (main slate) roster rules per site --> ClassicEngine
+CLASSIC_SITES: dict[str, dict] = {
+    'draftkings': {
+        'cap': 50_000,
+        'slots': ('QB', 'RB', 'RB', 'WR', 'WR', 'WR', 'TE', 'FLEX', 'DST'),
+        'flex': ('RB', 'WR', 'TE'),
+        'min_games': 2, # Players from at least 2 different games
+        'min_teams': None,
+        'max_per_team': None,
+    },
+    'fanduel': {
+        'cap': 60_000,
+        'slots': ('QB', 'RB', 'RB', 'WR', 'WR', 'WR', 'TE', 'FLEX', 'DST'),
+        'flex': ('RB', 'WR', 'TE'),
+        'min_games': None,
+        'min_teams': 3, # Players from at least 3 different teams
+        'max_per_team': 4, # No more than 4 from one team
+    },
+}
+
+
+class SiteRules:
+    def __init__(self, site: str = 'draftkings', **kwargs):
+        """
+        site --> key of SHOWDOWN_SITES, any rule can be overridden with a kwarg of the same name (anything else is a KeyError)
+        """
+        self.site: str = site.lower()
+
+        if self.site not in SHOWDOWN_SITES:
+            raise ValueError(f'Site {self.site} not supported, must be one of {tuple(SHOWDOWN_SITES)}')
+
+        unknown: list[str] = sorted(key for key in kwargs if key not in SHOWDOWN_SITES[self.site])
+        if len(unknown):
+            raise KeyError(f'Unknown site rule(s) {unknown}, must be among {tuple(SHOWDOWN_SITES[self.site])}')
+
+        rules: dict = {**SHOWDOWN_SITES[self.site], **kwargs}
+
+        self.size: int = int(rules['size'])
+        self.cpt_salary: float = float(rules['captain_salary'])
+        self.cpt_fpts: float = float(rules['captain_fpts'])
+        self.maxcost: int = rules['cap']
+        self.mincost: int = rules['mincost']
+
+        self.labels: list[str] = [rules['captain']] + [f"{rules['flex']}{n}" for n in range(1, self.size)]
+
+        # fpts multiplier per slot --> captain first
+        self.multipliers: tuple[float,...] = (self.cpt_fpts,) + (1.0,)*(self.size-1)
+
+    def __repr__(self) -> str:
+        return f'SiteRules({self.site!r}, size={self.size}, cap={self.maxcost}, captain x{self.cpt_salary} salary / x{self.cpt_fpts} fpts)'
@@ -0,0 +1,160 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from collections.abc import Iterable
+
+from _stacks import STACKS
+
+from .pool import PlayerPool
+
+
+"""
+
+STACK PATTERN CLASSIFICATION
+
+A team's share of a lineup is a STACKS pattern --> its players' positions, WR/TE as REC, sorted ('DST-K-QB-RB-REC')
+Same trick as _positions: counts of DST, K, QB, RB, REC, other encoded as one base-(size+1) integer
+Every key is mapped to its STACKS index once, so tagging a lineup is a sum of player weights + one table read
+
+"""
+
+# Alphabetical --> same order the pattern strings list them in
+CATEGORIES: tuple[str,...] = ('DST', 'K', 'QB', 'RB', 'REC')
+POSITION_CATEGORY: dict[str, str] = {
+    'QB': 'QB',
+    'RB': 'RB',
+    'WR': 'REC',
+    'TE': 'REC',
+    'K': 'K',
+    'DST': 'DST',
+}
+
+# Pattern ids besides STACKS indices
+NO_PLAYERS: int = -1 # Team not in the lineup
+UNKNOWN: int = -2 # Composition that isn't in STACKS (or has a position outside CATEGORIES)
+
+
+@functools.lru_cache(maxsize=8)
+def pattern_table(radix: int) -> np.ndarray:
+    """
+    table[key] --> STACKS index for every team composition key in base radix
+    Last digit counts players outside CATEGORIES, anything with one of those is UNKNOWN
+    """
+    table = np.full(radix**(len(CATEGORIES)+1), UNKNOWN, dtype=np.int16)
+    table[0] = NO_PLAYERS
+
+    for i, pattern in enumerate(STACKS):
+        parts = pattern.split('-')
+        if len(parts) >= radix:
+            continue
+        table[sum(parts.count(cat_) * radix**slot for slot, cat_ in enumerate(CATEGORIES))] = i
+
+    return table
+
+
+class StackClassifier:
+    def __init__(self, pool: PlayerPool, size: int):
+        """
+        size --> roster size, per team counts never go past it
+        """
+        self.pool = pool
+        self.size = size
+        self.radix: int = size + 1
+
+        self.team = pool.team.astype(np.int64)
+        self.n_teams: int = len(pool.teams)
+
+        categories = [POSITION_CATEGORY.get(pos_) for pos_ in pool.positions]
+        slot = np.array([CATEGORIES.index(cat_) if cat_ is not None else len(CATEGORIES) for cat_ in categories], dtype=np.int64)
+        self.weight = self.radix**slot[pool.pos.astype(np.int64)]
+
+        self.table = pattern_table(self.radix)
+        self.patterns = np.array(STACKS + ('UNKNOWN', ''), dtype=object) # -2, -1 index from the end
+
+    def keys(self, lineups: np.ndarray) -> np.ndarray:
+        """
+        (n_lineups, n_teams) composition keys for a matrix of player ids
+        """
+        n: int = len(lineups)
+        rows = np.arange(n)
+
+        keys = np.zeros((n, self.n_teams), dtype=np.int64)
+        for col in range(lineups.shape[1]):
+            players = lineups[:, col]
+            keys[rows, self.team[players]] += self.weight[players]
+
+        return keys
+
+    def classify(self, lineups: np.ndarray) -> np.ndarray:
+        """
+        (n_lineups, n_teams) STACKS ids, column t is pool.teams[t], NO_PLAYERS / UNKNOWN otherwise
+        """
+        return self.table[self.keys(lineups)]
+
+    def lineup_stacks(self, ids: np.ndarray) -> np.ndarray:
+        """
+        One label per lineup --> team patterns joined with ' | ', biggest team first (ties by STACKS id)
+        Team-agnostic, so the same stack on either side of a game counts the same
+        """
+        if not len(ids):
+            return np.empty(0, dtype=object)
+
+        sizes = np.array([len(p.split('-')) for p in STACKS] + [0, 0])[ids]
+        order = np.argsort(-sizes * len(self.patterns) + ids, axis=1, kind='stable')
+        ranked = np.take_along_axis(ids, order, axis=1)
+
+        unique, inverse = np.unique(ranked, axis=0, return_inverse=True)
+        labels = np.array([
+            ' | '.join(self.patterns[i] for i in row if i != NO_PLAYERS)
+            for row in unique
+        ], dtype=object)
+
+        return labels[inverse.ravel()]
+
+    def frequencies(self, ids: np.ndarray) -> pd.DataFrame:
+        """
+        How often each STACKS pattern shows up (once per team per lineup), UNKNOWN included
+        """
+        return self.counts_frame(self.pattern_counts(ids))
+
+    def pattern_counts(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Counts per STACKS id, UNKNOWN in the last spot --> adds up across chunks
+        """
+        present = ids[ids != NO_PLAYERS]
+        return np.bincount(np.where(present == UNKNOWN, len(STACKS), present), minlength=len(STACKS)+1)
+
+    def counts_frame(self, counts: np.ndarray) -> pd.DataFrame:
+        """
+        pattern_counts --> pattern, count, share sorted most common first
+        """
+        df = pd.DataFrame({
+            'pattern': list(STACKS) + ['UNKNOWN'],
+            'count': counts,
+        })
+        return (df
+                .loc[df['count'] > 0]
+                .assign(share=lambda df_: df_['count'] / df_['count'].sum())
+                .sort_values('count', ascending=False, kind='stable')
+                .reset_index(drop=True)
+               )
+
+    def lineup_frequencies(self, labels: Iterable[str]) -> pd.DataFrame:
+        """
+        Whole-lineup stack labels --> stack, count, share sorted most common first
+        """
+        return self.lineup_counts_frame(pd.Series(labels, dtype=object).value_counts(sort=False))
+
+    def lineup_counts_frame(self, counts: pd.Series) -> pd.DataFrame:
+        """
+        {stack label: count} --> stack, count, share sorted most common first
+        """
+        return (counts
+                .rename_axis('stack')
+                .reset_index(name='count')
+                .assign(share=lambda df_: df_['count'] / df_['count'].sum())
+                .sort_values('count', ascending=False, kind='stable')
+                .reset_index(drop=True)
+               )
@@ -2,6 +2,7 @@ import os
 import glob
 
 import pandas as pd
+import psutil
 
 class Filing:
     # Class to take care of filing each dataframe + additional functionality later on
@@ -31,6 +32,36 @@ class Filing:
         self.snapcounts = dict()
         self.adv_stats = dict()
 
+    def to_csv(self, df: pd.DataFrame, fpath: str) -> str:
+        """
+        Writes to a temp file first and renames it into place --> a crash mid-write never leaves half a csv behind
+        """
+        tmp_fpath = f'{fpath}.{os.getpid()}.tmp'
+        df.to_csv(tmp_fpath, index=False)
+        os.replace(tmp_fpath, fpath)
+
+        return fpath
+
+    def remove_partial(self) -> int:
+        """
+        Deletes temp files a crashed run left in the season directory, returns how many
+        Only to_csv temp files ({fpath}.{pid}.tmp) whose process is gone --> another run's writes in progress are left alone
+        """
+        partial: list[str] = list()
+        for fpath in glob.glob(os.path.join(self.season_dir, '**', '*.tmp'), recursive=True):
+            pid = fpath.rsplit('.', 2)[-2]
+            if pid.isdigit() and int(pid) != os.getpid() and not psutil.pid_exists(int(pid)):
+                partial.append(fpath)
+
+        for fpath in partial:
+            try:
+                os.remove(fpath)
+            except FileNotFoundError:
+                # Another run cleaning up the same crash got to it first
+                pass
+
+        return len(partial)
+
     def clean_name(self, name: str) -> str:
         """
         Standardizes name across PFR, FD, DK
@@ -46,17 +77,16 @@ class Filing:
         
 
 
-    def save_boxscore(self, df: pd.DataFrame, away: str, home: str) -> None:
+    def save_boxscore(self, df: pd.DataFrame, away: str, home: str) -> str:
         """
         Saves boxscore as csv (later on can configure different formats)
         Saves in form of away-home.csv --> Will never have duplication issues
+        Returns path saved to
         """
         filename = f'{away}-{home}.csv'
         
         fpath = os.path.join(self.boxscores_dir, filename)
-        df.to_csv(fpath, index=False)
-
-        return
+        return self.to_csv(df, fpath)
 
     def load_boxscores(self):
         if len(self.boxscores):
@@ -69,16 +99,14 @@ class Filing:
         
         return self.boxscores
 
-    def save_snapcounts(self, df: pd.DataFrame, team: str, week: int) -> None:
+    def save_snapcounts(self, df: pd.DataFrame, team: str, week: int) -> str:
         """
         Saves snapcounts for fantasy position players
         Saves in form of team-week#.csv
         """
         filename = f'{team}-week{week}.csv'
         fpath = os.path.join(self.snap_counts_dir, filename)
-        df.to_csv(fpath, index=False)
-
-        return
+        return self.to_csv(df, fpath)
 
     def load_snapcounts(self):
         if len(self.snapcounts):
@@ -92,7 +120,7 @@ class Filing:
         return self.snapcounts
 
 
-    def save_advanced_stats(self, df: pd.DataFrame, stat_category: str, team: str, week: str) -> None:
+    def save_advanced_stats(self, df: pd.DataFrame, stat_category: str, team: str, week: str) -> str:
         """
         Save advanced stats for team from specific weak, where stat_category is one of (passing, rushing, receiving)
         Saves in stat_category directory in form of team-week#.csv
@@ -100,9 +128,7 @@ class Filing:
         """
         filename = f'{team}-week{week}.csv'
         fpath = os.path.join(self.advanced_stats_dir, stat_category, filename)
-        df.to_csv(fpath, index=False)
-
-        return
+        return self.to_csv(df, fpath)
 
 
     def load_advanced_stats(self):
@@ -140,7 +166,7 @@ class Filing:
                      .reset_index(drop=True)
                     )
 
-        combined.to_csv(self.combined_fpath, index=False)
+        self.to_csv(combined, self.combined_fpath)
 
         return combined
 
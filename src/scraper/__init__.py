@@ -1,3 +1,4 @@
 from .scraper import Scraper
+from .backfill import Backfill
 
 version='1.0.0'
\ No newline at end of file
@@ -0,0 +1,453 @@
+import time
+
+import pandas as pd
+
+from ._html import uncomment_tables
+from ._tables import BoxscorePage
+from ._conversions import (
+    convert_initials,
+    convert_teamname,
+    standardize_initials,
+    standardize_name
+)
+from ._info import (
+    ADV_PASSING_COLUMNS,
+    ADV_RUSHING_COLUMNS,
+    ADV_RECEIVING_COLUMNS,
+    DEFENSIVE_FPTS_RULES,
+    DEFENSIVE_TD_COLUMNS,
+    KICKING_FPTS_RULES,
+    OFFENSIVE_COLUMNS,
+    PTS_ALLOWED_SCORING
+)
+
+
+"""
+
+BOXSCORE SCORING
+
+One game page --> every dataframe the scraper files for it (fpts boxscore, snap counts per team, advanced stats per team/category)
+Pure function of (html, week) with nothing but module-level imports --> runs in a worker process, results pickle back to the writer
+write_game files a result in the same order the scraper always has
+
+"""
+
+
+def clean_name(name: str) -> str:
+    """
+    Standardizes name across PFR, FD, DK
+    """
+    clean_ = ' '.join(name.split(' ')[:2]).replace('.', '')
+    return standardize_name(clean_)
+
+
+# parse_defensive_stat = lambda stat_, stat_val: int(stat_val) if stat_ in DEFENSIVE_TD_COLUMNS[1:] else standardize_initials(stat_val)
+def parse_defensive_stat(stat: str, stat_val: str):
+    if stat == 'team':
+        return standardize_initials(stat_val)
+
+    if not len(stat_val) or stat_val == ' ':
+        return 0
+
+    return int(stat_val)
+
+
+def parse_adv_stat(stat: str, stat_val: str):
+    if stat == 'team':
+        return standardize_initials(stat_val)
+
+    if 'pct' in stat or '%' in stat_val: # Just in case
+        no_pct_sign = stat_val[:-1]
+        return round( float(no_pct_sign)/100, 3 ) if len(no_pct_sign) else 0.0
+
+    if not len(stat_val) or stat_val == ' ':
+        return 0.0
+
+    return float(stat_val) if '.' in stat_val else int(stat_val)
+
+
+def score_game(html: str, week: int, timings: dict[str, float]|None = None) -> dict:
+    """
+    Raw boxscore page (commented tables or not) --> {week, away, home, boxscore, snapcounts: {team: df}, advanced: [(category, team, df)]}
+    timings --> dict to fill with seconds per step (uncomment, soup, scorebox, table_<id>, score)
+    """
+    start = time.perf_counter()
+    html = uncomment_tables(html)
+    if timings is not None:
+        timings['uncomment'] = time.perf_counter() - start
+
+    # Scorebox + every table read below, each table walked once into columns
+    game_page = BoxscorePage(html, timings=timings)
+    parsed = time.perf_counter()
+
+    away_team, home_team = tuple([convert_teamname(team_) for team_ in game_page.teams()])
+    away_score, home_score = game_page.scores()
+
+    # Different for names because th not td
+    names = [clean_name(name_) for name_ in game_page.column('player_offense', 'player')]
+
+    n_players = len(names)
+
+    convert_stat_str = lambda stat, stat_val: stat_val if stat in ['player', 'team', 'pass_rating'] else int(stat_val)
+    
+    table_data = {
+        stat: [convert_stat_str(stat, stat_val) for stat_val in game_page.column('player_offense', stat)]
+        for stat in OFFENSIVE_COLUMNS[1:]
+    }
+    
+    # One-liners to either clean or add more info when more annoying then doing on massive dataframes
+    fix_rating = lambda rating_str: float(rating_str) if len(rating_str) else 0.0
+    teams = [standardize_initials(team) for team in set(table_data['team'])] # Careful having both this and away_team, home_team
+    
+    is_home = lambda team_: team_ == home_team
+    get_opp = lambda team_: away_team if is_home(team_) else home_team
+    get_score = lambda team_: home_score if is_home(team_) else away_score
+    get_opp_score = lambda team_: away_score if is_home(team_) else home_score
+
+    winning_team = home_team if home_score > away_score else away_team
+    is_winner = lambda team_: int(team_ == winning_team)
+    get_spread = lambda team_: home_score - away_score if is_home(team_) else away_score - home_score
+    total_score = away_score + home_score
+    
+    table_data['pass_rating'] = [ fix_rating(rating) for rating in table_data['pass_rating'] ]
+    table_data['team'] = [ standardize_initials(team) for team in table_data['team'] ]
+    table_data['opp'] = [ get_opp(team) for team in table_data['team'] ]
+    table_data['home'] = [ int(is_home(team)) for team in table_data['team'] ]
+    table_data['score'] = [ get_score(team) for team in table_data['team'] ]
+    table_data['opp_score'] = [ get_opp_score(team) for team in table_data['team'] ]
+    table_data['winner'] = [ is_winner(team) for team in table_data['team'] ]
+
+    table_data['spread'] = [ get_spread(team) for team in table_data['team'] ]
+    table_data['total'] = [total_score] * n_players
+    table_data['week'] = [week] * n_players
+    
+    # Defaults to WR, name already standardized
+    # table_data['pos'] = [ self.lookup_position.get(name, 'WR') for name in names ]
+
+    # Need to figure out defense
+    # Just need to remember in PPR format
+    # TODO: figure out cleaner way for assign and bonuses
+    offense_df = (pd
+          .DataFrame(data={**{'name': names}, **table_data})
+          .assign(fpts=lambda df: 0.04*df.pass_yds + 4.0*df.pass_td - 1.0*df.pass_int + 0.1*df.rush_yds + 6.0*df.rush_td + 1.0*df.rec + 0.1*df.rec_yds + 6.0*df.rec_td - 1.0*df.fumbles_lost)
+         )
+
+    ########################################################################################################
+    # Defensive handling
+    ########################################################################################################
+
+    # This info comes from the offensive table
+    # Team: # of times they were sacked
+    # Example: BUF: # times Josh Allen was sacked
+    team_defense_stats = {
+        team: {
+            stat: offense_df.loc[offense_df['team'] == team, stat].sum()
+            for stat in ('pass_sacked', 'pass_int', 'fumbles_lost')
+        }
+        for team in teams
+    }
+    
+    for team, def_stats in team_defense_stats.items():
+        def_stats['pts_allowed'] = get_opp_score(team)
+    
+    # parse_defensive_stat = lambda stat_, stat_val: int(stat_val) if stat_ in DEFENSIVE_TD_COLUMNS[1:] else standardize_initials(stat_val)
+    
+    # ('team', 'def_int_td', 'fumbles_rec_td')
+    def_table_data = {
+        stat: [parse_defensive_stat(stat, stat_val) for stat_val in game_page.column('player_defense', stat)]
+        for stat in DEFENSIVE_TD_COLUMNS
+    }
+    
+    # Need to count touchdowns for defense, most important after points allowed
+    team_def_tds = {team: 0 for team in teams}
+    for cat in DEFENSIVE_TD_COLUMNS[1:]:
+        for i, td in enumerate(def_table_data[cat]):
+            team_def_tds[def_table_data['team'][i]] += td
+
+    
+    # Initialize dictionary for fpts for defenses
+    defense_fpts = {team: 0 for team in teams}
+    
+    # Careful having all in one loop
+    for team in teams:
+        for cat, multi in DEFENSIVE_FPTS_RULES.items():
+            defense_fpts[team] += team_defense_stats[get_opp(team)][cat]*multi
+            
+        defense_fpts[team] += 6.0*team_def_tds[team]
+        # Defense not responsible for opposing defense getting TD
+        # Issues might be here
+        team_defense_stats[team]['pts_allowed'] -= 6.0*team_def_tds[get_opp(team)]
+        
+        for pts_range, fpts_ in PTS_ALLOWED_SCORING.items():
+            if team_defense_stats[team]['pts_allowed'] in pts_range:
+                defense_fpts[team] += fpts_
+
+
+    defense_data = {
+        'name': [ convert_initials(team_) for team_ in teams ],
+        'team': teams,
+        'opp': [ get_opp(team_) for team_ in teams ],
+        'home': [ int(is_home(team)) for team in teams ],
+        'week': [week] * 2,
+        'score': [ get_score(team) for team in teams ],
+        'opp_score':[ get_opp_score(team) for team in teams ],
+        'winner': [ is_winner(team) for team in teams ],
+        'spread': [ get_spread(team) for team in teams ],
+        'total': [total_score] * 2,
+        'pos': ['DST'] * 2,
+        'fpts': [defense_fpts[team] for team in teams]
+    }
+
+    ########################################################################################################
+    # Kicking
+    ########################################################################################################
+
+    kickers = [clean_name(name_) for name_ in game_page.column('kicking', 'player')]
+
+    n_kickers = len(kickers)
+    
+    convert_kicking_val = lambda kick_val: int(kick_val) if len(kick_val) else 0
+    parse_kicking_stat = lambda kick_stat, kick_val: convert_kicking_val(kick_val) if kick_stat != 'team' else standardize_initials(kick_val)
+    kicking_data = {
+        stat: [parse_kicking_stat(stat, stat_val) for stat_val in game_page.column('kicking', stat)]
+        for stat in ['team', 'xpm', 'fgm']
+    }
+    
+    kicking_fpts = {kicker: 0.0 for kicker in kickers}
+    
+    for stat, multi in KICKING_FPTS_RULES.items():
+        for i, kicking_val in enumerate(kicking_data[stat]):
+            kicking_fpts[kickers[i]] += kicking_val*multi
+            
+    kicking_data = {
+        'name': kickers,
+        'team': [ standardize_initials(team) for team in kicking_data['team'] ],
+        'opp': [ get_opp(team) for team in kicking_data['team'] ],
+        'home': [ int(is_home(team)) for team in kicking_data['team'] ],
+        'week': [week] * n_kickers,
+        'score': [ get_score(team) for team in kicking_data['team'] ],
+        'opp_score':[ get_opp_score(team) for team in kicking_data['team'] ],
+        'winner': [ is_winner(team) for team in kicking_data['team'] ],
+        'spread': [ get_spread(team) for team in kicking_data['team'] ],
+        'total': [total_score] * n_kickers,
+        'pos': ['K'] * n_kickers,
+        'fpts': [kicking_fpts[kicker] for kicker in kickers]
+    }
+    ########################################################################################################
+
+    # fpts_df = (pd
+    #            .concat([
+    #                offense_df,
+    #                pd.DataFrame(defense_data),
+    #                pd.DataFrame(kicking_data)
+    #            ])
+    #            .fillna(0.0) #Careful
+    #            .assign(name=lambda df_: df_.name.str.strip()) # Whitespace issues
+    #           )
+
+    # # File after getting position from Pro-Football-Reference
+    # self.filing.save_boxscore(fpts_df, away_team, home_team)
+    
+    ########################################################################################################
+    # Snap Counts
+    ########################################################################################################
+    snapcounts_tables = {
+        away_team: game_page.table('vis_snap_counts'), #vis not away 
+        home_team: game_page.table('home_snap_counts')
+    }
+    
+    # Two separate tables instead of one combined table --> 2d dict
+    snapcounts_data = {
+        away_team: dict(),
+        home_team: dict()
+    }
+    
+    # Dont want lineman info (for now)
+    target_pos = ('QB', 'WR', 'RB', 'TE')
+    # Only want offensive data (for now) --> data-stat values in HTML
+    snapcount_data_stats = ('player', 'pos', 'offense', 'off_pct')
+    
+    # Going to get everyone at first (easier) --> then will filter dict based on position / index
+    for team, snapcount_columns in snapcounts_tables.items():
+        snapcounts_data[team]['name'] = [clean_name(name_) for name_ in snapcount_columns.get('player', list())]
+    
+        for stat in snapcount_data_stats[1:]:
+            snapcounts_data[team][stat] = list(snapcount_columns.get(stat, list()))
+    
+
+    # Initialize as empty outside loop in order to be used elsewhere
+    name_position = {team_: dict() for team_ in (away_team, home_team)}
+    
+    # Now cleaning
+    
+    for team, snap_info in snapcounts_data.items():
+        # Indexes of positions in target_pos
+        num_entries = len(snap_info['name'])
+        # Can actually use this as positions source instead of relying on external
+        pos_indexes = [i for i in range(num_entries) if snap_info['pos'][i] in target_pos]
+
+        # REMEMBER: snap_info = snapcounts_data[team]
+        name_position[team] = {snap_info['name'][i]: snap_info['pos'][i] for i in pos_indexes}
+        
+        for stat in snap_info:
+            target_pos_values = [snap_info[stat][i] for i in pos_indexes]
+            if stat == 'offense':
+                target_pos_values = [int(val) for val in target_pos_values]
+            elif stat == 'off_pct':
+                target_pos_values = [float(val[:-1]) / 100 for val in target_pos_values]
+            snap_info[stat] = target_pos_values
+
+    # Flatten name_position into 1d dict
+    name_position = {
+        **{name_: pos_ for name_, pos_ in name_position[away_team].items()},
+        **{name_: pos_ for name_, pos_ in name_position[home_team].items()}
+    }
+    
+    # Flattening, adding game info for subsequent individual dataframes 
+    awayteam_df_data = snapcounts_data[away_team]
+    hometeam_df_data = snapcounts_data[home_team]
+    
+    awayteam_num_rows = len(awayteam_df_data['name'])
+    hometeam_num_rows = len(hometeam_df_data['name'])
+    
+    awayteam_df_data['team'] = [away_team] * awayteam_num_rows
+    awayteam_df_data['opp'] = [home_team] * awayteam_num_rows
+    
+    hometeam_df_data['team'] = [home_team] * hometeam_num_rows
+    hometeam_df_data['opp'] = [away_team] * hometeam_num_rows
+
+    awayteam_df_data['week'] = [week] * awayteam_num_rows
+    hometeam_df_data['week'] = [week] * hometeam_num_rows
+    
+    rename_columns = {
+        'offense': 'snap_total',
+        'off_pct': 'snap_percent'
+    }
+    # Make DataFrames
+    away_snapcounts_df, home_snapcounts_df = tuple([
+        (pd
+         .DataFrame(data_)
+         .rename(rename_columns, axis=1)
+        )
+        for data_ in (awayteam_df_data, hometeam_df_data)
+    ])
+
+    snapcounts_dfs = {
+        away_team: away_snapcounts_df,
+        home_team: home_snapcounts_df
+    }
+
+    ########################################################################################################
+    # Filing fpts dataframe here after being able to get positions directly from Pro-Football-Reference
+    ########################################################################################################
+
+    offense_df['pos'] = offense_df['name'].map(lambda name_: name_position.get(name_,'RB')) # Default to RB since sometimes LB or FB or weird positions get rushing attempt
+    
+    fpts_df = (pd
+               .concat([
+                   offense_df,
+                   pd.DataFrame(defense_data),
+                   pd.DataFrame(kicking_data)
+               ])
+               .fillna(0.0) #Careful
+               .assign(name=lambda df_: df_.name.str.strip()) # Whitespace issues
+              )
+
+    # Issues with current setup --> No 2pt conversions available from boxscore data, so also not applied
+
+    # All bonuses worth 3
+    dk_bonuses = {
+        'pass_yds': 300.0,
+        'rush_yds': 100.0,
+        'rec_yds': 100.0
+    }
+
+    fpts_df['bonus'] = 0.0
+    for stat, thresh in dk_bonuses.items():
+        fpts_df.loc[fpts_df[stat] >= thresh, 'bonus'] += 3.0
+
+    fpts_df['fpts'] += fpts_df['bonus']
+
+
+    ########################################################################################################
+    # Advanced Stats
+    ########################################################################################################
+
+    ADV_COLUMNS = {
+        'passing': ADV_PASSING_COLUMNS[1:],
+        'rushing': ADV_RUSHING_COLUMNS[1:],
+        'receiving': ADV_RECEIVING_COLUMNS[1:]
+    }
+
+    # (category, team, df) --> filed per team like the old loop
+    advanced_dfs: list[tuple[str, str, pd.DataFrame]] = list()
+
+    for category in ('passing', 'rushing', 'receiving'):
+        adv_table_names = [clean_name(name_) for name_ in game_page.column(f'{category}_advanced', 'player')]
+
+        adv_data = {
+            **{
+                'name': adv_table_names,
+                'pos': [name_position.get(name_, 'RB') for name_ in adv_table_names],
+            },
+            **{
+                stat: [parse_adv_stat(stat, stat_val) for stat_val in game_page.column(f'{category}_advanced', stat)]
+                for stat in ADV_COLUMNS[category]
+            }
+        }
+
+        adv_df = pd.DataFrame(adv_data)
+        adv_df['week'] = week
+        
+        # Save as individual team dataframe
+        for team_ in adv_df['team'].drop_duplicates():
+            team_adv_df = adv_df.loc[adv_df['team'] == team_]
+            advanced_dfs.append((category, team_, team_adv_df))
+
+    if timings is not None:
+        timings['score'] = time.perf_counter() - parsed
+
+    return {
+        'week': week,
+        'away': away_team,
+        'home': home_team,
+        'boxscore': fpts_df,
+        'snapcounts': snapcounts_dfs,
+        'advanced': advanced_dfs,
+    }
+
+
+def timed_score(url: str, html: str, week: int, timings: bool = False) -> tuple[str, dict|Exception, float]:
+    """
+    score_game for the pipeline --> (url, result or the exception it raised, seconds spent)
+    timings=True --> result['timings'] has the seconds per step
+    """
+    start = time.perf_counter()
+    try:
+        steps = dict() if timings else None
+        result = {'url': url, **score_game(html, week, steps)}
+        if timings:
+            result['timings'] = steps
+    except Exception as error:
+        result = error
+    return url, result, time.perf_counter() - start
+
+
+def write_game(filing, result: dict) -> list[str]:
+    """
+    Files one score_game result, returns the paths written
+    """
+    week: int = result['week']
+    fpaths: list[str] = list()
+
+    for team, df_ in result['snapcounts'].items():
+        fpaths.append(filing.save_snapcounts(df_, team, week))
+
+    # File after getting position from Pro-Football-Reference
+    fpaths.append(filing.save_boxscore(result['boxscore'], result['away'], result['home']))
+
+    for category, team_, team_adv_df in result['advanced']:
+        # Parameters: df, stat_category, team, week
+        fpaths.append(filing.save_advanced_stats(team_adv_df, category, team_, week))
+
+    return fpaths
@@ -17,6 +17,13 @@ pfr_standard: dict[[str], str] = {
     'lvr': 'lv', # Raiders 2
     'sdg': 'lac', # Chargers
     'tam': 'tb', # Buccaneers
+
+    # Older seasons --> franchise's current abbreviation, so a team lines up across years
+    'oak': 'lv', # Oakland Raiders (through 2019)
+    'sd': 'lac', # San Diego Chargers (through 2016)
+    'stl': 'lar', # St. Louis Rams (through 2015)
+    'la': 'lar', # Rams 2016
+    'wsh': 'was', # Washington
 }
 
 def standardize_initials(team):
@@ -67,7 +74,19 @@ teamname_initials: dict[[str], str] = {
 }
 
 
+# Names PFR scoreboxes used in older seasons, same initials as the franchise today
+former_teamname_initials: dict[[str], str] = {
+    'Oakland Raiders': 'LV',
+    'San Diego Chargers': 'LAC',
+    'St. Louis Rams': 'LAR',
+    'Washington Redskins': 'WAS',
+    'Washington Football Team': 'WAS',
+}
+
+
 def convert_teamname(team_str):
+    if team_str in former_teamname_initials:
+        return former_teamname_initials[team_str]
     return teamname_initials[team_str]
 
 # No City --> For Defenses 
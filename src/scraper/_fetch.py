@@ -0,0 +1,268 @@
+import time
+import queue
+import random
+import asyncio
+import threading
+
+import requests
+
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+from requests.adapters import HTTPAdapter
+
+
+"""
+
+CONCURRENT RATE-LIMITED PAGE FETCHING
+
+Every request takes a token from one shared token bucket --> the whole scraper runs at the site limit, no sleeps between games
+Requests themselves are blocking (requests.Session, keep-alive pool) and run in worker threads under asyncio
+A 429 / 503 pauses the whole bucket for Retry-After (or exponential backoff), other failures back off per request
+iter_pages runs the loop in a background thread --> pages are parsed as they arrive while the next ones download
+
+"""
+
+# Pro-Football-Reference blocks anything over 20 requests a minute
+RATE_PER_MINUTE: float = 20.0
+
+# Statuses worth trying again --> rate limited / temporarily down
+RETRY_STATUSES: tuple[int,...] = (429, 500, 502, 503, 504)
+
+HEADERS: dict[str, str] = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/117.0',
+    'Accept': 'text/html,application/xhtml+xml',
+}
+
+
+class RetryableError(Exception):
+    def __init__(self, url: str, status: int|None = None, retry_after: float|None = None):
+        super().__init__(f'{url} --> {status if status is not None else "connection error"}')
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str|None) -> float|None:
+    """
+    Retry-After header --> seconds to wait (it can be either seconds or an HTTP date)
+    """
+    if value is None or not len(value.strip()):
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def make_session(pool_size: int = 8) -> requests.Session:
+    """
+    One keep-alive connection pool shared by every request (retries are handled by Fetcher, not urllib3)
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def http_getter(session: requests.Session, timeout: float = 30.0) -> Callable[[str], str]:
+    """
+    url --> page text, RetryableError for anything worth trying again
+    """
+    def get(url: str) -> str:
+        try:
+            response = session.get(url, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as error:
+            raise RetryableError(url) from error
+
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableError(url, response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+
+        response.raise_for_status()
+        return response.text
+
+    return get
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float = RATE_PER_MINUTE, **kwargs):
+        """
+        rate_per_minute --> sustained requests per minute
+        burst --> tokens that can build up while idle (1 keeps requests evenly spaced)
+        """
+        self.rate: float = rate_per_minute / 60.0
+        self.capacity: float = float(kwargs.get('burst', 1))
+        self.tokens: float = self.capacity
+
+        self.updated: float = time.monotonic()
+        self.paused_until: float = 0.0
+
+        # Plain lock --> the bucket can be shared by several event loops / threads (one per Fetcher)
+        self.lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Takes a token (possibly going into debt), returns seconds to wait before using it
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            self.tokens -= 1.0
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+            return max(wait, self.paused_until - now)
+
+    async def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Nobody gets a token for the next seconds (server said to back off)
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class Fetcher:
+    def __init__(self, **kwargs):
+        """
+        rate_per_minute / burst --> token bucket (or limiter=TokenBucket to share one between fetchers)
+        concurrency --> requests in flight at once (threads, keep-alive connections)
+        retries / backoff --> attempts after the first, base seconds doubled every attempt (plus jitter)
+        getter --> url -> text, defaults to a pooled requests.Session
+        metrics --> Metrics for retries and rate limit waits (None --> not counted)
+        """
+        self.limiter: TokenBucket = kwargs.get('limiter', None) or TokenBucket(kwargs.get('rate_per_minute', RATE_PER_MINUTE), burst=kwargs.get('burst', 1))
+
+        self.concurrency: int = kwargs.get('concurrency', 4)
+        self.retries: int = kwargs.get('retries', 4)
+        self.backoff: float = kwargs.get('backoff', 2.0)
+        self.max_backoff: float = kwargs.get('max_backoff', 120.0)
+
+        self.session = kwargs.get('session', None) or make_session(self.concurrency)
+        self.getter: Callable[[str], str] = kwargs.get('getter', None) or http_getter(self.session, kwargs.get('timeout', 30.0))
+
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='fetch')
+
+        self.metrics = kwargs.get('metrics', None)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def delay(self, attempt: int, error: RetryableError) -> float:
+        """
+        Retry-After when the server sent one, otherwise exponential backoff with jitter
+        """
+        if error.retry_after is not None:
+            return error.retry_after
+
+        return min(self.backoff * 2**attempt, self.max_backoff) * random.uniform(1.0, 1.25)
+
+    async def fetch(self, url: str) -> str:
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.retries+1):
+            start = time.perf_counter()
+            await self.limiter.acquire()
+            if self.metrics is not None:
+                self.metrics.time('rate_limit_wait', time.perf_counter() - start)
+
+            try:
+                return await loop.run_in_executor(self.executor, self.getter, url)
+            except RetryableError as error:
+                if self.metrics is not None:
+                    self.metrics.count(f'http_{error.status if error.status is not None else "connection_error"}')
+                    self.metrics.count('fetch_retries' if attempt < self.retries else 'fetch_failures')
+
+                if attempt == self.retries:
+                    raise
+
+                wait = self.delay(attempt, error)
+                if error.status in (429, 503):
+                    # Whole site is pushing back --> everyone waits, not just this request
+                    self.limiter.pause(wait)
+                    continue
+
+                await asyncio.sleep(wait)
+
+    async def fetch_many(self, urls: Iterable[str], results: queue.Queue) -> None:
+        """
+        Every url fetched concurrently (at most concurrency in flight), (url, text or exception) put on results as each finishes
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(url: str) -> None:
+            async with semaphore:
+                try:
+                    results.put((url, await self.fetch(url)))
+                except Exception as error:
+                    results.put((url, error))
+
+        await asyncio.gather(*(one(url) for url in urls))
+
+    def iter_pages(self, urls: Iterable[str], raise_errors: bool = True) -> Iterator[tuple[str, str|Exception]]:
+        """
+        (url, text) in the order pages finish downloading
+        Event loop runs in its own thread --> works inside Jupyter too, and the caller parses while fetches continue
+        A url that still fails after every retry raises when its turn comes (raise_errors=False --> (url, exception) and keeps going)
+        Raising or stopping early cancels every fetch not started yet --> nothing keeps using the rate limit in the background
+        """
+        urls = list(dict.fromkeys(urls))
+        results: queue.Queue = queue.Queue()
+
+        loop = asyncio.new_event_loop()
+        main = loop.create_task(self.fetch_many(urls, results))
+
+        def run() -> None:
+            try:
+                loop.run_until_complete(main)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                loop.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+
+        try:
+            for _ in range(len(urls)):
+                url, page = results.get()
+                if isinstance(page, Exception) and raise_errors:
+                    raise page
+                yield url, page
+        finally:
+            try:
+                loop.call_soon_threadsafe(main.cancel)
+            except RuntimeError:
+                # Loop already finished and closed --> nothing left to cancel
+                pass
+            thread.join()
+
+    def get(self, url: str) -> str:
+        """
+        Single page, blocking
+        """
+        for _, page in self.iter_pages([url]):
+            return page
@@ -0,0 +1,30 @@
+import re
+
+
+"""
+
+COMMENTED TABLES
+
+Pro-Football-Reference ships most boxscore tables (player_defense, kicking, *_snap_counts, *_advanced ...) inside HTML comments
+and un-comments them with JavaScript after the page loads --> why the scraper used to need a browser
+Dropping the comment markers around anything holding a <table> gives the same markup the browser ends up with
+
+"""
+
+# Non-greedy --> each comment on its own, never spanning from one comment to the next
+COMMENT = re.compile(r'<!--(.*?)-->', re.DOTALL)
+
+
+def _reveal(match: re.Match) -> str:
+    inner: str = match.group(1)
+    return inner if '<table' in inner else match.group(0)
+
+
+def uncomment_tables(html: str) -> str:
+    """
+    Raw page --> same page with every commented-out table put back in the document (other comments left alone)
+    """
+    if '<!--' not in html:
+        return html
+
+    return COMMENT.sub(_reveal, html)
@@ -0,0 +1,204 @@
+import os
+import json
+import datetime
+import threading
+
+
+"""
+
+SEASON MANIFEST + JOURNAL
+
+data/{season}/manifest.json --> one entry per boxscore url:
+    week, status (done / failed / dead), sha256 of the page parsed, schedule row hash, files written (relative to the season dir),
+    attempts (runs in a row it failed in), error, queued (part of the current plan and not finished)
+Every change is appended to journal.jsonl first (flushed + fsynced) --> a crash loses nothing already recorded
+save() checkpoints: snapshot rewritten through a temp file + rename, then the journal is emptied
+Loading = last snapshot + whatever the journal has after it (replaying a line twice changes nothing)
+The games a run set out to scrape (plan) are kept too --> resume picks up exactly those that aren't done
+
+A game is scraped again only when it's new, didn't finish last time, or its schedule row changed
+Failing max_attempts runs in a row puts it on the dead-letter list (status dead) until something changes or it's asked for
+
+"""
+
+MANIFEST_FNAME: str = 'manifest.json'
+JOURNAL_FNAME: str = 'journal.jsonl'
+
+# Runs in a row a game failed in before it's dead-lettered (retry rounds within a run count once)
+MAX_ATTEMPTS: int = 5
+
+
+def now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+
+
+class Manifest:
+    def __init__(self, season_dir: str, **kwargs):
+        """
+        season_dir --> Filing season directory
+        max_attempts --> runs in a row a game can fail in before it goes on the dead-letter list
+        """
+        self.season_dir = season_dir
+        self.fpath = os.path.join(season_dir, MANIFEST_FNAME)
+        self.journal_fpath = os.path.join(season_dir, JOURNAL_FNAME)
+        self.max_attempts: int = kwargs.get('max_attempts', MAX_ATTEMPTS)
+
+        # Updated from the fetch thread (hashes) and the writer (files)
+        self.lock = threading.Lock()
+
+        self.games: dict[str, dict] = dict()
+        # {url: week} the last run set out to scrape
+        self.plan: dict[str, int] = dict()
+        self.load()
+
+    def load(self) -> None:
+        if os.path.exists(self.fpath):
+            with open(self.fpath) as f:
+                snapshot = json.load(f)
+            self.games = snapshot.get('games', dict())
+            self.plan = snapshot.get('plan', dict())
+
+        if not os.path.exists(self.journal_fpath):
+            return
+
+        with open(self.journal_fpath) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Line cut short by a crash --> that change never counted
+                    continue
+
+                if 'plan' in record:
+                    self.plan = record['plan']
+                else:
+                    self.games.setdefault(record.pop('url'), dict()).update(record)
+
+    def log(self, record: dict) -> None:
+        """
+        Appends one change to the journal, on disk before this returns
+        """
+        with open(self.journal_fpath, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def save(self) -> None:
+        """
+        Checkpoint --> snapshot of everything, journal emptied
+        """
+        with self.lock:
+            tmp_fpath = f'{self.fpath}.tmp'
+            with open(tmp_fpath, 'w') as f:
+                json.dump({'plan': self.plan, 'games': self.games}, f, indent=1, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_fpath, self.fpath)
+
+            # Crash before this --> journal replays onto a snapshot that already has it, same result
+            open(self.journal_fpath, 'w').close()
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.games
+
+    def get(self, url: str) -> dict|None:
+        return self.games.get(url)
+
+    def update(self, url: str, **fields) -> dict:
+        with self.lock:
+            fields['updated_at'] = now()
+            self.log({'url': url, **fields})
+
+            entry = self.games.setdefault(url, dict())
+            entry.update(fields)
+            return entry
+
+    def set_plan(self, games: dict[str, int]) -> None:
+        """
+        Games a run is about to scrape, each flagged queued until it's filed, skipped or dead-lettered
+        """
+        with self.lock:
+            self.log({'plan': games})
+            self.plan = dict(games)
+
+        for url, week in games.items():
+            self.update(url, week=week, queued=True)
+
+    def remaining(self) -> dict[str, int]:
+        """
+        Planned games still queued
+        """
+        return {url: week for url, week in self.plan.items() if self.games.get(url, dict()).get('queued', False)}
+
+    def changed(self, entry: dict, **kwargs) -> bool:
+        for key in ('row', 'sha256'):
+            if kwargs.get(key) is not None and entry.get(key) is not None and kwargs[key] != entry[key]:
+                return True
+        return False
+
+    def is_done(self, url: str, **kwargs) -> bool:
+        """
+        Filed already and nothing says it changed
+        row --> current schedule row hash (only compared when both sides have one)
+        sha256 --> current page hash, same idea
+        Every file it wrote has to still be there
+        """
+        entry = self.games.get(url)
+        if entry is None or entry.get('status') != 'done' or self.changed(entry, **kwargs):
+            return False
+
+        # Files deleted since --> filed again
+        return all(os.path.exists(os.path.join(self.season_dir, fpath)) for fpath in entry.get('files', list()))
+
+    def is_dead(self, url: str, **kwargs) -> bool:
+        """
+        On the dead-letter list and its schedule row hasn't changed since
+        """
+        entry = self.games.get(url)
+        return entry is not None and entry.get('status') == 'dead' and not self.changed(entry, **kwargs)
+
+    def done(self, url: str, fpaths: list[str], **fields) -> dict:
+        return self.update(
+            url,
+            status='done',
+            files=sorted(os.path.relpath(fpath, self.season_dir) for fpath in fpaths),
+            attempts=0,
+            error=None,
+            queued=False,
+            **fields
+        )
+
+    def failed(self, url: str, error: BaseException, retried: bool = False, **fields) -> dict:
+        """
+        Failure recorded --> dead once it's failed max_attempts runs in a row
+        retried=True --> a retry round of a run that already counted this game's attempt (error updated, attempts not)
+        """
+        attempts: int = self.games.get(url, dict()).get('attempts', 0) + (0 if retried else 1)
+        return self.update(
+            url,
+            status='dead' if attempts >= self.max_attempts else 'failed',
+            queued=attempts < self.max_attempts,
+            attempts=attempts,
+            error=f'{type(error).__name__}: {error}',
+            **fields
+        )
+
+    def dead_letters(self) -> dict[str, dict]:
+        return {url: entry for url, entry in self.games.items() if entry.get('status') == 'dead'}
+
+    def revive(self, urls) -> None:
+        """
+        Dead-lettered games back in line, attempts from zero
+        """
+        for url in urls:
+            if url in self.games:
+                self.update(url, status='failed', attempts=0)
+
+    def counts(self) -> dict[str, int]:
+        counts: dict[str, int] = dict()
+        for entry in self.games.values():
+            counts[entry.get('status')] = counts.get(entry.get('status'), 0) + 1
+        return counts
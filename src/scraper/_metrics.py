@@ -0,0 +1,140 @@
+import json
+import time
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+
+from collections.abc import Callable
+
+
+"""
+
+SCRAPER METRICS
+
+Counters (pages, bytes, retries, rows ...) and timers (fetch latency, rate limit waits, parse per table, scoring, writes)
+Fed from wherever the work happens:
+    fetch --> Fetcher (retries, limiter waits) + the getter wrap (latency, bytes)
+    parse + score --> timings score_game sends back with each result (measured in the worker process)
+    file --> Scraper.write_games (seconds, rows, files)
+summary() / frame() at the end of a run, log_fpath --> one JSON line per game as it finishes (filed, skipped or failed)
+metrics=False on the Scraper --> no Metrics at all, every hook is a single `is not None` check
+
+"""
+
+
+def now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+
+
+class Metrics:
+    def __init__(self, **kwargs):
+        """
+        log_fpath --> JSON lines file, one line appended per game
+        """
+        self.log_fpath: str|None = kwargs.get('log_fpath', None)
+
+        # Touched from fetch threads, the pipeline threads and the writer
+        self.lock = threading.Lock()
+
+        self.start: float = time.perf_counter()
+        self.counters: dict[str, float] = dict()
+        self.timers: dict[str, list[float]] = dict()
+
+        # url --> what's known about a game so far, logged + dropped once it finishes
+        self.games: dict[str, dict] = dict()
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def time(self, name: str, seconds: float) -> None:
+        with self.lock:
+            self.timers.setdefault(name, list()).append(seconds)
+
+    def times(self, timings: dict[str, float], prefix: str = '') -> None:
+        with self.lock:
+            for name, seconds in timings.items():
+                self.timers.setdefault(f'{prefix}{name}', list()).append(seconds)
+
+    def game(self, url: str, **fields) -> None:
+        with self.lock:
+            self.games.setdefault(url, dict()).update(fields)
+
+    def finish_game(self, url: str, status: str, **fields) -> None:
+        """
+        Game done with (filed / skipped / failed) --> its line in the log
+        """
+        self.count(f'games_{status}')
+
+        with self.lock:
+            record = {'url': url, 'status': status, **self.games.pop(url, dict()), **fields, 'at': now()}
+
+            if self.log_fpath is not None:
+                with open(self.log_fpath, 'a') as f:
+                    f.write(json.dumps(record, default=str) + '\n')
+
+    def wrap(self, getter: Callable[[str], str]) -> Callable[[str], str]:
+        """
+        getter that times every page it fetches and counts its bytes
+        """
+        def get(url: str) -> str:
+            start = time.perf_counter()
+            try:
+                html = getter(url)
+            except Exception:
+                self.count('fetch_errors')
+                raise
+
+            seconds = time.perf_counter() - start
+            n_bytes = len(html.encode('utf-8'))
+
+            self.count('pages_fetched')
+            self.count('bytes_fetched', n_bytes)
+            self.time('fetch', seconds)
+            self.game(url, fetch_seconds=round(seconds, 4), bytes=n_bytes)
+
+            return html
+
+        return get
+
+    def summary(self) -> dict:
+        """
+        Everything so far --> {seconds, counters, timers: {name: {count, total, mean, p50, p95, max}}}
+        """
+        with self.lock:
+            counters = dict(self.counters)
+            timers = {name: np.array(values) for name, values in self.timers.items()}
+
+        return {
+            'seconds': round(time.perf_counter() - self.start, 3),
+            'counters': counters,
+            'timers': {
+                name: {
+                    'count': len(values),
+                    'total': round(float(values.sum()), 4),
+                    'mean': round(float(values.mean()), 4),
+                    'p50': round(float(np.percentile(values, 50)), 4),
+                    'p95': round(float(np.percentile(values, 95)), 4),
+                    'max': round(float(values.max()), 4),
+                }
+                for name, values in timers.items() if len(values)
+            },
+        }
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Timers as a table, slowest total first
+        """
+        timers = self.summary()['timers']
+        if not len(timers):
+            return pd.DataFrame(columns=['count', 'total', 'mean', 'p50', 'p95', 'max'])
+
+        return pd.DataFrame(timers).T.sort_values('total', ascending=False)
+
+    def report(self) -> None:
+        summary = self.summary()
+        print(f"Run took {summary['seconds']}s")
+        print(' | '.join(f'{name}: {round(value, 2) if isinstance(value, float) else value}' for name, value in sorted(summary['counters'].items())))
+        print(self.frame().to_string())
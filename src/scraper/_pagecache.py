@@ -0,0 +1,149 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import datetime
+import threading
+
+from collections.abc import Callable
+
+
+"""
+
+RAW PAGE CACHE
+
+Every fetched page is kept gzipped under its content hash --> objects/ab/abcdef....html.gz (same page twice is stored once)
+index.jsonl maps url --> hash + fetch metadata, one line appended per fetch (last line for a url wins)
+Writes go to a temp file first and are renamed into place, a crash never leaves half a page behind
+Replay reads pages back by url without ever touching the network --> re-parse a season offline, or use it as a fixture set
+
+"""
+
+INDEX_FNAME: str = 'index.jsonl'
+
+
+class PageCache:
+    def __init__(self, root: str, **kwargs):
+        """
+        root --> cache directory (shared by every season, pages are looked up by url)
+        level --> gzip compression level
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_fpath = os.path.join(root, INDEX_FNAME)
+        self.level: int = kwargs.get('level', 6)
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        # Pages are stored from fetch worker threads
+        self.lock = threading.Lock()
+        self.index: dict[str, dict] = self.load_index()
+
+    def load_index(self) -> dict[str, dict]:
+        index: dict[str, dict] = dict()
+        if not os.path.exists(self.index_fpath):
+            return index
+
+        with open(self.index_fpath) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Line cut short by a crash --> the page it pointed to may be fine, but the fetch gets redone
+                    continue
+                index[entry['url']] = entry
+
+        return index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.index
+
+    def object_fpath(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f'{digest}.html.gz')
+
+    def put(self, url: str, html: str, **meta) -> str:
+        """
+        Stores html for url (content only written if it's new), returns its sha256
+        meta --> anything extra to keep with the fetch (seconds, source ...)
+        """
+        raw = html.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        fpath = self.object_fpath(digest)
+
+        if not os.path.exists(fpath):
+            os.makedirs(os.path.dirname(fpath), exist_ok=True)
+            tmp_fpath = f'{fpath}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_fpath, 'wb') as f:
+                f.write(gzip.compress(raw, compresslevel=self.level))
+            os.replace(tmp_fpath, fpath)
+
+        entry = {
+            'url': url,
+            'sha256': digest,
+            'bytes': len(raw),
+            'stored_bytes': os.path.getsize(fpath),
+            'fetched_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            **meta,
+        }
+
+        with self.lock:
+            with open(self.index_fpath, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+            self.index[url] = entry
+
+        return digest
+
+    def get(self, url: str) -> str|None:
+        """
+        Last stored page for url, None if it was never fetched
+        """
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+
+        with open(self.object_fpath(entry['sha256']), 'rb') as f:
+            return gzip.decompress(f.read()).decode('utf-8')
+
+    def read(self, url: str) -> str:
+        """
+        Same as get, but a missing page is an error (replay never falls back to the network)
+        """
+        html = self.get(url)
+        if html is None:
+            raise KeyError(f'{url} is not in the page cache at {self.root}')
+        return html
+
+    def meta(self, url: str) -> dict|None:
+        return self.index.get(url)
+
+    def wrap(self, getter: Callable[[str], str], source: str = 'http') -> Callable[[str], str]:
+        """
+        getter that stores every page it fetches (timed), for Fetcher(getter=...)
+        """
+        def get(url: str) -> str:
+            start = time.perf_counter()
+            html = getter(url)
+            self.put(url, html, source=source, seconds=round(time.perf_counter() - start, 4))
+            return html
+
+        return get
+
+    def compact(self) -> int:
+        """
+        Rewrites index.jsonl with only the latest entry per url, returns lines dropped
+        """
+        with self.lock:
+            with open(self.index_fpath) as f:
+                n_lines = sum(1 for _ in f)
+
+            tmp_fpath = f'{self.index_fpath}.tmp'
+            with open(tmp_fpath, 'w') as f:
+                for entry in self.index.values():
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(tmp_fpath, self.index_fpath)
+
+        return n_lines - len(self.index)
@@ -0,0 +1,347 @@
+import os
+import time
+import queue
+import datetime
+import threading
+import multiprocessing as mp
+
+import pandas as pd
+
+from collections.abc import Callable, Iterable
+
+from tqdm.auto import tqdm
+
+from ._boxscore import timed_score
+
+
+"""
+
+STAGED BOXSCORE PIPELINE
+
+fetch --> parse + score --> file, each stage running at the same time with a bounded queue between them
+    fetch: own thread pulling (url, html, week) from the page source (Fetcher / page cache), I/O bound
+    parse + score: score_game in a process pool (or inline with workers=0), at most a few pages in flight per worker
+    file: main thread, hands whatever results are waiting to write in batches
+A full queue stalls the stage feeding it --> memory stays flat however far fetch or parse gets ahead
+Stages can be used alone: no write --> results handed back (parse-only from cached html), Scraper.fetch_games --> fetch-only
+A page handed in as None is counted as skipped (unchanged since it was last filed), one handed in as an exception as failed
+
+"""
+
+# End of stream marker between stages
+DONE = None
+
+
+def resolve_workers(workers: int|None) -> int:
+    """
+    None --> one process per core, leaving one for fetching and filing (0 on a single core --> parse inline)
+    """
+    if workers is None:
+        return max((os.cpu_count() or 1) - 1, 0)
+
+    return max(int(workers), 0)
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.items: int = 0
+        # Seconds actually spent on the stage's work (summed over workers for parse + score)
+        self.busy: float = 0.0
+        self.start: float|None = None
+        self.end: float|None = None
+
+    def begin(self) -> None:
+        self.start = time.perf_counter()
+
+    def finish(self) -> None:
+        self.end = time.perf_counter()
+
+    @property
+    def wall(self) -> float:
+        if self.start is None:
+            return 0.0
+        return (self.end or time.perf_counter()) - self.start
+
+    def as_dict(self) -> dict:
+        return {
+            'stage': self.name,
+            'items': self.items,
+            'busy_seconds': round(self.busy, 3),
+            'wall_seconds': round(self.wall, 3),
+            'per_minute': round(60*self.items / self.wall, 1) if self.wall > 0 else 0.0,
+        }
+
+
+class PipelineError(RuntimeError):
+    def __init__(self, failed: dict[str, BaseException]):
+        super().__init__(f'{len(failed)} game(s) failed --> ' + ', '.join(failed))
+        self.failed = failed
+
+
+class Pipeline:
+    def __init__(self, write: Callable[[list[dict]], int]|None = None, **kwargs):
+        """
+        write --> files a batch of score_game results, returns files written (None --> run hands the results back)
+        workers --> parse + score processes (0 --> in the pipeline's own thread, None --> cores - 1)
+        queue_size --> pages / results allowed to wait between stages
+        batch_size --> most results handed to write at once
+        total --> number of games for the progress bar
+        report_every --> seconds between progress lines (games done, games per minute, ETA), None for none
+        timings --> score_game sends back seconds per parse / score step with every result
+        """
+        self.write = write
+        self.workers: int = resolve_workers(kwargs.get('workers', None))
+        self.queue_size: int = kwargs.get('queue_size', 8)
+        self.batch_size: int = kwargs.get('batch_size', 16)
+        self.total: int|None = kwargs.get('total', None)
+        self.PROGRESS_BAR = kwargs.get('progress_bar', True)
+        self.report_every: float|None = kwargs.get('report_every', None)
+        self.TIMINGS = kwargs.get('timings', False)
+
+        self.stats: dict[str, StageStats] = {name: StageStats(name) for name in ('fetch', 'score', 'write')}
+        self.files_written: int = 0
+        self.skipped: int = 0
+        # Games through the writer either way (filed, skipped or failed)
+        self.processed: int = 0
+
+        # url --> exception, games that never made it to write (fetch or parse failures)
+        self.failed: dict[str, BaseException] = dict()
+
+    def fetch_stage(self, pages: Iterable[tuple[str, str, int]], pages_q: queue.Queue) -> None:
+        stats = self.stats['fetch']
+        stats.begin()
+
+        pages = iter(pages)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    page = next(pages)
+                except StopIteration:
+                    break
+                stats.busy += time.perf_counter() - start
+                stats.items += 1
+
+                # Blocks while parse is behind --> backpressure on the fetcher
+                pages_q.put(page)
+        except Exception as error:
+            # Page that still failed after every retry ends the fetch, everything already fetched still gets filed
+            self.failed[getattr(error, 'url', 'fetch')] = error
+        finally:
+            stats.finish()
+            pages_q.put(DONE)
+
+    def score_stage(self, pool, pages_q: queue.Queue, results_q: queue.Queue) -> None:
+        stats = self.stats['score']
+        stats.begin()
+
+        # Pages handed to the pool but not back yet
+        slots = threading.BoundedSemaphore(max(2*self.workers, 1))
+
+        def done(result: tuple) -> None:
+            slots.release()
+            results_q.put(result)
+
+        try:
+            for url, html, week in iter(pages_q.get, DONE):
+                # Skipped, or the fetch itself failed --> straight through to the writer
+                if html is None or isinstance(html, BaseException):
+                    results_q.put((url, html, 0.0))
+                    continue
+
+                if pool is None:
+                    results_q.put(timed_score(url, html, week, self.TIMINGS))
+                    continue
+
+                slots.acquire()
+                pool.apply_async(
+                    timed_score, (url, html, week, self.TIMINGS),
+                    callback=done,
+                    error_callback=lambda error, url=url: done((url, error, 0.0)),
+                )
+
+            if pool is not None:
+                pool.close()
+                pool.join()
+        finally:
+            stats.finish()
+            results_q.put(DONE)
+
+    def write_batch(self, batch: list[dict]) -> None:
+        stats = self.stats['write']
+        start = time.perf_counter()
+        self.files_written += self.write(batch)
+        stats.busy += time.perf_counter() - start
+        stats.items += len(batch)
+
+    def progress(self) -> dict:
+        """
+        Games done so far, games per minute since the start, estimated time left (None until there's a rate)
+        """
+        wall: float = self.stats['write'].wall
+        per_minute: float = 60*self.processed / wall if wall > 0 else 0.0
+
+        remaining = (self.total - self.processed) if self.total is not None else None
+        eta = datetime.timedelta(seconds=round(60*remaining / per_minute)) if remaining is not None and per_minute > 0 else None
+
+        return {'done': self.processed, 'total': self.total, 'per_minute': round(per_minute, 1), 'eta': eta}
+
+    def report(self) -> None:
+        progress = self.progress()
+        print(f"{progress['done']}/{progress['total']} games | {progress['per_minute']} games/min | ETA {progress['eta']}")
+
+    def run(self, pages: Iterable[tuple[str, str, int]]) -> list[dict]:
+        """
+        pages --> (url, html, week) per game, in any order (html None --> skipped, exception --> failed fetch)
+        Returns the results when there's no write (empty list otherwise), raises PipelineError after everything else is filed if any game failed
+        """
+        pages_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        results_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        # Pool forked before any pipeline thread starts
+        pool = mp.Pool(processes=self.workers) if self.workers > 0 else None
+
+        threads = [
+            threading.Thread(target=self.fetch_stage, args=(pages, pages_q), daemon=True),
+            threading.Thread(target=self.score_stage, args=(pool, pages_q, results_q), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        self.stats['write'].begin()
+        progress = tqdm(total=self.total) if self.PROGRESS_BAR else None
+
+        results: list[dict] = list()
+        batch: list[dict] = list()
+        finished = False
+        last_report: float = time.perf_counter()
+
+        try:
+            while not finished:
+                # Wait for one result, then take whatever else is already waiting (up to batch_size)
+                item = results_q.get()
+                while True:
+                    if item is DONE:
+                        finished = True
+                        break
+
+                    url, result, seconds = item
+                    self.stats['score'].busy += seconds
+                    if result is None:
+                        self.skipped += 1
+                    elif isinstance(result, BaseException):
+                        self.failed[url] = result
+                    else:
+                        self.stats['score'].items += 1
+                        batch.append(result)
+
+                    self.processed += 1
+                    if progress is not None:
+                        progress.update(1)
+
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = results_q.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if len(batch):
+                    if self.write is None:
+                        results.extend(batch)
+                        self.stats['write'].items += len(batch)
+                    else:
+                        self.write_batch(batch)
+                    batch = list()
+
+                if self.report_every is not None and time.perf_counter() - last_report >= self.report_every:
+                    self.report()
+                    last_report = time.perf_counter()
+        finally:
+            self.stats['write'].finish()
+            if progress is not None:
+                progress.close()
+            if pool is not None:
+                pool.terminate()
+            for thread in threads:
+                thread.join(timeout=1.0)
+
+        if len(self.failed):
+            raise PipelineError(self.failed)
+
+        return results
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Items, busy / wall seconds and games per minute for each stage
+        """
+        return pd.DataFrame([stats.as_dict() for stats in self.stats.values()]).set_index('stage')
+
+
+def run_rounds(runner, games: dict[str, int], **kwargs) -> dict[str, dict]:
+    """
+    games --> {boxscore url: week} through Pipeline rounds, games that fail go again after a doubling backoff (runner.game_retries rounds)
+    runner (Scraper / Backfill) --> write_games(batch), changed_pages(games), record_failed(url, error, week, retried) --> manifest entry, checkpoint()
+        plus workers, queue_size, batch_size, game_retries, game_backoff, max_game_backoff, REPLAY, metrics (None --> no timings)
+    REPLAY --> no retry rounds, pages come from the cache so a failure would only repeat on the same bytes
+    write=False --> results kept in runner.results instead of filed, progress_bar / report_every / workers go to every Pipeline
+    Returns {url: manifest entry} for games still failing at the end (dead-lettered or left for the next run)
+    """
+    runner.pipelines = list()
+    runner.results = list()
+
+    failed: dict[str, dict] = dict()
+    pending: dict[str, int] = dict(games)
+
+    for round_ in range((0 if runner.REPLAY else runner.game_retries)+1):
+        if round_:
+            wait = min(runner.game_backoff * 2**(round_-1), runner.max_game_backoff)
+            print(f'Retrying {len(pending)} game(s) in {wait:.0f}s')
+            if runner.metrics is not None:
+                runner.metrics.count('game_retries', len(pending))
+            time.sleep(wait)
+
+        runner.pipeline = Pipeline(
+            runner.write_games if kwargs.get('write', True) else None,
+            workers=kwargs.get('workers', runner.workers),
+            queue_size=runner.queue_size,
+            batch_size=runner.batch_size,
+            total=len(pending),
+            progress_bar=kwargs.get('progress_bar', True),
+            report_every=kwargs.get('report_every', None),
+            timings=runner.metrics is not None
+        )
+        runner.pipelines.append(runner.pipeline)
+
+        try:
+            runner.results.extend(runner.pipeline.run(runner.changed_pages(pending)))
+            errors = dict()
+        except PipelineError as error:
+            errors = error.failed
+
+        retry: dict[str, int] = dict()
+        for url, error_ in errors.items():
+            # Anything not tied to one game (fetch stage itself) --> those games just aren't done, the next run has them
+            if url not in games:
+                continue
+
+            failed[url] = runner.record_failed(url, error_, games[url], round_ > 0)
+            if failed[url]['status'] != 'dead':
+                retry[url] = games[url]
+
+        runner.checkpoint()
+
+        pending = retry
+        if not len(pending):
+            break
+
+    # Entries are the manifest's own --> a game that came good on a later round reads done by now
+    return {url: entry for url, entry in failed.items() if entry['status'] != 'done'}
+
+
+def rounds_summary(pipelines: list[Pipeline]) -> pd.DataFrame:
+    """
+    Stage throughput of every round
+    """
+    return pd.concat({round_: pipeline.summary() for round_, pipeline in enumerate(pipelines)}, names=['round'])
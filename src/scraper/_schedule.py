@@ -0,0 +1,92 @@
+import hashlib
+import datetime
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from ._tables import PARSER
+
+
+"""
+
+SEASON SCHEDULE
+
+years/{year}/games.htm --> one row per game: week, teams, score and a boxscore link once the game's been played
+A week counts as completed once every one of its games links a boxscore (MNF included)
+    --> except games still without one days after their date (canceled, e.g. 2022 BUF-CIN), those never will
+    a postponed game gets its new date on the row, so it holds its week until it's played
+Each row is hashed --> a score or link that changes after the fact (stat corrections, flexed games) shows up as a changed game
+
+"""
+
+ROOT_URL: str = 'https://www.pro-football-reference.com/'
+
+# Days past its date a game without a boxscore stops holding up its week (boxscores go up within hours)
+CANCELED_AFTER_DAYS: int = 3
+
+
+def game_url(href: str) -> str:
+    """
+    Boxscore href --> url, built the same way as from the week pages (page cache and manifest are keyed by it)
+    """
+    return f'{ROOT_URL}{href}'
+
+
+def game_date(row) -> datetime.date|None:
+    """
+    Schedule row --> date of the game (sort key when there is one, the cell's text otherwise), None if it can't be read
+    """
+    cell = row.find('td', attrs={'data-stat': 'game_date'})
+    if cell is None:
+        return None
+
+    try:
+        return datetime.date.fromisoformat((cell.get('csk') or cell.get_text()).strip()[:10])
+    except ValueError:
+        return None
+
+
+def parse_schedule(html: str, **kwargs) -> list[dict]:
+    """
+    Regular season games in schedule order --> [{week, url (None until played), date, row (hash of the row's text)}]
+    """
+    parser: str = kwargs.get('parser', PARSER)
+
+    table = BeautifulSoup(html, parser, parse_only=SoupStrainer('table', attrs={'id': 'games'})).find('table', id='games')
+    if table is None:
+        return list()
+
+    games: list[dict] = list()
+    for row in table.find_all('tr'):
+        week_cell = row.find('th', attrs={'data-stat': 'week_num'})
+        # Repeated header rows + playoff rounds (WildCard, Division ...) are skipped
+        if week_cell is None or not week_cell.get_text().strip().isdigit():
+            continue
+
+        link = row.find('td', attrs={'data-stat': 'boxscore_word'})
+        link = link.find('a') if link is not None else None
+        href = link['href'] if link is not None and link.get('href', '').startswith('/boxscores/') else None
+
+        games.append({
+            'week': int(week_cell.get_text()),
+            'url': game_url(href) if href is not None else None,
+            'date': game_date(row),
+            'row': hashlib.sha1('|'.join(cell.get_text() for cell in row.find_all(('th', 'td'))).encode('utf-8')).hexdigest(),
+        })
+
+    return games
+
+
+def completed_weeks(games: list[dict], **kwargs) -> list[int]:
+    """
+    Weeks where every game has a boxscore or never will (no boxscore CANCELED_AFTER_DAYS after its date)
+    today --> date to judge by (defaults to today)
+    """
+    today: datetime.date = kwargs.get('today', datetime.date.today())
+    cutoff = today - datetime.timedelta(days=CANCELED_AFTER_DAYS)
+
+    weeks: dict[int, bool] = dict()
+    for game in games:
+        done: bool = game['url'] is not None or (game.get('date') is not None and game['date'] < cutoff)
+        weeks[game['week']] = weeks.get(game['week'], True) and done
+
+    return sorted(week for week, complete in weeks.items() if complete)
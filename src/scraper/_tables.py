@@ -0,0 +1,162 @@
+import re
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml # noqa: F401 --> only checking it's there
+    PARSER: str = 'lxml'
+except ImportError:
+    PARSER: str = 'html.parser'
+
+
+"""
+
+SINGLE-PASS TABLE EXTRACTION
+
+Only the tables the scraper reads (and the scorebox above them) are parsed at all:
+    each wanted <table id=...> ... </table> is cut out of the raw markup first (PFR never nests tables), so the rest of the page
+    (play-by-play, drives, starters ...) isn't even tokenized --> falls back to a strained parse of the whole page if a cut looks off
+Each table is then walked once --> {data-stat: [cell text, ...]} for every column at the same time
+Uses lxml when it's installed, html.parser otherwise (same output)
+
+Same values as the old per-column find_all calls:
+    'player' --> row header (th) text, repeated header rows ('Player') left out
+    everything else --> td text in document order
+
+"""
+
+BOXSCORE_TABLES: tuple[str,...] = (
+    'player_offense',
+    'player_defense',
+    'kicking',
+    'vis_snap_counts',
+    'home_snap_counts',
+    'passing_advanced',
+    'rushing_advanced',
+    'receiving_advanced',
+)
+
+
+class MissingTable(LookupError):
+    """
+    Table not on the page (advanced stats not posted yet etc.)
+    """
+
+
+# Opening tag with an id, up to the first closing tag after it
+TABLE = re.compile(r'<table\b[^>]*?\sid="([^"]+)"[^>]*>.*?</table>', re.DOTALL)
+
+
+def cut_tables(html: str, table_ids: tuple[str,...]) -> str|None:
+    """
+    Markup of just the wanted tables, None when one of them is on the page but couldn't be cut out cleanly
+    """
+    ids = set(table_ids)
+    found: dict[str, str] = dict()
+    for match in TABLE.finditer(html):
+        # First table with an id wins, like find_all(...)[0]
+        if match.group(1) in ids:
+            found.setdefault(match.group(1), match.group(0))
+
+    for table_id in ids.difference(found):
+        if f'id="{table_id}"' in html:
+            return None
+
+    return ''.join(found.values())
+
+
+def _table_strainer(table_ids: tuple[str,...]) -> SoupStrainer:
+    """
+    Only <table id=...> for the given ids (attribute callables work the same on every bs4 version)
+    """
+    ids = set(table_ids)
+    return SoupStrainer('table', attrs={'id': lambda id_: id_ in ids})
+
+
+def table_columns(table) -> dict[str, list[str]]:
+    """
+    One walk over a table's cells --> column lists keyed by data-stat
+    """
+    columns: dict[str, list[str]] = dict()
+
+    for cell in table.find_all(('th', 'td'), attrs={'data-stat': True}):
+        stat: str = cell['data-stat']
+
+        if cell.name == 'th':
+            if stat != 'player':
+                continue
+            text = cell.get_text()
+            if text == 'Player':
+                continue
+        else:
+            text = cell.get_text()
+
+        columns.setdefault(stat, list()).append(text)
+
+    return columns
+
+
+class BoxscorePage:
+    def __init__(self, html: str, **kwargs):
+        """
+        html --> boxscore page with every table in the document (uncomment_tables)
+        table_ids --> tables to keep, parser --> bs4 backend
+        timings --> dict to fill with seconds spent on each step (soup, scorebox, table_<id>), None to skip timing
+        """
+        table_ids: tuple[str,...] = tuple(kwargs.get('table_ids', BOXSCORE_TABLES))
+
+        parser: str = kwargs.get('parser', PARSER)
+        timings: dict[str, float]|None = kwargs.get('timings', None)
+
+        start = time.perf_counter()
+        cut = cut_tables(html, table_ids)
+        soup = (BeautifulSoup(cut, parser)
+                if cut is not None else
+                BeautifulSoup(html, parser, parse_only=_table_strainer(table_ids))
+               )
+        if timings is not None:
+            timings['soup'] = time.perf_counter() - start
+            start = time.perf_counter()
+
+        # Scorebox sits above every table --> only the top of the page is parsed for it (whole page if it isn't there)
+        first_table: int = html.find('<table')
+        head: str = html[:first_table] if first_table > 0 else html
+        self.scorebox = BeautifulSoup(head, parser, parse_only=SoupStrainer('div', class_='scorebox')).find('div', class_='scorebox')
+        if self.scorebox is None and len(head) < len(html):
+            self.scorebox = BeautifulSoup(html, parser, parse_only=SoupStrainer('div', class_='scorebox')).find('div', class_='scorebox')
+
+        if timings is not None:
+            timings['scorebox'] = time.perf_counter() - start
+
+        self.tables: dict[str, dict[str, list[str]]] = dict()
+        for table in soup.find_all('table', id=True):
+            start = time.perf_counter()
+            self.tables[table['id']] = table_columns(table)
+            if timings is not None:
+                timings[f"table_{table['id']}"] = time.perf_counter() - start
+
+    def table(self, table_id: str) -> dict[str, list[str]]:
+        if table_id not in self.tables:
+            raise MissingTable(f'No {table_id} table on the page')
+        return self.tables[table_id]
+
+    def column(self, table_id: str, stat: str) -> list[str]:
+        """
+        Every value of one data-stat (empty if the table doesn't have it, like find_all would)
+        """
+        return self.table(table_id).get(stat, list())
+
+    def teams(self) -> tuple[str, str]:
+        """
+        Scorebox --> (away, home) full team names
+        """
+        if self.scorebox is None:
+            raise MissingTable('No scorebox on the page')
+        strong = self.scorebox.find_all('strong')
+        return tuple(strong[i].get_text().replace('\n', '') for i in (0, 2))
+
+    def scores(self) -> tuple[int, int]:
+        if self.scorebox is None:
+            raise MissingTable('No scorebox on the page')
+        return tuple(int(score.get_text().replace('\n', '')) for score in self.scorebox.find_all('div', class_='scores'))
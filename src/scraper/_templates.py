@@ -33,4 +33,10 @@ def boxscore_url(date, hometeam):
     Figured out better way --> Not in use right now
     """
     return f'https://www.pro-football-reference.com/boxscores/{date}0{hometeam}.htm'
-    
\ No newline at end of file
+    
+
+def schedule_url(year) -> str:
+    """
+    Returns the season schedule --> every game of every week, boxscore link once it's been played
+    """
+    return f'https://www.pro-football-reference.com/years/{year}/games.htm'
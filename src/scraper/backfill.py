@@ -0,0 +1,145 @@
+import pandas as pd
+
+from .scraper import Scraper
+from ._pipeline import rounds_summary, run_rounds
+
+
+"""
+
+MULTI-SEASON BACKFILL
+
+One Scraper per season (own Filing, manifest, schedule), but a single Fetcher between them --> one token bucket, one connection pool, one page cache
+Every season's schedule is read first, then every game left to scrape goes through one pipeline (oldest season first)
+    --> the rate limit is used the whole way through, no gap between seasons
+Weeks come off each season's schedule page, so 17 and 18 week seasons need nothing special (older team names in _conversions)
+Restartable: finished games are in each season's manifest, run() again (or resume=True) and only what's left is scraped
+
+"""
+
+
+class Backfill:
+    def __init__(self, years, **kwargs):
+        """
+        years --> first year of each season, e.g. range(2015, 2024)
+        Everything else goes to every Scraper (rate_per_minute, concurrency, workers, game_retries, cache_dir, replay, metrics_log ...)
+        report_every --> seconds between progress lines (games done, games per minute, ETA)
+        """
+        self.years: list[int] = sorted(set(int(year) for year in years))
+        if not len(self.years):
+            raise ValueError('Backfill needs at least one season')
+
+        # One Firefox per season is what this replaces --> requests only
+        kwargs['browser'] = False
+        self.report_every: float|None = kwargs.pop('report_every', 60.0)
+        self.PROGRESS_BAR = kwargs.get('progress_bar', True)
+
+        first = Scraper(self.years[0], **kwargs)
+        shared = {
+            **kwargs,
+            'fetcher': first.fetcher,
+            'page_cache': first.cache,
+            'metrics': first.metrics if first.metrics is not None else False,
+        }
+        self.scrapers: dict[int, Scraper] = {
+            self.years[0]: first,
+            **{year: Scraper(year, **shared) for year in self.years[1:]}
+        }
+        self.metrics = first.metrics
+
+        # Pipeline settings for run_rounds, same for every season
+        for attr in ('workers', 'queue_size', 'batch_size', 'game_retries', 'game_backoff', 'max_game_backoff'):
+            setattr(self, attr, getattr(first, attr))
+        self.REPLAY = first.REPLAY
+
+        # url --> season scraper it belongs to
+        self.owner: dict[str, Scraper] = dict()
+        self.pipeline = None
+        self.pipelines: list = list()
+        self.results: list[dict] = list()
+
+    @property
+    def first(self) -> Scraper:
+        return self.scrapers[self.years[0]]
+
+    def plan(self, resume: bool = False, retry_dead: bool = False) -> dict[str, int]:
+        """
+        {boxscore url: week} across every season, oldest first (each season's plan goes in its own manifest)
+        """
+        games: dict[str, int] = dict()
+        for year, scraper in self.scrapers.items():
+            print(f'{scraper.season}: ', end='')
+            season_games = scraper.plan_season(resume, retry_dead)
+
+            games.update(season_games)
+            self.owner.update({url: scraper for url in season_games})
+
+        return games
+
+    def changed_pages(self, games: dict[str, int]):
+        """
+        Every season's pages off the shared fetcher, each checked against its own season's manifest
+        """
+        for url, html in self.first.game_pages(list(games), raise_errors=False):
+            yield self.owner[url].check_page(url, html, games[url])
+
+    def write_games(self, results: list[dict]) -> int:
+        by_season: dict[int, list[dict]] = dict()
+        for result in results:
+            by_season.setdefault(self.owner[result['url']].year, list()).append(result)
+
+        return sum(self.scrapers[year].write_games(season_results) for year, season_results in by_season.items())
+
+    def record_failed(self, url: str, error: BaseException, week: int, retried: bool = False) -> dict:
+        return self.owner[url].record_failed(url, error, week, retried)
+
+    def checkpoint(self) -> None:
+        for scraper in self.scrapers.values():
+            scraper.checkpoint()
+
+    def run(self, resume: bool = False, retry_dead: bool = False) -> dict[str, dict]:
+        """
+        Scrapes every season that isn't up to date
+        resume=True --> only the games the last run planned and didn't finish (no schedule requests)
+        retry_dead=True --> dead-lettered games go back in line
+        Returns {url: manifest entry} for games that still failed
+        """
+        print(f'Backfilling {len(self.years)} season(s): {self.years[0]}-{self.years[-1]}\n')
+
+        games = self.plan(resume, retry_dead)
+        if not len(games):
+            print('Every season already up to date\n')
+            return dict()
+
+        n_seasons: int = len(set(self.owner[url].year for url in games))
+        print(f'\n{len(games)} boxscores queued across {n_seasons} season(s)')
+
+        failed = run_rounds(self, games, progress_bar=self.PROGRESS_BAR, report_every=self.report_every)
+
+        print(self.pipeline_summary().to_string())
+        if self.metrics is not None:
+            self.metrics.report()
+        for url, entry in failed.items():
+            print(f'{self.owner[url].season} ', end='')
+            self.owner[url].report_failed({url: entry})
+
+        print(f'\nBackfilled {len(games) - len(failed)} of {len(games)} boxscores\n')
+        print(self.status().to_string())
+
+        return failed
+
+    def pipeline_summary(self) -> pd.DataFrame:
+        return rounds_summary(self.pipelines)
+
+    def status(self) -> pd.DataFrame:
+        """
+        Games per manifest status for every season
+        """
+        return (pd
+                .DataFrame({scraper.season: scraper.manifest.counts() for scraper in self.scrapers.values()})
+                .T
+                .fillna(0)
+                .astype(int)
+               )
+
+    def close(self) -> None:
+        self.first.close()
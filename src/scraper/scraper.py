@@ -1,41 +1,34 @@
-import requests
-import time
+import os
 import glob
+import time
+import hashlib
 
 import pandas as pd
 pd.set_option('display.max_columns', 100)
 
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
-
-from tqdm.notebook import tqdm
 
 # Local code
 from filing import Filing
 
-from ._conversions import (
-    convert_initials,
-    convert_teamname,
-    standardize_initials,
-    standardize_name
+from ._boxscore import (
+    clean_name,
+    parse_adv_stat,
+    parse_defensive_stat,
+    write_game
 )
-from ._info import (
-    ADV_PASSING_COLUMNS,
-    ADV_RUSHING_COLUMNS,
-    ADV_RECEIVING_COLUMNS,
-    DEFENSIVE_FPTS_RULES,
-    DEFENSIVE_TD_COLUMNS,
-    KICKING_FPTS_RULES,
-    OFFENSIVE_COLUMNS,
-    PTS_ALLOWED_SCORING
-)
-from ._templates import week_url
+from ._fetch import RATE_PER_MINUTE, Fetcher, TokenBucket
+from ._manifest import Manifest
+from ._metrics import Metrics
+from ._pagecache import PageCache
+from ._pipeline import Pipeline, rounds_summary, run_rounds
+from ._schedule import completed_weeks, game_url, parse_schedule
+from ._templates import schedule_url, week_url
 
 
 class Scraper:
 
-    def __init__(self, year=2023):
+    def __init__(self, year=2023, **kwargs):
 
         self.year: int = int(year)
         self.season: str = f'{self.year}-{self.year+1}'
@@ -43,446 +36,355 @@ class Scraper:
         # Initialize filing object
         self.filing = Filing(self.season)
 
-        # NFL changed number of weeks in 2022
-        num_weeks = 18 if self.year >= 2022 else 17
+        # NFL went to 18 weeks (17 games) in 2021
+        self.num_weeks: int = 18 if self.year >= 2021 else 17
 
-        # Only works correctly if updating every week, better if can figure out way to determine what week it is as second part of range
-        # last_week_saved = num_weeks if self.year != 2023 else self.filing.get_last_week_saved()
-        
         # Going to start with just regular season
-        # Needs at least a day for advanced stats to load after MNF otherwise scraper issues
+        # get_season_boxscores works off the schedule page instead (completed weeks only), these are for one week at a time
         self.week_pages = {
             week: week_url(self.year, week)
-            for week in range(1,num_weeks+1)
-        } if self.year != 2023 else {week: week_url(self.year, week) for week in range(6,7)} # range(last_week_saved+1, last_week_saved+2)
+            for week in range(1,self.num_weeks+1)
+        }
+
+        # Every game filed so far (page hash, schedule row, files) --> season updates only scrape what's new or changed
+        # Journaled as it happens, a game that keeps failing is dead-lettered after failing max_attempts runs in a row
+        # (game_retries rounds within one run count as a single attempt)
+        self.manifest = Manifest(self.filing.season_dir, max_attempts=kwargs.get('max_attempts', 5))
+        # Completed games from the last schedule read, {url: {week, url, row}}
+        self.schedule: dict[str, dict] = dict()
+
+        # fetcher=... (another scraper's, page cache already wired in) --> one limiter, connection pool and cache for several seasons
+        shared_fetcher: Fetcher|None = kwargs.get('fetcher', None)
+
+        # One token bucket for every request this scraper makes --> runs at the site limit instead of sleeping after each game
+        # limiter=TokenBucket(...) shares one between scrapers
+        self.limiter: TokenBucket = shared_fetcher.limiter if shared_fetcher is not None else (kwargs.get('limiter', None) or TokenBucket(kwargs.get('rate_per_minute', RATE_PER_MINUTE)))
+
+        # Every page over a keep-alive session, commented tables pulled out of the raw markup (uncomment_tables)
+        self.fetcher = shared_fetcher or Fetcher(limiter=self.limiter, concurrency=kwargs.get('concurrency', 4), retries=kwargs.get('retries', 4))
+
+        # browser=True --> boxscores rendered by headless Firefox instead (needs selenium + geckodriver), one page at a time
+        self.BROWSER = kwargs.get('browser', False)
+        self.driver = None
+        self.browser = None
+
+        # Every page fetched is kept in data/html-cache (gzipped, by content hash) --> cache=False to skip
+        # replay=True parses pages from that cache only --> no network, no rate limit, missing pages are an error
+        self.REPLAY = kwargs.get('replay', False)
+        # Counters + timers for the run (metrics=False --> none at all), metrics_log=path --> one JSON line per game
+        # metrics=Metrics(...) shares one between scrapers
+        metrics = kwargs.get('metrics', True)
+        self.metrics: Metrics|None = metrics if isinstance(metrics, Metrics) else (Metrics(log_fpath=kwargs.get('metrics_log', None)) if metrics else None)
+
+        if self.metrics is not None and shared_fetcher is None:
+            self.fetcher.metrics = self.metrics
+            self.fetcher.getter = self.metrics.wrap(self.fetcher.getter)
+
+        self.cache = kwargs.get('page_cache', None)
+        if self.cache is None and (kwargs.get('cache', True) or self.REPLAY):
+            self.cache = PageCache(kwargs.get('cache_dir', os.path.join(self.filing.data_dir, 'html-cache')))
+
+        if self.cache is not None and shared_fetcher is None:
+            self.fetcher.getter = self.cache.wrap(self.fetcher.getter)
+
+        # fetch --> parse + score --> file stages (_pipeline), workers=0 parses in-process
+        self.workers = kwargs.get('workers', None)
+        self.queue_size: int = kwargs.get('queue_size', 8)
+        self.batch_size: int = kwargs.get('batch_size', 16)
+        self.pipeline = None
+        self.pipelines: list[Pipeline] = list()
+
+        # Games that fail go round again in the same run after game_backoff seconds (doubling), game_retries times
+        self.game_retries: int = kwargs.get('game_retries', 2)
+        self.game_backoff: float = kwargs.get('game_backoff', 30.0)
+        self.max_game_backoff: float = kwargs.get('max_game_backoff', 300.0)
+
+        # url --> sha256 of the page last fetched
+        self.page_hashes: dict[str, str] = dict()
+
+        if self.BROWSER and not self.REPLAY:
+            self.driver = self.start_browser()
+            getter = self.browser_get if self.metrics is None else self.metrics.wrap(self.browser_get)
+            getter = getter if self.cache is None else self.cache.wrap(getter, source='browser')
+            self.browser = Fetcher(limiter=self.limiter, concurrency=1, retries=kwargs.get('retries', 4), getter=getter, metrics=self.metrics)
+
+    def start_browser(self):
+        try:
+            from selenium import webdriver
+            from selenium.webdriver.firefox.options import Options
+        except ImportError as error:
+            raise ImportError('browser=True needs selenium installed, the default fetch mode does not') from error
 
         ff_options = Options()
         ff_options.add_argument('--headless')
 
-        self.driver = webdriver.Firefox(options=ff_options)
+        return webdriver.Firefox(options=ff_options)
+
+    def browser_get(self, url: str) -> str:
+        self.driver.get(url)
+        return self.driver.page_source
+
+    def pages(self, urls: list[str], fetcher: Fetcher|None = None, raise_errors: bool = True):
+        """
+        (url, html) as each page arrives --> straight from the page cache in replay mode
+        raise_errors=False --> (url, exception) for a page that couldn't be had, the rest keep coming
+        """
+        if self.REPLAY:
+            for url in urls:
+                try:
+                    html = self.cache.read(url)
+                    if self.metrics is not None:
+                        self.metrics.count('pages_replayed')
+                    yield url, html
+                except KeyError as error:
+                    if raise_errors:
+                        raise
+                    yield url, error
+            return
+
+        yield from (fetcher or self.fetcher).iter_pages(urls, raise_errors=raise_errors)
+
+    def page(self, url: str) -> str:
+        for _, html in self.pages([url]):
+            return html
+
+    def game_pages(self, urls: list[str], raise_errors: bool = True):
+        """
+        (url, html) per boxscore as each one arrives, raw (score_game pulls the commented tables out)
+        """
+        yield from self.pages(urls, self.browser if self.driver is not None else None, raise_errors)
+
+    def close(self) -> None:
+        self.fetcher.close()
+        if self.driver is not None:
+            self.browser.close()
+            self.driver.quit()
 
     def clean_name(self, name: str) -> str:
         """
         Standardizes name across PFR, FD, DK
         """
-        clean_ = ' '.join(name.split(' ')[:2]).replace('.', '')
-        return standardize_name(clean_)
+        return clean_name(name)
 
-    # parse_defensive_stat = lambda stat_, stat_val: int(stat_val) if stat_ in DEFENSIVE_TD_COLUMNS[1:] else standardize_initials(stat_val)
     def parse_defensive_stat(self, stat: str, stat_val: str):
-        if stat == 'team':
-            return standardize_initials(stat_val)
-
-        if not len(stat_val) or stat_val == ' ':
-            return 0
-
-        return int(stat_val)
+        return parse_defensive_stat(stat, stat_val)
 
     def parse_adv_stat(self, stat: str, stat_val: str):
-        if stat == 'team':
-            return standardize_initials(stat_val)
-    
-        if 'pct' in stat or '%' in stat_val: # Just in case
-            no_pct_sign = stat_val[:-1]
-            return round( float(no_pct_sign)/100, 3 ) if len(no_pct_sign) else 0.0
-    
-        if not len(stat_val) or stat_val == ' ':
-            return 0.0
-    
-        return float(stat_val) if '.' in stat_val else int(stat_val)
+        return parse_adv_stat(stat, stat_val)
 
-    def get_week_boxscores(self, week: int, url: str):
+    def get_game_urls(self, url: str) -> list[str]:
         """
-        Returns every boxscore for given week and saves it to directory
+        Every boxscore linked from a week page
         """
 
-        root_url: str = 'https://www.pro-football-reference.com/'
-        
         week_games_soup = BeautifulSoup(
-            requests.get(url).text,
+            self.page(url),
             'html.parser'
         )
 
-        for game in week_games_soup.find_all('div', class_='game_summary expanded nohover'):
-
-            game_url: str = f"{root_url}{game.find_all('td', class_='right gamelink')[0].find('a')['href']}"
-            
-            self.driver.get(game_url)
-            game_soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            
-            stat_table = game_soup.find_all('table', id='player_offense')[0]
-
-            scorebox = game_soup.find_all('div', class_='scorebox')[0]
-            
-            away_team, home_team = tuple([convert_teamname(scorebox.find_all('strong')[i].get_text().replace('\n', '')) for i in (0,2)])
-            away_score, home_score =  tuple([int(score.get_text().replace('\n','')) for score in scorebox.find_all('div', class_='scores')])
-    
-            # Different for names because th not td
-            names = [
-                self.clean_name(tag.get_text()) for tag in stat_table.find_all('th', attrs={'data-stat': 'player'})
-                if tag.get_text() != 'Player'
-            ]
-
-            n_players = len(names)
-
-            convert_stat_str = lambda stat, stat_val: stat_val if stat in ['player', 'team', 'pass_rating'] else int(stat_val)
-            
-            table_data = {
-                stat: [convert_stat_str(stat, td.get_text()) for td in stat_table.find_all('td', attrs={'data-stat': stat})]
-                for stat in OFFENSIVE_COLUMNS[1:]
-            }
-            
-            # One-liners to either clean or add more info when more annoying then doing on massive dataframes
-            fix_rating = lambda rating_str: float(rating_str) if len(rating_str) else 0.0
-            teams = [standardize_initials(team) for team in set(table_data['team'])] # Careful having both this and away_team, home_team
-            
-            is_home = lambda team_: team_ == home_team
-            get_opp = lambda team_: away_team if is_home(team_) else home_team
-            get_score = lambda team_: home_score if is_home(team_) else away_score
-            get_opp_score = lambda team_: away_score if is_home(team_) else home_score
-
-            winning_team = home_team if home_score > away_score else away_team
-            is_winner = lambda team_: int(team_ == winning_team)
-            get_spread = lambda team_: home_score - away_score if is_home(team_) else away_score - home_score
-            total_score = away_score + home_score
-            
-            table_data['pass_rating'] = [ fix_rating(rating) for rating in table_data['pass_rating'] ]
-            table_data['team'] = [ standardize_initials(team) for team in table_data['team'] ]
-            table_data['opp'] = [ get_opp(team) for team in table_data['team'] ]
-            table_data['home'] = [ int(is_home(team)) for team in table_data['team'] ]
-            table_data['score'] = [ get_score(team) for team in table_data['team'] ]
-            table_data['opp_score'] = [ get_opp_score(team) for team in table_data['team'] ]
-            table_data['winner'] = [ is_winner(team) for team in table_data['team'] ]
-
-            table_data['spread'] = [ get_spread(team) for team in table_data['team'] ]
-            table_data['total'] = [total_score] * n_players
-            table_data['week'] = [week] * n_players
-            
-            # Defaults to WR, name already standardized
-            # table_data['pos'] = [ self.lookup_position.get(name, 'WR') for name in names ]
-
-            # Need to figure out defense
-            # Just need to remember in PPR format
-            # TODO: figure out cleaner way for assign and bonuses
-            offense_df = (pd
-                  .DataFrame(data={**{'name': names}, **table_data})
-                  .assign(fpts=lambda df: 0.04*df.pass_yds + 4.0*df.pass_td - 1.0*df.pass_int + 0.1*df.rush_yds + 6.0*df.rush_td + 1.0*df.rec + 0.1*df.rec_yds + 6.0*df.rec_td - 1.0*df.fumbles_lost)
-                 )
-
-            ########################################################################################################
-            # Defensive handling
-            ########################################################################################################
-
-            # This info comes from the offensive table
-            # Team: # of times they were sacked
-            # Example: BUF: # times Josh Allen was sacked
-            team_defense_stats = {
-                team: {
-                    stat: offense_df.loc[offense_df['team'] == team, stat].sum()
-                    for stat in ('pass_sacked', 'pass_int', 'fumbles_lost')
-                }
-                for team in teams
-            }
-            
-            for team, def_stats in team_defense_stats.items():
-                def_stats['pts_allowed'] = get_opp_score(team)
-            
-            def_table = game_soup.find_all('table', id='player_defense')[0]
-            # parse_defensive_stat = lambda stat_, stat_val: int(stat_val) if stat_ in DEFENSIVE_TD_COLUMNS[1:] else standardize_initials(stat_val)
-            
-            # ('team', 'def_int_td', 'fumbles_rec_td')
-            def_table_data = {
-                stat: [self.parse_defensive_stat(stat, td.get_text()) for td in def_table.find_all('td', attrs={'data-stat': stat})]
-                for stat in DEFENSIVE_TD_COLUMNS
-            }
-            
-            # Need to count touchdowns for defense, most important after points allowed
-            team_def_tds = {team: 0 for team in teams}
-            for cat in DEFENSIVE_TD_COLUMNS[1:]:
-                for i, td in enumerate(def_table_data[cat]):
-                    team_def_tds[def_table_data['team'][i]] += td
-
-            
-            # Initialize dictionary for fpts for defenses
-            defense_fpts = {team: 0 for team in teams}
-            
-            # Careful having all in one loop
-            for team in teams:
-                for cat, multi in DEFENSIVE_FPTS_RULES.items():
-                    defense_fpts[team] += team_defense_stats[get_opp(team)][cat]*multi
-                    
-                defense_fpts[team] += 6.0*team_def_tds[team]
-                # Defense not responsible for opposing defense getting TD
-                # Issues might be here
-                team_defense_stats[team]['pts_allowed'] -= 6.0*team_def_tds[get_opp(team)]
-                
-                for pts_range, fpts_ in PTS_ALLOWED_SCORING.items():
-                    if team_defense_stats[team]['pts_allowed'] in pts_range:
-                        defense_fpts[team] += fpts_
-
-
-            defense_data = {
-                'name': [ convert_initials(team_) for team_ in teams ],
-                'team': teams,
-                'opp': [ get_opp(team_) for team_ in teams ],
-                'home': [ int(is_home(team)) for team in teams ],
-                'week': [week] * 2,
-                'score': [ get_score(team) for team in teams ],
-                'opp_score':[ get_opp_score(team) for team in teams ],
-                'winner': [ is_winner(team) for team in teams ],
-                'spread': [ get_spread(team) for team in teams ],
-                'total': [total_score] * 2,
-                'pos': ['DST'] * 2,
-                'fpts': [defense_fpts[team] for team in teams]
-            }
+        return [
+            game_url(game.find_all('td', class_='right gamelink')[0].find('a')['href'])
+            for game in week_games_soup.find_all('div', class_='game_summary expanded nohover')
+        ]
 
-            ########################################################################################################
-            # Kicking
-            ########################################################################################################
+    def write_games(self, results: list[dict]) -> int:
+        """
+        Files a batch of score_game results and records them in the manifest, returns files written
+        """
+        n_files: int = 0
+        for result in results:
+            start = time.perf_counter()
+            fpaths = write_game(self.filing, result)
+            n_files += len(fpaths)
 
-            kicking_table = game_soup.find_all('table', id='kicking')[0]
+            url: str = result['url']
+            fields = {'week': result['week'], 'sha256': self.page_hashes.get(url)}
+            if url in self.schedule:
+                fields['row'] = self.schedule[url]['row']
 
-            kickers = [
-                self.clean_name(tag.get_text()) for tag in kicking_table.find_all('th', attrs={'data-stat': 'player'})
-                if tag.get_text() != 'Player'
-            ]
+            self.manifest.done(url, fpaths, **fields)
 
-            n_kickers = len(kickers)
-            
-            convert_kicking_val = lambda kick_val: int(kick_val) if len(kick_val) else 0
-            parse_kicking_stat = lambda kick_stat, kick_val: convert_kicking_val(kick_val) if kick_stat != 'team' else standardize_initials(kick_val)
-            kicking_data = {
-                stat: [parse_kicking_stat(stat, td.get_text()) for td in kicking_table.find_all('td', attrs={'data-stat': stat})]
-                for stat in ['team', 'xpm', 'fgm']
-            }
-            
-            kicking_fpts = {kicker: 0.0 for kicker in kickers}
-            
-            for stat, multi in KICKING_FPTS_RULES.items():
-                for i, kicking_val in enumerate(kicking_data[stat]):
-                    kicking_fpts[kickers[i]] += kicking_val*multi
-                    
-            kicking_data = {
-                'name': kickers,
-                'team': [ standardize_initials(team) for team in kicking_data['team'] ],
-                'opp': [ get_opp(team) for team in kicking_data['team'] ],
-                'home': [ int(is_home(team)) for team in kicking_data['team'] ],
-                'week': [week] * n_kickers,
-                'score': [ get_score(team) for team in kicking_data['team'] ],
-                'opp_score':[ get_opp_score(team) for team in kicking_data['team'] ],
-                'winner': [ is_winner(team) for team in kicking_data['team'] ],
-                'spread': [ get_spread(team) for team in kicking_data['team'] ],
-                'total': [total_score] * n_kickers,
-                'pos': ['K'] * n_kickers,
-                'fpts': [kicking_fpts[kicker] for kicker in kickers]
-            }
-            ########################################################################################################
-
-            # fpts_df = (pd
-            #            .concat([
-            #                offense_df,
-            #                pd.DataFrame(defense_data),
-            #                pd.DataFrame(kicking_data)
-            #            ])
-            #            .fillna(0.0) #Careful
-            #            .assign(name=lambda df_: df_.name.str.strip()) # Whitespace issues
-            #           )
-
-            # # File after getting position from Pro-Football-Reference
-            # self.filing.save_boxscore(fpts_df, away_team, home_team)
-            
-            ########################################################################################################
-            # Snap Counts
-            ########################################################################################################
-            snapcounts_tables = {
-                away_team: game_soup.find_all('table', id='vis_snap_counts')[0], #vis not away 
-                home_team: game_soup.find_all('table', id='home_snap_counts')[0]
-            }
-            
-            # Two separate tables instead of one combined table --> 2d dict
-            snapcounts_data = {
-                away_team: dict(),
-                home_team: dict()
-            }
-            
-            # Dont want lineman info (for now)
-            target_pos = ('QB', 'WR', 'RB', 'TE')
-            # Only want offensive data (for now) --> data-stat values in HTML
-            snapcount_data_stats = ('player', 'pos', 'offense', 'off_pct')
-            
-            # Going to get everyone at first (easier) --> then will filter dict based on position / index
-            for team, snapcount_html_table in snapcounts_tables.items():
-                snapcounts_data[team]['name'] = [
-                    self.clean_name(tag.get_text()) for tag in snapcount_html_table.find_all('th', attrs={'data-stat': 'player'})
-                    if tag.get_text() != 'Player'
-                ]
-            
-                for stat in snapcount_data_stats[1:]:
-                    snapcounts_data[team][stat] = [td.get_text() for td in snapcount_html_table.find_all('td', attrs={'data-stat': stat})]
-            
-
-            # Initialize as empty outside loop in order to be used elsewhere
-            name_position = {team_: dict() for team_ in (away_team, home_team)}
-            
-            # Now cleaning
-            
-            for team, snap_info in snapcounts_data.items():
-                # Indexes of positions in target_pos
-                num_entries = len(snap_info['name'])
-                # Can actually use this as positions source instead of relying on external
-                pos_indexes = [i for i in range(num_entries) if snap_info['pos'][i] in target_pos]
-
-                # REMEMBER: snap_info = snapcounts_data[team]
-                name_position[team] = {snap_info['name'][i]: snap_info['pos'][i] for i in pos_indexes}
-                
-                for stat in snap_info:
-                    target_pos_values = [snap_info[stat][i] for i in pos_indexes]
-                    if stat == 'offense':
-                        target_pos_values = [int(val) for val in target_pos_values]
-                    elif stat == 'off_pct':
-                        target_pos_values = [float(val[:-1]) / 100 for val in target_pos_values]
-                    snap_info[stat] = target_pos_values
-
-            # Flatten name_position into 1d dict
-            name_position = {
-                **{name_: pos_ for name_, pos_ in name_position[away_team].items()},
-                **{name_: pos_ for name_, pos_ in name_position[home_team].items()}
-            }
-            
-            # Flattening, adding game info for subsequent individual dataframes 
-            awayteam_df_data = snapcounts_data[away_team]
-            hometeam_df_data = snapcounts_data[home_team]
-            
-            awayteam_num_rows = len(awayteam_df_data['name'])
-            hometeam_num_rows = len(hometeam_df_data['name'])
-            
-            awayteam_df_data['team'] = [away_team] * awayteam_num_rows
-            awayteam_df_data['opp'] = [home_team] * awayteam_num_rows
-            
-            hometeam_df_data['team'] = [home_team] * hometeam_num_rows
-            hometeam_df_data['opp'] = [away_team] * hometeam_num_rows
-
-            awayteam_df_data['week'] = [week] * awayteam_num_rows
-            hometeam_df_data['week'] = [week] * hometeam_num_rows
-            
-            rename_columns = {
-                'offense': 'snap_total',
-                'off_pct': 'snap_percent'
-            }
-            # Make DataFrames
-            away_snapcounts_df, home_snapcounts_df = tuple([
-                (pd
-                 .DataFrame(data_)
-                 .rename(rename_columns, axis=1)
-                )
-                for data_ in (awayteam_df_data, hometeam_df_data)
-            ])
-
-            snapcounts_dfs = {
-                away_team: away_snapcounts_df,
-                home_team: home_snapcounts_df
-            }
+            if self.metrics is not None:
+                self.record_written(result, len(fpaths), time.perf_counter() - start)
 
-            for team, df_ in snapcounts_dfs.items():
-                self.filing.save_snapcounts(df_, team, week)
-
-            ########################################################################################################
-            # Filing fpts dataframe here after being able to get positions directly from Pro-Football-Reference
-            ########################################################################################################
-
-            offense_df['pos'] = offense_df['name'].map(lambda name_: name_position.get(name_,'RB')) # Default to RB since sometimes LB or FB or weird positions get rushing attempt
-            
-            fpts_df = (pd
-                       .concat([
-                           offense_df,
-                           pd.DataFrame(defense_data),
-                           pd.DataFrame(kicking_data)
-                       ])
-                       .fillna(0.0) #Careful
-                       .assign(name=lambda df_: df_.name.str.strip()) # Whitespace issues
-                      )
-
-            # Issues with current setup --> No 2pt conversions available from boxscore data, so also not applied
-
-            # All bonuses worth 3
-            dk_bonuses = {
-                'pass_yds': 300.0,
-                'rush_yds': 100.0,
-                'rec_yds': 100.0
-            }
+        self.manifest.save()
+        return n_files
+
+    def run_pipeline(self, games: dict[str, int], **kwargs) -> dict[str, dict]:
+        """
+        games --> {boxscore url: week}, fetched, scored and filed as one pipeline (stage throughput in self.pipeline_summary())
+        write=False --> results kept in self.results instead of filed
+        A game that fails doesn't stop the rest --> recorded in the manifest, retried after a backoff (game_retries rounds)
+        Returns {url: manifest entry} for games still failing at the end (dead-lettered or left for the next run)
+        """
+        return run_rounds(self, games, **kwargs)
+
+    def pipeline_summary(self) -> pd.DataFrame:
+        """
+        Stage throughput of every round in the last run_pipeline
+        """
+        return rounds_summary(self.pipelines)
+
+    def record_written(self, result: dict, n_files: int, seconds: float) -> None:
+        """
+        Metrics for one filed game --> parse / score timings from the worker, write time, rows and files
+        """
+        rows: int = (len(result['boxscore'])
+                     + sum(len(df_) for df_ in result['snapcounts'].values())
+                     + sum(len(df_) for *_, df_ in result['advanced'])
+                    )
+        timings: dict[str, float] = {
+            (step if step == 'score' else f'parse_{step}'): seconds_
+            for step, seconds_ in result.get('timings', dict()).items()
+        }
+        timings['parse'] = sum(seconds_ for step, seconds_ in timings.items() if step.startswith('parse_'))
+        timings['write'] = seconds
+
+        self.metrics.count('rows_written', rows)
+        self.metrics.count('files_written', n_files)
+        self.metrics.times(timings)
+        self.metrics.finish_game(
+            result['url'],
+            'filed',
+            season=self.season,
+            week=result['week'],
+            rows=rows,
+            files=n_files,
+            seconds={step: round(seconds_, 4) for step, seconds_ in timings.items()},
+        )
+
+    def record_failed(self, url: str, error: BaseException, week: int, retried: bool = False) -> dict:
+        """
+        retried=True --> failed again on a retry round, this run's attempt is already counted
+        """
+        if self.metrics is not None:
+            self.metrics.finish_game(url, 'failed', season=self.season, week=week, error=f'{type(error).__name__}: {error}')
+
+        return self.manifest.failed(url, error, retried, week=week, sha256=self.page_hashes.get(url))
+
+    def checkpoint(self) -> None:
+        self.manifest.save()
+
+    def check_page(self, url: str, html: str|Exception, week: int) -> tuple[str, str|Exception|None, int]:
+        """
+        Fetched page --> html None when the manifest already has this exact page filed, exceptions passed along
+        """
+        if isinstance(html, Exception):
+            return url, html, week
+
+        self.page_hashes[url] = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        unchanged = self.manifest.is_done(url, sha256=self.page_hashes[url])
+        if unchanged:
+            # Schedule row moved but the page didn't --> nothing to refile, just stop flagging it
+            fields = {'row': self.schedule[url]['row']} if url in self.schedule else dict()
+            self.manifest.update(url, queued=False, **fields)
+            if self.metrics is not None:
+                self.metrics.finish_game(url, 'skipped', season=self.season, week=week)
+
+        return url, (None if unchanged else html), week
+
+    def changed_pages(self, games: dict[str, int]):
+        """
+        (url, html, week) per game as it arrives --> check_page
+        A page that couldn't be fetched comes through as its exception
+        """
+        for url, html in self.game_pages(list(games), raise_errors=False):
+            yield self.check_page(url, html, games[url])
+
+    def fetch_games(self, games: dict[str, int]) -> int:
+        """
+        Fetch stage alone --> pages into the page cache without parsing anything (replay=True parses them later)
+        """
+        if self.cache is None:
+            raise ValueError('Fetching without parsing needs the page cache (cache=True)')
+
+        return sum(1 for _ in self.game_pages(list(games)))
+
+    def get_week_boxscores(self, week: int, url: str):
+        """
+        Returns every boxscore for given week and saves it to directory
+        """
+        # Next pages download (rate limited) while earlier ones are parsed and filed
+        failed = self.run_pipeline({game_url: week for game_url in self.get_game_urls(url)}, progress_bar=False)
+        self.report_failed(failed)
 
-            fpts_df['bonus'] = 0.0
-            for stat, thresh in dk_bonuses.items():
-                fpts_df.loc[fpts_df[stat] >= thresh, 'bonus'] += 3.0
+        return failed
 
-            fpts_df['fpts'] += fpts_df['bonus']
+    def report_failed(self, failed: dict[str, dict]) -> None:
+        for url, entry in failed.items():
+            status = 'dead-lettered' if entry['status'] == 'dead' else 'will be retried next run'
+            print(f'Week {entry.get("week")} {url} failed in {entry["attempts"]} run(s) ({entry["error"]}) --> {status}')
 
-            # File after getting position from Pro-Football-Reference
-            self.filing.save_boxscore(fpts_df, away_team, home_team)
+    def get_season_games(self) -> dict[str, int]:
+        """
+        {boxscore url: week} for every completed week on the schedule page
+        """
+        schedule = parse_schedule(self.page(schedule_url(self.year)))
+        weeks = completed_weeks(schedule)
+
+        self.schedule = {game['url']: game for game in schedule if game['week'] in weeks}
+
+        return {url: game['week'] for url, game in self.schedule.items()}
+
+    def plan_season(self, resume: bool = False, retry_dead: bool = False) -> dict[str, int]:
+        """
+        {boxscore url: week} this run should scrape, written to the manifest as its plan (see get_season_boxscores)
+        """
+        # Temp files of a write a crash cut off --> the game they belonged to was never marked done, it gets redone
+        self.filing.remove_partial()
 
-            ########################################################################################################
-            # Advanced Stats
-            ########################################################################################################
+        to_scrape = self.manifest.remaining() if resume else dict()
 
-            ADV_COLUMNS = {
-                'passing': ADV_PASSING_COLUMNS[1:],
-                'rushing': ADV_RUSHING_COLUMNS[1:],
-                'receiving': ADV_RECEIVING_COLUMNS[1:]
+        if len(to_scrape):
+            print(f'Resuming: {len(to_scrape)} of {len(self.manifest.plan)} planned boxscores left')
+        else:
+            # One request for the schedule --> completed weeks, then only new / changed / unfinished games
+            games = self.get_season_games()
+
+            if retry_dead:
+                self.manifest.revive(url for url in games if self.manifest.is_dead(url))
+
+            to_scrape = {
+                url: week for url, week in games.items()
+                if not self.manifest.is_done(url, row=self.schedule[url]['row'])
+                and not self.manifest.is_dead(url, row=self.schedule[url]['row'])
             }
 
-            for category in ('passing', 'rushing', 'receiving'):
-                adv_table = game_soup.find_all('table', id=f'{category}_advanced')[0]
-
-                adv_table_names = [self.clean_name(tag.get_text()) for tag in adv_table.find_all('th', attrs={'data-stat': 'player'}) if tag.get_text() != 'Player']
-
-                adv_data = {
-                    **{
-                        'name': adv_table_names,
-                        'pos': [name_position.get(name_, 'RB') for name_ in adv_table_names],
-                    },
-                    **{
-                        stat: [self.parse_adv_stat(stat, td.get_text()) for td in adv_table.find_all('td', attrs={'data-stat': stat})]
-                        for stat in ADV_COLUMNS[category]
-                    }
-                }
-
-                adv_df = pd.DataFrame(adv_data)
-                adv_df['week'] = week
-                
-                # Save as individual team dataframe
-                for team_ in adv_df['team'].drop_duplicates():
-                    team_adv_df = adv_df.loc[adv_df['team'] == team_]
-                    # Parameters: df, stat_category, team, week
-                    self.filing.save_advanced_stats(team_adv_df, category, team_, week)
-            
-
-            # At most 16 games in one week
-            # Cant have more than 20 requests in 1 minute
-            # time.sleep(n) --> n = 4, 5 to be safe
-            time.sleep(5)
-        
+            if not len(to_scrape):
+                print(f'Boxscores for season {self.season} already up to date\n')
+                return to_scrape
+
+            print(f'Scraping {len(to_scrape)} of {len(games)} boxscores')
+
+        # Written ahead of any game --> resume knows exactly what this run was doing
+        self.manifest.set_plan(to_scrape)
 
-        return
+        return to_scrape
 
-    def get_season_boxscores(self) -> None:
+    def get_season_boxscores(self, resume: bool = False, retry_dead: bool = False) -> dict[str, dict]:
         """
         Iterates through every boxscore for every game of every week
         Saves to data directory
+        resume=True --> games the last run set out to scrape and didn't finish, nothing else (no schedule request)
+        retry_dead=True --> dead-lettered games go back in line
+        Returns {url: manifest entry} for games that still failed
         """
 
         print(f'Beginning scraping for {self.season} season\n')
 
-        if not len(self.week_pages):
-            print(f'Boxscores for season {self.season} already up to date\n')
-            return
-            
-        for weeknum, url in tqdm(self.week_pages.items()):
-            print(f'Scraping boxscores for Week {weeknum}')
-            self.get_week_boxscores(weeknum, url)
-            # Need to sleep for 60 seconds so requests do not get blocked
-            # Selenium causes webscraper to be much slower --> might not need as much time
-            # time.sleep(1)
-            print(f'Succesfully scraped boxscores for Week {weeknum}\n')
-        
+        to_scrape = self.plan_season(resume, retry_dead)
+        if not len(to_scrape):
+            return dict()
+
+        weeks = sorted(set(to_scrape.values()))
+        print(f'Week(s) {", ".join(map(str, weeks))}')
+
+        failed = self.run_pipeline(to_scrape)
+        print(self.pipeline_summary().to_string())
+        if self.metrics is not None:
+            self.metrics.report()
+        self.report_failed(failed)
+
+        print(f'Succesfully scraped {len(to_scrape) - len(failed)} of {len(to_scrape)} boxscores for Week(s) {", ".join(map(str, weeks))}\n')
         
-        return
\ No newline at end of file
+        return failed
@@ -0,0 +1,9 @@
+import os
+import sys
+
+
+# Packages live under src/ and import each other absolutely (from engine import Engine, from _stacks import STACKS)
+SRC: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.pool import PlayerPool
+from engine._positions import PositionRules
+
+
+"""
+
+POSITION RULES vs THE ORIGINAL positioncheck
+
+positioncheck below is Checker.positioncheck as it was before the rules were compiled into lookup tables
+Every team order is checked --> the first team with a 5-1 split / TE without QB decides, so order matters
+
+"""
+
+POSITION_LIMITS: dict[str, int] = {'RB': 1, 'WR': 2, 'TE': 1}
+
+
+def positioncheck(lineup: list[tuple[str, str]], TEAMS: tuple[str,...]) -> bool:
+    """
+    lineup --> (pos, team) per player
+    """
+    lineup_positions = [pos_ for pos_, _ in lineup]
+
+    if lineup_positions.count('K') == 2 or lineup_positions.count('DST') == 2 or lineup_positions.count('QB') == 0:
+        return False
+
+    team_positions = {team_: [pos_ for pos_, t in lineup if t == team_] for team_ in TEAMS}
+    position_counts = {team_: {pos_: positions_.count(pos_) for pos_ in set(positions_)} for team_, positions_ in team_positions.items()}
+
+    for pos_, limit_ in POSITION_LIMITS.items():
+        if any([position_counts[team_].get(pos_, 0) > limit_ for team_ in TEAMS]):
+            return False
+
+    for pos_counts in position_counts.values():
+        if sum(pos_counts.values()) == 5:
+            return bool(sum([pos_counts.get(pos_, 0) for pos_ in ('K', 'DST')]))
+        if sum(pos_counts.values()) == 1:
+            return bool(pos_counts.get('WR', 0))
+        if 'TE' in pos_counts and 'QB' not in pos_counts:
+            return False
+
+    return True
+
+
+def random_pool(n_teams: int, n_players: int = 40, seed: int = 0) -> PlayerPool:
+    rng = np.random.default_rng(seed)
+    return PlayerPool(pd.DataFrame({
+        'salary': rng.integers(1, 100, n_players) * 100,
+        'fpts': rng.random(n_players) * 20 + 2.5,
+        'team': rng.choice(['AAA', 'BBB', 'CCC'][:n_teams], n_players),
+        'pos': rng.choice(['QB', 'RB', 'WR', 'TE', 'K', 'DST', 'FB'], n_players, p=[.15, .2, .3, .15, .07, .07, .06]),
+    }, index=[f'p{i}' for i in range(n_players)]))
+
+
+@pytest.mark.parametrize('n_teams', [2, 3])
+def test_matches_positioncheck(n_teams):
+    pool = random_pool(n_teams)
+    rng = np.random.default_rng(n_teams)
+
+    for TEAMS in itertools.permutations(pool.teams):
+        rules = PositionRules(pool.team, pool.pos, [pool.teams.index(team_) for team_ in TEAMS], POSITION_LIMITS)
+        lineups = np.array([rng.choice(len(pool), 6, replace=False) for _ in range(5_000)])
+
+        expected = np.array([
+            positioncheck([(pool.value(i, 'pos'), pool.value(i, 'team')) for i in lineup], TEAMS)
+            for lineup in lineups
+        ])
+
+        # Both outcomes show up, otherwise the comparison proves little
+        assert expected.any() and not expected.all()
+        assert (rules.check_bulk(lineups) == expected).all()
+        assert [rules.check(list(lineup)) for lineup in lineups] == expected.tolist()
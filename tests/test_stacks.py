@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from _stacks import STACKS
+
+from engine import Engine
+from engine.stacks import NO_PLAYERS, UNKNOWN
+from benchmark import synthetic_pool
+
+
+"""
+
+STACK IDS vs PATTERN STRINGS
+
+StackClassifier encodes each team's share of a lineup as an integer key
+Here the pattern is built the slow way --> positions (WR/TE as REC) sorted and joined, looked up in STACKS
+
+"""
+
+CATEGORY: dict[str, str] = {'WR': 'REC', 'TE': 'REC'}
+
+
+def stack_id(positions: list[str]) -> int:
+    if not len(positions):
+        return NO_PLAYERS
+    pattern = '-'.join(sorted(CATEGORY.get(pos_, pos_) for pos_ in positions))
+    return STACKS.index(pattern) if pattern in STACKS else UNKNOWN
+
+
+@pytest.mark.parametrize('site', ['draftkings', 'fanduel'])
+@pytest.mark.parametrize('past', [True, False])
+def test_classify_matches_strings(site, past):
+    engine = Engine(synthetic_pool(16, seed=11), mode='vectorized', site=site, past=past, progress_bar=False)
+    pool = engine.pool
+
+    lineups = engine.enumerate_indices(engine.captain_indices())
+    rows = np.random.default_rng(0).choice(len(lineups), min(len(lineups), 3_000), replace=False)
+    ids = engine.stacks.classify(lineups[rows])
+
+    for r, lineup in zip(ids, lineups[rows]):
+        for team in range(len(pool.teams)):
+            positions = [pool.positions[pool.pos[p]] for p in lineup if pool.team[p] == team]
+            assert r[team] == stack_id(positions)
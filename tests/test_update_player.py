@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from engine import Engine
+from benchmark import Benchmark, synthetic_pool
+
+
+"""
+
+LATE SWAP vs A REBUILT ENGINE
+
+update_player patches cached results + retained top lineups in place
+After every update the patched engine has to agree with one built from scratch on the same values
+
+"""
+
+@pytest.mark.parametrize('mode', ['python', 'vectorized', 'topn'])
+def test_updates_match_rebuild(mode):
+    checks = Benchmark(seed=3, top_n=10, progress_bar=False).check_updates(players=14, mode=mode, n_updates=12, targets=3)
+
+    assert len(checks) == 12
+    assert checks['match'].all(), checks.loc[~checks['match']]
+
+
+@pytest.mark.parametrize('mode', ['python', 'topn'])
+def test_inactive_matches_rebuild(mode):
+    data = synthetic_pool(14, seed=5)
+    engine = Engine(data.copy(), mode=mode, workers=1, progress_bar=False)
+    engine.Lineups(top_n=10)
+
+    # Best captain so far is ruled out, then brought back
+    best = engine.Lineups(top_n=1)[engine.labels[0]].iloc[0]
+
+    engine.update_player(best, active=False)
+    patched = engine.Lineups(top_n=10)
+    fresh = Engine(data.drop(best), mode=mode, workers=1, progress_bar=False).Lineups(top_n=10)
+
+    assert best not in set(patched[engine.labels].to_numpy().ravel())
+    assert np.allclose(patched['fpts'], fresh['fpts'])
+
+    engine.update_player(best, active=True)
+    restored = engine.Lineups(top_n=10)
+    rebuilt = Engine(data, mode=mode, workers=1, progress_bar=False).Lineups(top_n=10)
+
+    assert np.allclose(restored['fpts'], rebuilt['fpts'])